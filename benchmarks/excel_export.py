@@ -0,0 +1,72 @@
+# benchmarks/excel_export.py
+# Compares the classic Excel writer with the write-only export (time and peak Python memory).
+# Schedules are random (no solve needed), so large sites and long horizons are cheap to test.
+# Run from the repository root:  python -m benchmarks.excel_export --sizes 36x7 1000x28 3000x28
+import argparse
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+import excel_writer
+import generate_test_data
+
+WRITERS = {
+    'classic': excel_writer.create_excel_schedule,
+    'write_only': excel_writer.create_excel_schedule_fast,
+}
+OUTPUT_DIR = os.path.join("benchmarks", "results")
+
+
+def random_schedule(num_employees, num_days, num_shifts, seed=0, work_share=0.7):
+    """At most one shift per employee and day, worked with probability work_share."""
+    rng = np.random.default_rng(seed)
+    solution = np.zeros((num_employees, num_days, num_shifts), dtype=np.uint8)
+    works = rng.random((num_employees, num_days)) < work_share
+    shifts = rng.integers(0, num_shifts, size=(num_employees, num_days))
+    e_idx, d_idx = np.nonzero(works)
+    solution[e_idx, d_idx, shifts[e_idx, d_idx]] = 1
+    return solution
+
+
+def run_writer(name, solution, employees, colors):
+    """Returns: dict with wall time, peak traced memory and cells written for one writer."""
+    path = os.path.join(OUTPUT_DIR, f"excel_export_{name}.xlsx")
+    start = time.perf_counter()
+    cells = WRITERS[name](solution, employees, colors, output_filename=path)
+    seconds = time.perf_counter() - start
+
+    # Second run for memory only: tracemalloc slows the writers down several times
+    tracemalloc.start()
+    WRITERS[name](solution, employees, colors, output_filename=path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'writer': name, 'seconds': seconds, 'peak_mb': peak / (1024 * 1024), 'cells': cells,
+            'file_kb': os.path.getsize(path) / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the classic vs. write-only Excel export.")
+    parser.add_argument('--sizes', nargs='+', default=['36x7', '500x14', '2000x28'], help="EMPLOYEESxDAYS")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    print(f"{'size':<10}{'writer':<12}{'time [s]':>10}{'peak [MB]':>11}{'cells':>9}{'file [KB]':>11}")
+    for size in args.sizes:
+        num_employees, num_days = (int(x) for x in size.lower().split('x'))
+        instance = generate_test_data.generate_instance(num_employees, num_days, args.seed)
+        solution = random_schedule(num_employees, num_days, instance['num_shifts'], args.seed)
+
+        results = [run_writer(name, solution, instance['employees'], instance['colors']) for name in WRITERS]
+        for r in results:
+            print(f"{size:<10}{r['writer']:<12}{r['seconds']:>10.3f}{r['peak_mb']:>11.1f}{r['cells']:>9}"
+                  f"{r['file_kb']:>11.0f}")
+        classic, fast = results
+        print(f"{'':<10}{'speedup':<12}{classic['seconds'] / fast['seconds']:>10.2f}x"
+              f"{classic['peak_mb'] / max(fast['peak_mb'], 1e-9):>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
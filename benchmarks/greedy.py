@@ -0,0 +1,98 @@
+# benchmarks/greedy.py
+# Greedy constructive draft (greedy_scheduler.py) vs. the exact solver: time and objective of
+# the draft, and CP-SAT cold vs. hinted with the draft (time to first solution, final cost).
+# The bundled week is always included; synthetic sites are added with --sizes.
+# Run from the repository root:  python -m benchmarks.greedy --sizes 100x7 500x7 --time-limit 60
+import argparse
+import time
+
+from ortools.sat.python import cp_model
+
+import config
+import generate_test_data
+import greedy_scheduler
+import instance_io
+import optimizer
+import penalty_eval
+import solution_io
+
+
+class _FirstSolutionTimer(cp_model.CpSolverSolutionCallback):
+    """Remembers the wall time of the first solution."""
+
+    def __init__(self):
+        super().__init__()
+        self.first_time = None
+
+    def on_solution_callback(self):
+        if self.first_time is None:
+            self.first_time = self.WallTime()
+
+
+def run_greedy():
+    """Greedy draft of the currently applied instance. Returns (draft, result dict)."""
+    start = time.perf_counter()
+    draft, unfilled = greedy_scheduler.greedy_schedule(config.EMPLOYEES, config.MANUAL_REQUESTS,
+                                                       config.MANUAL_ASSIGNMENTS, config.WORKED_LAST_SAT_NOON,
+                                                       config.WORKED_LAST_SAT_NIGHT)
+    elapsed = time.perf_counter() - start
+    objective = penalty_eval.evaluate_objective(draft, config.EMPLOYEES, config.WORKED_LAST_SAT_NOON,
+                                                config.WORKED_LAST_SAT_NIGHT)
+    return draft, {'mode': 'greedy', 'status': 'OPEN' if unfilled else 'VALID', 'first': elapsed,
+                   'wall_time': elapsed, 'objective': objective}
+
+
+def run_solver(solver_settings, hint_values=None):
+    """CP-SAT on the currently applied instance, optionally hinted. Returns a result dict."""
+    model, shift_vars = optimizer.build_model(config.EMPLOYEES, config.MANUAL_REQUESTS, config.MANUAL_ASSIGNMENTS,
+                                              config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT,
+                                              verbose=False)
+    if hint_values:
+        blocked_cells = optimizer.collect_blocked_cells(config.EMPLOYEES, config.MANUAL_REQUESTS,
+                                                        config.WORKED_LAST_SAT_NIGHT)
+        optimizer._add_solution_hints(model, shift_vars, hint_values, blocked_cells)
+
+    solver = optimizer._create_solver(solver_settings)
+    timer = _FirstSolutionTimer()
+    status = solver.Solve(model, timer)
+    result = {'mode': 'cp-sat hinted' if hint_values else 'cp-sat', 'status': solver.StatusName(status),
+              'first': timer.first_time}
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result.update(optimizer.get_solve_stats(solver))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the greedy draft against CP-SAT.")
+    parser.add_argument('--sizes', nargs='*', default=[], help="Extra synthetic sites, EMPLOYEESxDAYS")
+    parser.add_argument('--seed', type=int, default=0, help="Instance generator seed.")
+    parser.add_argument('--time-limit', type=float, default=60.0)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    solver_settings = {'max_time_seconds': args.time_limit, 'num_workers': args.workers, 'random_seed': args.seed}
+    instances = [None] + [generate_test_data.generate_instance(*(int(x) for x in size.lower().split('x')), args.seed)
+                          for size in args.sizes]
+
+    rows = []
+    for instance in instances:
+        if instance is not None:
+            instance_io.apply_instance(instance)
+        name = 'bundled' if instance is None else instance['name']
+
+        draft, greedy_result = run_greedy()
+        rows += [(name, greedy_result), (name, run_solver(solver_settings)),
+                 (name, run_solver(solver_settings, solution_io.solution_to_values(draft)))]
+
+    print(f"\n{'instance':<24}{'mode':<15}{'status':>10}{'first [s]':>11}{'time [s]':>10}{'objective':>12}{'gap':>8}")
+    for name, r in rows:
+        line = f"{name:<24}{r['mode']:<15}{r['status']:>10}"
+        line += f"{r['first']:>11.3f}" if r['first'] is not None else f"{'-':>11}"
+        if 'objective' in r:
+            line += f"{r['wall_time']:>10.2f}{r['objective']:>12.0f}"
+            line += f"{r['gap']:>8.2%}" if 'gap' in r else f"{'-':>8}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
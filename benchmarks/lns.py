@@ -0,0 +1,71 @@
+# benchmarks/lns.py
+# Plain CP-SAT vs. the LNS driver (config.LNS_SETTINGS) under the same total time budget.
+# The bundled week is always included; synthetic sites are added with --sizes.
+# Run from the repository root:  python -m benchmarks.lns --sizes 200x7 500x7 --time-limit 120
+import argparse
+
+from ortools.sat.python import cp_model
+
+import config
+import generate_test_data
+import instance_io
+import lns
+import optimizer
+
+
+def run_plain(solver_settings):
+    """Monolithic solve of the currently applied instance. Returns a result dict."""
+    solver, status, _ = optimizer.build_and_solve_model(
+        config.EMPLOYEES, config.MANUAL_REQUESTS, config.MANUAL_ASSIGNMENTS,
+        config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT, solver_settings=solver_settings)
+    result = {'mode': 'cp-sat', 'status': solver.StatusName(status)}
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result.update(optimizer.get_solve_stats(solver))
+    return result
+
+
+def run_lns(solver_settings, lns_settings):
+    """LNS solve of the currently applied instance. Returns a result dict."""
+    solver, status, _, stats = lns.solve_lns(
+        config.EMPLOYEES, config.MANUAL_REQUESTS, config.MANUAL_ASSIGNMENTS,
+        config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT,
+        solver_settings=solver_settings, lns_settings=lns_settings)
+    result = {'mode': 'lns', 'status': solver.StatusName(status)}
+    if stats is not None:
+        result.update(stats)
+        lns.print_lns_report(stats)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark plain CP-SAT vs. LNS.")
+    parser.add_argument('--sizes', nargs='*', default=[], help="Extra synthetic sites, EMPLOYEESxDAYS")
+    parser.add_argument('--seed', type=int, default=0, help="Instance generator seed.")
+    parser.add_argument('--time-limit', type=float, default=60.0, help="Total budget of both modes.")
+    parser.add_argument('--initial-time-limit', type=float, default=None, help="LNS initial solve (default 1/6).")
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    solver_settings = {'max_time_seconds': args.time_limit, 'num_workers': args.workers, 'random_seed': args.seed}
+    initial = args.initial_time_limit if args.initial_time_limit is not None else args.time_limit / 6
+    lns_settings = {'initial_time_limit': initial, 'time_limit': args.time_limit - initial, 'seed': args.seed}
+    instances = [None] + [generate_test_data.generate_instance(*(int(x) for x in size.lower().split('x')), args.seed)
+                          for size in args.sizes]
+
+    rows = []
+    for instance in instances:
+        if instance is not None:
+            instance_io.apply_instance(instance)
+        name = 'bundled' if instance is None else instance['name']
+        rows += [(name, run_plain(solver_settings)), (name, run_lns(solver_settings, lns_settings))]
+
+    print(f"\n{'instance':<24}{'mode':<8}{'status':>10}{'time [s]':>10}{'objective':>12}{'bound':>12}{'gap':>8}")
+    for name, r in rows:
+        line = f"{name:<24}{r['mode']:<8}{r['status']:>10}"
+        if 'objective' in r:
+            line += f"{r['wall_time']:>10.2f}{r['objective']:>12.0f}{r['best_bound']:>12.0f}{r['gap']:>8.2%}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
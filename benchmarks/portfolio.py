@@ -0,0 +1,75 @@
+# benchmarks/portfolio.py
+# Single CP-SAT solve (all cores) vs. the process portfolio (config.PORTFOLIO_SETTINGS) on the
+# same model and deadline. The bundled week is always included; synthetic sites via --sizes.
+# Run from the repository root:  python -m benchmarks.portfolio --sizes 100x7 200x7 --time-limit 60
+import argparse
+import os
+import time
+
+from ortools.sat.python import cp_model
+
+import config
+import generate_test_data
+import instance_io
+import optimizer
+import portfolio
+
+
+def _build():
+    model, _ = optimizer.build_model(config.EMPLOYEES, config.MANUAL_REQUESTS, config.MANUAL_ASSIGNMENTS,
+                                     config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT, verbose=False)
+    return model
+
+
+def run_single(solver_settings):
+    """One CP-SAT run with every core. Returns a result dict."""
+    solver = optimizer._create_solver(solver_settings)
+    status = solver.Solve(_build())
+    result = {'mode': 'single', 'status': solver.StatusName(status), 'winner': '-'}
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result.update(optimizer.get_solve_stats(solver))
+    return result
+
+
+def run_portfolio(solver_settings, name, log_file):
+    """Portfolio run (the build is not timed, as in run_single). Returns a result dict."""
+    model = _build()
+    start = time.perf_counter()
+    solver, status = portfolio.solve_portfolio(model, solver_settings, {'log_file': log_file},
+                                               {'instance': name})
+    result = {'mode': 'portfolio', 'status': solver.StatusName(status), 'winner': solver.winner['name']}
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result.update(optimizer.get_solve_stats(solver), wall_time=time.perf_counter() - start)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a single solve vs. the solver portfolio.")
+    parser.add_argument('--sizes', nargs='*', default=[], help="Extra synthetic sites, EMPLOYEESxDAYS")
+    parser.add_argument('--seed', type=int, default=0, help="Instance generator seed.")
+    parser.add_argument('--time-limit', type=float, default=60.0)
+    parser.add_argument('--log-file', default=None, help="Portfolio JSON log (default: none).")
+    args = parser.parse_args()
+
+    solver_settings = {'max_time_seconds': args.time_limit, 'num_workers': os.cpu_count() or 1,
+                       'random_seed': args.seed}
+    instances = [None] + [generate_test_data.generate_instance(*(int(x) for x in size.lower().split('x')), args.seed)
+                          for size in args.sizes]
+
+    rows = []
+    for instance in instances:
+        if instance is not None:
+            instance_io.apply_instance(instance)
+        name = 'bundled' if instance is None else instance['name']
+        rows += [(name, run_single(solver_settings)), (name, run_portfolio(solver_settings, name, args.log_file))]
+
+    print(f"\n{'instance':<24}{'mode':<11}{'status':>10}{'time [s]':>10}{'objective':>12}{'gap':>8}  winner")
+    for name, r in rows:
+        line = f"{name:<24}{r['mode']:<11}{r['status']:>10}"
+        if 'objective' in r:
+            line += f"{r['wall_time']:>10.2f}{r['objective']:>12.0f}{r['gap']:>8.2%}"
+        print(f"{line}  {r['winner']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/role_decomposition.py
+# Role-tier decomposition (role_decomposition.py) against one monolithic solve: time, cost
+# (penalty_eval), the loss against the monolithic cost and the worst-case loss against the
+# proven joint lower bound. Tiers with and without the repair pass.
+# The bundled week is always included; synthetic sites are added with --sizes.
+# Run from the repository root:  python -m benchmarks.role_decomposition --sizes 100x7 200x7 --time-limit 60
+import argparse
+import time
+
+from ortools.sat.python import cp_model
+
+import config
+import generate_test_data
+import instance_io
+import optimizer
+import penalty_eval
+import role_decomposition
+import solution_io
+
+
+def run_full(solver_settings):
+    """Monolithic solve of the currently applied instance. Returns (solution or None, result dict)."""
+    start = time.perf_counter()
+    solver, status, shift_vars = optimizer.build_and_solve_model(
+        config.EMPLOYEES, config.MANUAL_REQUESTS, config.MANUAL_ASSIGNMENTS,
+        config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT, solver_settings=solver_settings)
+    result = {'mode': 'full', 'status': solver.StatusName(status), 'time': time.perf_counter() - start}
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None, result
+    result['bound'] = solver.BestObjectiveBound()
+    solution_index = solution_io.build_solution_index(shift_vars, len(config.EMPLOYEES),
+                                                      config.NUM_DAYS, config.NUM_SHIFTS)
+    return solution_io.extract_solution(solver, solution_index), result
+
+
+def run_tiers(solver_settings, repair):
+    """Role-tier solve of the currently applied instance. Returns (solution or None, result dict)."""
+    start = time.perf_counter()
+    solution, stages = role_decomposition.solve_role_tiers(
+        config.EMPLOYEES, config.MANUAL_REQUESTS, config.MANUAL_ASSIGNMENTS,
+        config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT, solver_settings=solver_settings,
+        decomposition_settings={'repair': repair})
+    result = {'mode': 'tiers + repair' if repair else 'tiers', 'status': stages[-1]['status'],
+              'time': time.perf_counter() - start, 'bound': role_decomposition.lower_bound(stages)}
+    return solution, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the role-tier decomposition against a monolithic solve.")
+    parser.add_argument('--sizes', nargs='*', default=[], help="Extra synthetic sites, EMPLOYEESxDAYS")
+    parser.add_argument('--seed', type=int, default=0, help="Instance generator seed.")
+    parser.add_argument('--time-limit', type=float, default=60.0, help="Budget per mode (all tier stages together).")
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    solver_settings = {'max_time_seconds': args.time_limit, 'num_workers': args.workers, 'random_seed': args.seed}
+    instances = [None] + [generate_test_data.generate_instance(*(int(x) for x in size.lower().split('x')), args.seed)
+                          for size in args.sizes]
+
+    rows = []
+    for instance in instances:
+        if instance is not None:
+            instance_io.apply_instance(instance)
+        name = 'bundled' if instance is None else instance['name']
+
+        full_cost = None
+        for mode in ('full', 'tiers', 'tiers + repair'):
+            if mode == 'full':
+                solution, result = run_full(solver_settings)
+            else:
+                solution, result = run_tiers(solver_settings, repair=mode == 'tiers + repair')
+            if solution is not None:
+                result['objective'] = penalty_eval.evaluate_objective(
+                    solution, config.EMPLOYEES, config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT)
+                result['bound_loss'] = (result['objective'] - result['bound']) / max(1.0, result['objective'])
+                if mode == 'full':
+                    full_cost = result['objective']
+                elif full_cost is not None:
+                    result['loss'] = result['objective'] / max(full_cost, 1) - 1
+            rows.append((name, result))
+
+    print(f"\n{'instance':<24}{'mode':<16}{'status':>11}{'time [s]':>10}{'objective':>12}{'vs full':>9}"
+          f"{'vs bound':>10}")
+    for name, r in rows:
+        line = f"{name:<24}{r['mode']:<16}{r['status']:>11}{r['time']:>10.2f}"
+        if 'objective' in r:
+            line += f"{r['objective']:>12}"
+            line += f"{r['loss']:>9.2%}" if 'loss' in r else f"{'-':>9}"
+            line += f"{r['bound_loss']:>10.2%}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/role_slots.py
+# Compares the aggregated role model (headcount + capability sums) with the role-slot variant
+# (config.MODEL_SETTINGS['role_slots']): model size, build and solve time, objective.
+# The bundled week is always included; synthetic sites are added with --sizes.
+# Run from the repository root:  python -m benchmarks.role_slots --sizes 100x7 --time-limit 60
+import argparse
+import time
+
+from ortools.sat.python import cp_model
+
+import config
+import generate_test_data
+import instance_io
+import optimizer
+
+VARIANTS = {'aggregated': {'role_slots': False}, 'role_slots': {'role_slots': True}}
+
+
+def run_variant(variant, solver_settings, lean=False):
+    """Builds and solves the currently applied instance with one role model. Returns a result dict."""
+    model_settings = dict(VARIANTS[variant], lean=lean)
+    start = time.perf_counter()
+    model, _ = optimizer.build_model(config.EMPLOYEES, config.MANUAL_REQUESTS, config.MANUAL_ASSIGNMENTS,
+                                     config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT,
+                                     model_settings, verbose=False)
+    build_time = time.perf_counter() - start
+    num_vars, num_constraints = optimizer.get_model_size(model)
+
+    solver = optimizer._create_solver(solver_settings)
+    status = solver.Solve(model)
+
+    result = {'variant': variant, 'status': solver.StatusName(status), 'build_time': build_time,
+              'variables': num_vars, 'constraints': num_constraints, 'wall_time': solver.WallTime()}
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result.update(optimizer.get_solve_stats(solver))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the aggregated vs. role-slot role model.")
+    parser.add_argument('--sizes', nargs='*', default=[], help="Extra synthetic sites, EMPLOYEESxDAYS")
+    parser.add_argument('--seed', type=int, default=0, help="Instance generator seed.")
+    parser.add_argument('--time-limit', type=float, default=60.0)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--lean', action='store_true')
+    args = parser.parse_args()
+
+    solver_settings = {'max_time_seconds': args.time_limit, 'num_workers': args.workers, 'random_seed': args.seed}
+    instances = [None] + [generate_test_data.generate_instance(*(int(x) for x in size.lower().split('x')), args.seed)
+                          for size in args.sizes]
+
+    print(f"{'instance':<24}{'variant':<12}{'vars':>8}{'cts':>8}{'build [s]':>11}{'solve [s]':>11}"
+          f"{'status':>10}{'objective':>12}{'gap':>8}")
+    for instance in instances:
+        if instance is not None:
+            instance_io.apply_instance(instance)
+        name = 'bundled' if instance is None else instance['name']
+
+        results = [run_variant(variant, solver_settings, args.lean) for variant in VARIANTS]
+        for r in results:
+            line = (f"{name:<24}{r['variant']:<12}{r['variables']:>8}{r['constraints']:>8}"
+                    f"{r['build_time']:>11.3f}{r['wall_time']:>11.2f}{r['status']:>10}")
+            if 'objective' in r:
+                line += f"{r['objective']:>12.0f}{r['gap']:>8.2%}"
+            print(line)
+        aggregated, role_slots = results
+        print(f"{'':<24}{'overhead':<12}{role_slots['variables'] / aggregated['variables']:>7.2f}x"
+              f"{role_slots['constraints'] / aggregated['constraints']:>7.2f}x"
+              f"{role_slots['build_time'] / aggregated['build_time']:>10.2f}x"
+              f"{role_slots['wall_time'] / max(aggregated['wall_time'], 1e-9):>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/rolling_horizon.py
+# Quality loss of the rolling-horizon mode (config.ROLLING_HORIZON_SETTINGS) against one
+# monolithic solve. Both schedules are scored over the whole horizon with penalty_eval, and
+# checked against the hard rules of the full model (penalty_eval.hard_rule_violations, must be 0).
+# Keep the instances small enough for the monolithic solve to get close to optimal.
+# Run from the repository root:  python -m benchmarks.rolling_horizon --sizes 36x21 --window 14 --commit 7
+import argparse
+import time
+
+from ortools.sat.python import cp_model
+
+import config
+import generate_test_data
+import instance_io
+import optimizer
+import penalty_eval
+import rolling_horizon
+import solution_io
+
+
+def run_full(solver_settings):
+    """Monolithic solve of the currently applied instance. Returns (solution or None, result dict)."""
+    start = time.perf_counter()
+    solver, status, shift_vars = optimizer.build_and_solve_model(
+        config.EMPLOYEES, config.MANUAL_REQUESTS, config.MANUAL_ASSIGNMENTS,
+        config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT, solver_settings=solver_settings)
+    result = {'mode': 'full', 'status': solver.StatusName(status), 'time': time.perf_counter() - start}
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None, result
+    result['gap'] = optimizer.get_solve_stats(solver)['gap']
+    solution_index = solution_io.build_solution_index(shift_vars, len(config.EMPLOYEES),
+                                                      config.NUM_DAYS, config.NUM_SHIFTS)
+    return solution_io.extract_solution(solver, solution_index), result
+
+
+def run_rolling(solver_settings, window_days, commit_days):
+    """Rolling-horizon solve of the currently applied instance. Returns (solution or None, result dict)."""
+    start = time.perf_counter()
+    solution, _, windows = rolling_horizon.solve_rolling_horizon(
+        config.EMPLOYEES, config.MANUAL_REQUESTS, config.MANUAL_ASSIGNMENTS,
+        config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT, solver_settings=solver_settings,
+        rolling_settings={'window_days': window_days, 'commit_days': commit_days})
+    result = {'mode': f'rolling {window_days}/{commit_days}', 'status': windows[-1]['status'],
+              'time': time.perf_counter() - start, 'windows': len(windows)}
+    if solution is not None:
+        result['gap'] = max(w['gap'] for w in windows)
+    return solution, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rolling-horizon vs. monolithic solves.")
+    parser.add_argument('--sizes', nargs='*', default=['36x14', '36x21'], help="Synthetic sites, EMPLOYEESxDAYS")
+    parser.add_argument('--seed', type=int, default=2, help="Instance generator seed.")
+    parser.add_argument('--window', type=int, default=14, help="Days solved per window.")
+    parser.add_argument('--commit', type=int, default=7, help="Days committed per window.")
+    parser.add_argument('--time-limit', type=float, default=60.0, help="Full solve budget (also per window).")
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    solver_settings = {'max_time_seconds': args.time_limit, 'num_workers': args.workers, 'random_seed': args.seed}
+
+    rows = []
+    for size in args.sizes:
+        instance = generate_test_data.generate_instance(*(int(x) for x in size.lower().split('x')), args.seed)
+        instance_io.apply_instance(instance)
+
+        costs = {}
+        for mode in ('full', 'rolling'):
+            if mode == 'full':
+                solution, result = run_full(solver_settings)
+            else:
+                solution, result = run_rolling(solver_settings, args.window, args.commit)
+            if solution is not None:
+                result['objective'] = penalty_eval.evaluate_objective(
+                    solution, config.EMPLOYEES, config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT)
+                costs[mode] = result['objective']
+                result['violations'] = sum(penalty_eval.hard_rule_violations(
+                    solution, config.EMPLOYEES, config.MANUAL_REQUESTS, config.MANUAL_ASSIGNMENTS,
+                    config.WORKED_LAST_SAT_NIGHT).values())
+            rows.append((instance['name'], result))
+        if len(costs) == 2:
+            rows.append((instance['name'], {'mode': 'loss', 'loss': costs['rolling'] / max(costs['full'], 1) - 1}))
+
+    print(f"\n{'instance':<24}{'mode':<16}{'status':>10}{'time [s]':>10}{'objective':>12}{'max gap':>9}"
+          f"{'hard rules':>12}")
+    for name, r in rows:
+        if r['mode'] == 'loss':
+            print(f"{name:<24}{'quality loss':<16}{r['loss']:>41.2%}")
+            continue
+        line = f"{name:<24}{r['mode']:<16}{r['status']:>10}{r['time']:>10.2f}"
+        if 'objective' in r:
+            line += f"{r['objective']:>12}{r['gap']:>9.2%}{r['violations']:>12}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
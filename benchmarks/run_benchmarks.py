@@ -0,0 +1,271 @@
+# benchmarks/run_benchmarks.py
+# Times every phase of the pipeline on synthetic instances of increasing size and compares
+# the results with two baselines:
+# - benchmarks/model_baseline.json (committed): variables, constraints and objective per
+#   instance. Machine independent; the objective of a time-limited solve only roughly.
+# - benchmarks/baseline.json (git-ignored): phase timings, only valid on the machine that
+#   saved them. Save it once per machine before comparing timings.
+# Run from the repository root:
+#   python -m benchmarks.run_benchmarks --sizes 36x7 200x14 --time-limit 30
+#   python -m benchmarks.run_benchmarks --save-baseline       (store the current results as both baselines)
+import argparse
+import csv
+import json
+import os
+import time
+
+from ortools.sat.python import cp_model
+
+import config
+import excel_writer
+import generate_test_data
+import instance_io
+import optimizer
+import solution_io
+
+DEFAULT_SIZES = ['36x7', '100x7', '200x14']
+RESULTS_DIR = os.path.join("benchmarks", "results")
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+DEFAULT_MODEL_BASELINE = os.path.join("benchmarks", "model_baseline.json")
+MODEL_KEYS = ('instance', 'lean', 'variables', 'constraints', 'status', 'objective')
+
+
+# ============================================================================
+# 1. Instances
+# ============================================================================
+def _load_or_generate(num_employees, num_days, seed):
+    """Loads the fixture for this size, generating (and caching) it if missing."""
+    path = generate_test_data.default_fixture_path(num_employees, num_days, seed)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        instance_io.save_instance(path, generate_test_data.generate_instance(num_employees, num_days, seed))
+    return instance_io.load_instance(path)
+
+
+# ============================================================================
+# 2. Phase Timing
+# ============================================================================
+def _timed(phases, name, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    phases[name] = time.perf_counter() - start
+    return result
+
+
+def run_instance(instance, solver_settings, model_settings=None, write_excel=True):
+    """
+    Runs init, each constraint builder, the objective, Solve, solution extraction and the
+    Excel report separately.
+    Returns: result dict with per-phase seconds, model size, status, objective and gap.
+    """
+    instance_io.apply_instance(instance)
+    settings = dict(config.MODEL_SETTINGS)
+    if model_settings:
+        settings.update(model_settings)
+    lean = settings.get('lean', False)
+
+    employees = instance['employees']
+    unavailable = instance['unavailable_requests']
+    manual = instance['manual_assignments']
+    sat_noon, sat_night = instance['worked_last_sat_noon'], instance['worked_last_sat_night']
+    num_days, num_shifts = instance['num_days'], instance['num_shifts']
+    phases = {}
+
+    blocked = optimizer.collect_blocked_cells(employees, unavailable, sat_night) if lean else None
+    model, shift_vars = _timed(phases, 'init', optimizer._init_model_and_variables,
+                               employees, num_days, num_shifts, blocked)
+    _timed(phases, 'role_demand', optimizer._add_role_demand_constraints,
+           model, shift_vars, employees, num_days, num_shifts)
+    _timed(phases, 'shift_rules', optimizer._add_shift_rules_constraints,
+           model, shift_vars, len(employees), num_days, num_shifts)
+    _timed(phases, 'availability', optimizer._add_availability_constraints,
+           model, shift_vars, employees, unavailable, manual, sat_noon, sat_night)
+    _timed(phases, 'labor_law', optimizer._add_labor_law_constraints,
+           model, shift_vars, employees, num_days, num_shifts, lean=lean)
+    _timed(phases, 'objective', optimizer._build_objective_function,
+           model, shift_vars, employees, num_days, num_shifts, sat_noon, sat_night, lean=lean)
+    num_vars, num_constraints = optimizer.get_model_size(model)
+
+    solver = optimizer._create_solver(solver_settings)
+    status = _timed(phases, 'solve', solver.Solve, model)
+
+    result = {
+        'instance': instance['name'],
+        'lean': lean,
+        'employees': len(employees),
+        'days': num_days,
+        'variables': num_vars,
+        'constraints': num_constraints,
+        'status': solver.StatusName(status),
+        'objective': None,
+        'best_bound': None,
+        'gap': None,
+    }
+
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        stats = optimizer.get_solve_stats(solver)
+        result.update(objective=stats['objective'], best_bound=stats['best_bound'], gap=stats['gap'])
+        if write_excel:
+            os.makedirs(RESULTS_DIR, exist_ok=True)
+            solution_index = solution_io.build_solution_index(shift_vars, len(employees), num_days, num_shifts)
+            solution = _timed(phases, 'extract', solution_io.extract_solution, solver, solution_index)
+            _timed(phases, 'excel', excel_writer.create_excel_schedule, solution, employees, instance['colors'],
+                   output_filename=os.path.join(RESULTS_DIR, f"{instance['name']}.xlsx"))
+
+    result['phases'] = phases
+    return result
+
+
+# ============================================================================
+# 3. Results & Baseline
+# ============================================================================
+def save_results(results, path_prefix):
+    """Writes results as JSON (full) and CSV (one row per instance, one column per phase)."""
+    os.makedirs(os.path.dirname(path_prefix), exist_ok=True)
+    with open(path_prefix + '.json', 'w') as f:
+        json.dump(results, f, indent=1)
+
+    phase_names = sorted({name for r in results for name in r['phases']})
+    columns = ['instance', 'employees', 'days', 'variables', 'constraints', 'status', 'objective', 'best_bound', 'gap']
+    with open(path_prefix + '.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns + [f'{name}_s' for name in phase_names])
+        for r in results:
+            writer.writerow([r[c] for c in columns] + [f"{r['phases'].get(name, 0.0):.4f}" for name in phase_names])
+
+
+def _read_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_baseline(timing_path, model_path):
+    """
+    Baseline records: model size and objective from the committed model baseline, phase timings
+    from this machine's timing baseline (records of either file alone are used as they are).
+    Returns: (records, missing) - missing lists the baseline files that do not exist.
+    """
+    timing, model = _read_json(timing_path), _read_json(model_path)
+    missing = [path for path, data in ((model_path, model), (timing_path, timing)) if data is None]
+    phases = {(r['instance'], r.get('lean', False)): r.get('phases', {}) for r in timing or []}
+    if model is None:
+        return timing or [], missing
+    return [dict(r, phases=phases.get((r['instance'], r.get('lean', False)), {})) for r in model], missing
+
+
+def compare_with_baseline(results, baseline, time_tolerance, objective_tolerance=0.01, min_seconds=0.05):
+    """
+    Flags phases that got slower than baseline * (1 + time_tolerance) (ignoring phases shorter
+    than min_seconds), objectives worse than baseline * (1 + objective_tolerance), and model growth.
+    Records are matched by instance name and lean mode.
+    Returns: list of regression messages.
+    """
+    by_name = {(r['instance'], r.get('lean', False)): r for r in baseline}
+    regressions = []
+
+    for r in results:
+        base = by_name.get((r['instance'], r['lean']))
+        if base is None:
+            continue
+
+        for phase, seconds in r['phases'].items():
+            base_seconds = base.get('phases', {}).get(phase)
+            if base_seconds is None or max(seconds, base_seconds) < min_seconds:
+                continue
+            if seconds > base_seconds * (1 + time_tolerance):
+                regressions.append(f"{r['instance']}: {phase} {base_seconds:.3f}s -> {seconds:.3f}s")
+
+        if base['objective'] is not None and (
+                r['objective'] is None or r['objective'] > base['objective'] * (1 + objective_tolerance)):
+            regressions.append(f"{r['instance']}: objective {base['objective']} -> {r['objective']}")
+
+        for key in ('variables', 'constraints'):
+            if r[key] > base[key]:
+                regressions.append(f"{r['instance']}: {key} {base[key]} -> {r[key]}")
+
+    return regressions
+
+
+def _print_table(results):
+    phase_names = ['init', 'role_demand', 'shift_rules', 'availability', 'labor_law', 'objective',
+                   'solve', 'extract', 'excel']
+    header = f"{'instance':<28}{'vars':>9}{'cts':>9}{'status':>10}{'objective':>12}{'gap':>8}"
+    header += ''.join(f"{name[:9]:>10}" for name in phase_names)
+    print(header)
+    for r in results:
+        objective = f"{r['objective']:.0f}" if r['objective'] is not None else '-'
+        gap = f"{r['gap']:.2%}" if r['gap'] is not None else '-'
+        line = f"{r['instance']:<28}{r['variables']:>9}{r['constraints']:>9}{r['status']:>10}{objective:>12}{gap:>8}"
+        line += ''.join(f"{r['phases'].get(name, 0.0):>10.3f}" for name in phase_names)
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark model build, solve and report phases.")
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, help="EMPLOYEESxDAYS, e.g. 200x14")
+    parser.add_argument('--seed', type=int, default=0, help="Instance generator seed.")
+    parser.add_argument('--time-limit', type=float, default=30.0)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--lean', action='store_true')
+    parser.add_argument('--no-excel', action='store_true')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Timing baseline of this machine.")
+    parser.add_argument('--model-baseline', default=DEFAULT_MODEL_BASELINE,
+                        help="Committed baseline of model size and objective.")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the new baselines.")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed relative slowdown per phase.")
+    parser.add_argument('--objective-tolerance', type=float, default=0.01,
+                        help="Allowed relative objective increase (time-limited solves are not exact).")
+    args = parser.parse_args()
+
+    solver_settings = {'max_time_seconds': args.time_limit, 'num_workers': args.workers, 'random_seed': 0}
+    model_settings = {'lean': True} if args.lean else None
+
+    results = []
+    for size in args.sizes:
+        num_employees, num_days = (int(x) for x in size.lower().split('x'))
+        instance = _load_or_generate(num_employees, num_days, args.seed)
+        print(f"--- {instance['name']} ---")
+        results.append(run_instance(instance, solver_settings, model_settings, write_excel=not args.no_excel))
+
+    print()
+    _print_table(results)
+
+    stamp = time.strftime('%Y%m%d_%H%M%S')
+    save_results(results, os.path.join(RESULTS_DIR, f"bench_{stamp}"))
+    print(f"\nResults written to {RESULTS_DIR}/bench_{stamp}.json/.csv")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=1)
+        # Keep the entries of other instances / modes in the committed file
+        saved = {(r['instance'], r.get('lean', False)): r for r in _read_json(args.model_baseline) or []}
+        saved.update({(r['instance'], r['lean']): {k: r[k] for k in MODEL_KEYS} for r in results})
+        with open(args.model_baseline, 'w') as f:
+            json.dump(sorted(saved.values(), key=lambda r: (r['instance'], r['lean'])), f, indent=1)
+        print(f"Baselines saved to {args.baseline} (timings, this machine) and {args.model_baseline}")
+        return
+
+    baseline, missing = load_baseline(args.baseline, args.model_baseline)
+    if not baseline:
+        raise SystemExit(f"X No baseline found ({', '.join(missing)}): nothing was compared. "
+                         f"Run with --save-baseline first.")
+    if args.baseline in missing:
+        print(f"\n⚠️ No timing baseline at {args.baseline}: phase times were not compared. Timings are "
+              f"machine-specific; run --save-baseline on this machine to record them.")
+    compared = {(r['instance'], r['lean']) for r in results} & {(r['instance'], r.get('lean', False))
+                                                                for r in baseline}
+    if len(compared) < len(results):
+        print(f"⚠️ {len(results) - len(compared)} instance(s) have no baseline entry and were not compared.")
+    regressions = compare_with_baseline(results, baseline, args.tolerance, args.objective_tolerance)
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} regression(s) against the baseline:")
+        for message in regressions:
+            print(f"   - {message}")
+    else:
+        print(f"\nV No regressions against the baseline ({len(compared)} instance(s)).")
+
+
+if __name__ == "__main__":
+    main()
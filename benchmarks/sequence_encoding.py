@@ -0,0 +1,81 @@
+# benchmarks/sequence_encoding.py
+# Compares the encodings of the sequence penalties (config.WEIGHTS['SEQUENCE_ENCODING']):
+# model size, build and solve time, objective. The bundled week is always included;
+# synthetic sites and longer horizons are added with --sizes (--build-only skips the solve).
+# 'day_cost' is the compact encoding; the experimental 'automaton' is only run with --automaton.
+# Run from the repository root:  python -m benchmarks.sequence_encoding --sizes 100x7 36x28 --build-only
+import argparse
+import time
+
+from ortools.sat.python import cp_model
+
+import config
+import generate_test_data
+import instance_io
+import optimizer
+
+ENCODINGS = ['reified', 'day_cost']
+EXPERIMENTAL_ENCODINGS = ['automaton']
+
+
+def run_encoding(encoding, solver_settings, model_settings=None, solve=True):
+    """Builds (and solves) the currently applied instance with one encoding. Returns a result dict."""
+    original_weights = config.WEIGHTS
+    config.WEIGHTS = dict(original_weights, SEQUENCE_ENCODING=encoding)
+    try:
+        start = time.perf_counter()
+        model, _ = optimizer.build_model(config.EMPLOYEES, config.MANUAL_REQUESTS, config.MANUAL_ASSIGNMENTS,
+                                         config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT,
+                                         model_settings, verbose=False)
+        build_time = time.perf_counter() - start
+    finally:
+        config.WEIGHTS = original_weights
+
+    num_vars, num_constraints = optimizer.get_model_size(model)
+    result = {'encoding': encoding, 'variables': num_vars, 'constraints': num_constraints,
+              'build_time': build_time, 'status': '-'}
+    if solve:
+        solver = optimizer._create_solver(solver_settings)
+        status = solver.Solve(model)
+        result.update(status=solver.StatusName(status), wall_time=solver.WallTime())
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            result.update(optimizer.get_solve_stats(solver))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sequence-penalty encodings.")
+    parser.add_argument('--sizes', nargs='*', default=[], help="Extra synthetic sites, EMPLOYEESxDAYS")
+    parser.add_argument('--seed', type=int, default=0, help="Instance generator seed.")
+    parser.add_argument('--time-limit', type=float, default=60.0)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--lean', action='store_true')
+    parser.add_argument('--build-only', action='store_true', help="Only build the models (size and build time).")
+    parser.add_argument('--automaton', action='store_true',
+                        help="Also run the experimental 'automaton' encoding (larger and slower than 'day_cost').")
+    args = parser.parse_args()
+
+    solver_settings = {'max_time_seconds': args.time_limit, 'num_workers': args.workers, 'random_seed': args.seed}
+    model_settings = {'lean': True} if args.lean else None
+    instances = [None] + [generate_test_data.generate_instance(*(int(x) for x in size.lower().split('x')), args.seed)
+                          for size in args.sizes]
+
+    print(f"{'instance':<24}{'encoding':<12}{'vars':>8}{'cts':>8}{'build [s]':>11}{'solve [s]':>11}"
+          f"{'status':>10}{'objective':>12}{'gap':>8}")
+    for instance in instances:
+        if instance is not None:
+            instance_io.apply_instance(instance)
+        name = 'bundled' if instance is None else instance['name']
+
+        for encoding in ENCODINGS + (EXPERIMENTAL_ENCODINGS if args.automaton else []):
+            r = run_encoding(encoding, solver_settings, model_settings, solve=not args.build_only)
+            line = f"{name:<24}{encoding:<12}{r['variables']:>8}{r['constraints']:>8}{r['build_time']:>11.3f}"
+            line += f"{r['wall_time']:>11.2f}" if 'wall_time' in r else f"{'-':>11}"
+            line += f"{r['status']:>10}"
+            if 'objective' in r:
+                line += f"{r['objective']:>12.0f}{r['gap']:>8.2%}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/staged_objective.py
+# Single weighted solve vs. the two-stage lexicographic solve (optimizer.solve_staged) on the
+# same deadline: total weighted cost, its balance part (target deviation, MAX_SHIFTS excess)
+# and the time of every stage. One staged run per --slacks value (relative slack).
+# The bundled week is always included; synthetic sites are added with --sizes.
+# Run from the repository root:  python -m benchmarks.staged_objective --sizes 100x7 --slacks 0 0.05
+import argparse
+
+from ortools.sat.python import cp_model
+
+import config
+import generate_test_data
+import instance_io
+import optimizer
+
+
+def _build():
+    objective_parts = {}
+    model, _ = optimizer.build_model(config.EMPLOYEES, config.MANUAL_REQUESTS, config.MANUAL_ASSIGNMENTS,
+                                     config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT, verbose=False,
+                                     objective_parts=objective_parts)
+    return model, objective_parts
+
+
+def run_weighted(solver_settings):
+    """One solve of the weighted sum. Returns a result dict."""
+    model, objective_parts = _build()
+    solver = optimizer._create_solver(solver_settings)
+    status = solver.Solve(model)
+    result = {'mode': 'weighted', 'status': solver.StatusName(status), 'stages': ''}
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result.update(optimizer.get_solve_stats(solver), balance=solver.Value(objective_parts['balance']))
+    return result
+
+
+def run_staged(solver_settings, relative_slack):
+    """Staged solve with the given relative slack. Returns a result dict."""
+    model, objective_parts = _build()
+    stage_stats = []
+    solver, status = optimizer.solve_staged(model, objective_parts, solver_settings,
+                                            {'slack': 0, 'relative_slack': relative_slack}, stage_stats=stage_stats)
+    result = {'mode': f"staged {relative_slack:.0%}", 'status': solver.StatusName(status),
+              'stages': " + ".join(f"{s['wall_time']:.2f}" for s in stage_stats)}
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) and stage_stats[-1].get('kept') and len(stage_stats) == 2:
+        result.update(optimizer.get_solve_stats(solver), balance=stage_stats[-1]['balance'],
+                      wall_time=sum(s['wall_time'] for s in stage_stats))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the weighted objective against the staged solve.")
+    parser.add_argument('--sizes', nargs='*', default=[], help="Extra synthetic sites, EMPLOYEESxDAYS")
+    parser.add_argument('--seed', type=int, default=0, help="Instance generator seed.")
+    parser.add_argument('--slacks', nargs='*', type=float, default=[0.0], help="Relative slacks of the staged runs.")
+    parser.add_argument('--time-limit', type=float, default=60.0)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    solver_settings = {'max_time_seconds': args.time_limit, 'num_workers': args.workers, 'random_seed': args.seed}
+    instances = [None] + [generate_test_data.generate_instance(*(int(x) for x in size.lower().split('x')), args.seed)
+                          for size in args.sizes]
+
+    rows = []
+    for instance in instances:
+        if instance is not None:
+            instance_io.apply_instance(instance)
+        name = 'bundled' if instance is None else instance['name']
+        rows.append((name, run_weighted(solver_settings)))
+        rows += [(name, run_staged(solver_settings, slack)) for slack in args.slacks]
+
+    print(f"\n{'instance':<24}{'mode':<13}{'status':>10}{'time [s]':>10}{'objective':>12}{'balance':>10}"
+          f"{'rest':>10}{'gap':>8}  stages [s]")
+    for name, r in rows:
+        line = f"{name:<24}{r['mode']:<13}{r['status']:>10}"
+        if 'objective' in r:
+            line += (f"{r['wall_time']:>10.2f}{r['objective']:>12.0f}{r['balance']:>10}"
+                     f"{r['objective'] - r['balance']:>10.0f}{r['gap']:>8.2%}")
+        print(f"{line}  {r['stages']}")
+
+
+if __name__ == "__main__":
+    main()
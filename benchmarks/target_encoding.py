@@ -0,0 +1,63 @@
+# benchmarks/target_encoding.py
+# Compares the encodings of the squared target deviation (config.WEIGHTS['TARGET_DEVIATION_ENCODING']).
+# Run from the repository root:  python -m benchmarks.target_encoding --time-limit 60
+import argparse
+import time
+
+from ortools.sat.python import cp_model
+
+import config
+import optimizer
+
+ENCODINGS = ['multiplication', 'element', 'piecewise']
+
+
+def run_encoding(encoding, solver_settings, model_settings=None):
+    """Builds and solves the bundled instance with one encoding. Returns a result dict."""
+    original_weights = config.WEIGHTS
+    config.WEIGHTS = dict(original_weights, TARGET_DEVIATION_ENCODING=encoding)
+    try:
+        start = time.perf_counter()
+        solver, status, _ = optimizer.build_and_solve_model(
+            employees=config.EMPLOYEES,
+            unavailable_requests=config.MANUAL_REQUESTS,
+            manual_assignments=config.MANUAL_ASSIGNMENTS,
+            worked_last_sat_noon=config.WORKED_LAST_SAT_NOON,
+            worked_last_sat_night=config.WORKED_LAST_SAT_NIGHT,
+            solver_settings=solver_settings,
+            model_settings=model_settings
+        )
+        total_time = time.perf_counter() - start
+    finally:
+        config.WEIGHTS = original_weights
+
+    result = {'encoding': encoding, 'status': solver.StatusName(status), 'total_time': total_time}
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result.update(optimizer.get_solve_stats(solver))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark target-deviation encodings.")
+    parser.add_argument('--time-limit', type=float, default=60.0)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0])
+    parser.add_argument('--lean', action='store_true')
+    args = parser.parse_args()
+
+    model_settings = {'lean': True} if args.lean else None
+    print(f"{'encoding':<16}{'seed':>6}{'status':>10}{'solve [s]':>12}{'objective':>12}{'bound':>12}{'gap':>8}")
+    for encoding in ENCODINGS:
+        for seed in args.seeds:
+            solver_settings = {'max_time_seconds': args.time_limit, 'num_workers': args.workers,
+                               'random_seed': seed}
+            r = run_encoding(encoding, solver_settings, model_settings)
+            if 'objective' in r:
+                print(f"{encoding:<16}{seed:>6}{r['status']:>10}{r['wall_time']:>12.2f}"
+                      f"{r['objective']:>12.0f}{r['best_bound']:>12.0f}{r['gap']:>8.2%}")
+            else:
+                print(f"{encoding:<16}{seed:>6}{r['status']:>10}{r['total_time']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
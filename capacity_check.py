@@ -0,0 +1,214 @@
+# capacity_check.py
+import numpy as np
+
+import demand_calendar
+from config import DAY_NAMES_EN
+from optimizer import collect_blocked_cells
+
+SHIFT_NAMES = ["Morning", "Noon", "Night", "Reinforcement"]
+
+
+# ============================================================================
+# 1. Data Preparation
+# ============================================================================
+def day_name(d):
+    """Report label of planning day d; days after the first week also carry their week number."""
+    return DAY_NAMES_EN[d % 7] if d < 7 else f"{DAY_NAMES_EN[d % 7]} (week {d // 7 + 1})"
+
+
+def _demand_arrays(num_days, num_shifts):
+    """
+    Builds the per-(day, shift) demand matrices from the demand calendar.
+    Returns: (total, supervisor, skilled) int arrays of shape D x S
+    """
+    daily_demand = demand_calendar.build_daily_demand(num_days)
+    total = np.zeros((num_days, num_shifts), dtype=np.int64)
+    supervisor = np.zeros_like(total)
+    skilled = np.zeros_like(total)
+
+    for d in range(num_days):
+        daily_config = daily_demand[d]
+        for s in range(num_shifts):
+            reqs = daily_config.get(s, {})
+            req_guard = reqs.get('guard', 0)
+            req_controller = reqs.get('controller', 0)
+            req_supervisor = reqs.get('supervisor', 0)
+            total[d, s] = req_guard + req_controller + req_supervisor
+            supervisor[d, s] = req_supervisor
+            skilled[d, s] = req_controller + req_supervisor
+
+    return total, supervisor, skilled
+
+
+def _availability_array(employees, blocked_cells, num_days, num_shifts):
+    """Returns: bool array E x D x S, True where the employee may be assigned."""
+    available = np.ones((len(employees), num_days, num_shifts), dtype=bool)
+    for (e, d, s) in blocked_cells:
+        if 0 <= e < len(employees) and 0 <= d < num_days and 0 <= s < num_shifts:
+            available[e, d, s] = False
+    return available
+
+
+# ============================================================================
+# 2. Max-Flow Bound
+# ============================================================================
+def _max_flow(num_nodes, edges, source, sink):
+    """
+    Dinic max-flow on a small layered graph.
+    edges: list of (u, v, capacity). Returns: (flow value, residual capacity per edge)
+    """
+    graph = [[] for _ in range(num_nodes)]
+    to, cap = [], []
+    for u, v, c in edges:
+        # Forward edge at an even index, its reverse right after it
+        graph[u].append(len(to))
+        to.append(v)
+        cap.append(c)
+        graph[v].append(len(to))
+        to.append(u)
+        cap.append(0)
+
+    def bfs():
+        level = [-1] * num_nodes
+        level[source] = 0
+        queue = [source]
+        for u in queue:
+            for eid in graph[u]:
+                if cap[eid] > 0 and level[to[eid]] < 0:
+                    level[to[eid]] = level[u] + 1
+                    queue.append(to[eid])
+        return level
+
+    def dfs(u, pushed, level, it):
+        if u == sink:
+            return pushed
+        while it[u] < len(graph[u]):
+            eid = graph[u][it[u]]
+            v = to[eid]
+            if cap[eid] > 0 and level[v] == level[u] + 1:
+                got = dfs(v, min(pushed, cap[eid]), level, it)
+                if got > 0:
+                    cap[eid] -= got
+                    cap[eid ^ 1] += got
+                    return got
+            it[u] += 1
+        return 0
+
+    flow = 0
+    while True:
+        level = bfs()
+        if level[sink] < 0:
+            break
+        it = [0] * num_nodes
+        while True:
+            pushed = dfs(source, float('inf'), level, it)
+            if pushed == 0:
+                break
+            flow += pushed
+
+    # Residual capacity of the forward edges only, in input order
+    return flow, cap[0::2]
+
+
+def _flow_shortfall(available, max_shifts, demand, members):
+    """
+    Max-flow bound: employees (capacity max_shifts) -> employee-days (capacity 1, i.e. one
+    shift per day) -> (day, shift) slots (capacity demand) -> sink.
+    Returns: D x S array of demand left uncovered by a maximum flow (all zeros if coverable).
+    """
+    num_days, num_shifts = demand.shape
+    slots = [(d, s) for d in range(num_days) for s in range(num_shifts) if demand[d, s] > 0]
+    if not slots:
+        return np.zeros_like(demand)
+
+    source, sink = 0, 1
+    emp_node = {e: 2 + i for i, e in enumerate(members)}
+    day_base = 2 + len(members)
+    slot_base = day_base + len(members) * num_days
+    slot_node = {slot: slot_base + i for i, slot in enumerate(slots)}
+
+    edges = []
+    for i, e in enumerate(members):
+        edges.append((source, emp_node[e], int(min(max_shifts[e], num_days))))
+        for d in range(num_days):
+            day_node = day_base + i * num_days + d
+            edges.append((emp_node[e], day_node, 1))
+            for s in range(num_shifts):
+                if demand[d, s] > 0 and available[e, d, s]:
+                    edges.append((day_node, slot_node[(d, s)], 1))
+
+    sink_edge_start = len(edges)
+    for slot in slots:
+        edges.append((slot_node[slot], sink, int(demand[slot])))
+
+    _, residual = _max_flow(slot_base + len(slots), edges, source, sink)
+
+    shortfall = np.zeros_like(demand)
+    for i, slot in enumerate(slots):
+        shortfall[slot] = residual[sink_edge_start + i]
+    return shortfall
+
+
+# ============================================================================
+# 3. Main Entry Point
+# ============================================================================
+def check_capacity(employees, unavailable_requests, worked_last_sat_night, num_days, num_shifts):
+    """
+    Fast necessary-condition check that demand can be covered, run before the CP-SAT model
+    is built. Checks per-slot headcount, supervisor and skilled coverage against the available
+    pool, then a max-flow bound on capacity (max_shifts, one shift per day) for each role tier.
+    Returns: dict {'feasible': bool, 'issues': [dict(kind, day, shift, needed, available)]}
+    Per-slot issues are exact. For the max-flow issues the total shortfall is exact, but the
+    slots it is attributed to are one witness (another max flow may leave other slots short).
+    """
+    blocked = collect_blocked_cells(employees, unavailable_requests, worked_last_sat_night)
+    available = _availability_array(employees, blocked, num_days, num_shifts)
+    total, supervisor, skilled = _demand_arrays(num_days, num_shifts)
+
+    roles = np.array([emp.get('role', 'guard') for emp in employees])
+    is_supervisor = roles == 'supervisor'
+    is_skilled = np.isin(roles, ['supervisor', 'controller'])
+    max_shifts = np.array([emp.get('max_shifts', num_days) for emp in employees])
+
+    issues = []
+
+    # A. Per-slot headcount of available employees
+    checks = [
+        ('headcount', total, available.sum(axis=0)),
+        ('supervisor', supervisor, available[is_supervisor].sum(axis=0)),
+        ('skilled', skilled, available[is_skilled].sum(axis=0)),
+    ]
+    for kind, needed, pool in checks:
+        for d, s in zip(*np.nonzero(pool < needed)):
+            issues.append({'kind': kind, 'day': int(d), 'shift': int(s),
+                           'needed': int(needed[d, s]), 'available': int(pool[d, s])})
+
+    # B. Max-flow bounds (only if the per-slot checks passed, otherwise they are redundant)
+    if not issues:
+        tiers = [
+            ('capacity', total, np.arange(len(employees))),
+            ('supervisor capacity', supervisor, np.nonzero(is_supervisor)[0]),
+            ('skilled capacity', skilled, np.nonzero(is_skilled)[0]),
+        ]
+        for kind, needed, members in tiers:
+            shortfall = _flow_shortfall(available, max_shifts, needed, members)
+            for d, s in zip(*np.nonzero(shortfall)):
+                issues.append({'kind': kind, 'day': int(d), 'shift': int(s),
+                               'needed': int(needed[d, s]),
+                               'available': int(needed[d, s] - shortfall[d, s])})
+
+    return {'feasible': not issues, 'issues': issues}
+
+
+def print_capacity_report(report):
+    """Prints the slots that cannot be covered."""
+    if report['feasible']:
+        print("V Capacity pre-check passed.")
+        return
+
+    print(f"\n❌ Capacity pre-check failed: {len(report['issues'])} slot(s) cannot be covered.")
+    for issue in report['issues']:
+        day = day_name(issue['day'])
+        shift = SHIFT_NAMES[issue['shift']] if issue['shift'] < len(SHIFT_NAMES) else issue['shift']
+        print(f"   - {day} {shift}: {issue['kind']} needs {issue['needed']}, "
+              f"at most {issue['available']} can be covered")
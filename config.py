@@ -6,6 +6,133 @@
 ENABLE_IMAGE_PARSING = False
 IMAGE_FILENAME = "images/image3.png"
 
+# Fast capacity pre-check before building the model (skips the solver when demand
+# certainly cannot be covered)
+ENABLE_CAPACITY_CHECK = True
+
+# When the model is infeasible, re-solve with assumption literals per constraint
+# family and print a conflicting set (employee names and days)
+EXPLAIN_INFEASIBILITY = True
+
+# Write the Excel report with openpyxl's write-only mode and shared named styles
+# (same workbook, less time and memory for large sites / long horizons)
+EXCEL_WRITE_ONLY = False
+
+# ==========================================
+#         Solver Settings
+# ==========================================
+# Passed through to the CP-SAT solver. Any value can be overridden from the CLI
+# (see `python main.py --help`). None means "use the CP-SAT default".
+SOLVER_SETTINGS = {
+    'num_workers': 0,              # 0 = use all available cores
+    'max_time_seconds': None,      # Wall-clock budget for the search
+    'relative_gap_limit': None,    # e.g. 0.01 stops at a proven 1% gap
+    'random_seed': None,
+    'log_search_progress': False
+}
+
+# Anytime streaming: every improving solution is written as a rotating snapshot
+# so a planner can grab a "good enough" schedule and stop the search (Ctrl+C).
+STREAMING_SETTINGS = {
+    'enabled': False,
+    'snapshot_dir': "shift_schedule_output/snapshots",
+    'format': 'json',              # 'json' (lightweight) or 'xlsx'
+    'min_interval_seconds': 5.0,   # Rate limit between snapshot writes
+    'keep_last': 3                 # Number of rotating snapshots kept on disk
+}
+
+# Warm start: every solve dumps its solution to SOLUTION_DUMP_FILE. Point
+# WARM_START_FILE (or --warm-start) at last week's dump or output .xlsx to use it
+# as solution hints.
+SOLUTION_DUMP_FILE = "shift_schedule_output/last_solution.json"
+WARM_START_FILE = None
+# Without a warm start file, hint CP-SAT with the greedy draft (greedy_scheduler.py, --greedy-hint)
+WARM_START_GREEDY = False
+
+# Model-building options (see optimizer.build_model)
+MODEL_SETTINGS = {
+    # Lean mode: no variables for blocked cells, day sums instead of per-day
+    # "is working" BoolVars, one-sided implications for penalty literals.
+    'lean': False,
+    # Lexicographic ordering between fully interchangeable employees
+    'symmetry_breaking': False,
+    # Explicit employee x role-slot variables: the solver places every worker on a role
+    # and role fairness counts the roles actually filled (see benchmarks/role_slots.py)
+    'role_slots': False
+}
+
+# Rolling horizon (see rolling_horizon.py): long horizons are solved as overlapping
+# windows; the first commit_days of every window are fixed and the rest is re-planned
+# by the next window (overlap = window_days - commit_days).
+ROLLING_HORIZON_SETTINGS = {
+    'enabled': False,
+    'window_days': 14,
+    'commit_days': 7,
+    'window_time_limit': None   # Seconds per window (None = SOLVER_SETTINGS['max_time_seconds'])
+}
+
+# Large Neighborhood Search (see lns.py): after a short initial solve, most of the schedule
+# is fixed and one neighborhood ('day', 'role', 'worst_employees', 'shift') is re-optimized.
+LNS_SETTINGS = {
+    'enabled': False,
+    'initial_time_limit': 10.0,      # Seconds for the first solution (full model), part of time_limit
+    'neighborhood_time_limit': 2.0,  # Seconds per neighborhood
+    'time_limit': 120.0,             # Total budget incl. the initial solve (--time-limit overrides)
+    'max_iterations': None,
+    'neighborhoods': ['day', 'role', 'worst_employees', 'shift'],
+    'worst_employees': 5,            # Employees freed by the 'worst_employees' neighborhood
+    'seed': 0
+}
+
+# Role-tier decomposition (see role_decomposition.py): supervisors and controllers are solved
+# first against the skilled demand, then the guards fill the remaining headcount, then an
+# optional repair pass re-solves the joint model from the combined schedule.
+# SOLVER_SETTINGS['max_time_seconds'] (--time-limit) is the total budget of all these solves.
+ROLE_DECOMPOSITION_SETTINGS = {
+    'enabled': False,
+    'tier_time_limit': None,    # Cap in seconds per tier solve (None = share of max_time_seconds only)
+    'max_rounds': 3,            # Skilled/guard rounds while the guards cannot fill the rest
+    'repair': True,             # Final pass on the joint model, hinted with the tiers' schedule
+    'repair_time_limit': 10.0   # Cap in seconds for the repair pass (None = what is left of the budget)
+}
+
+# Solver portfolio (see portfolio.py): the model is solved with every configuration in its
+# own process; the first proven result wins, otherwise the best one at max_time_seconds.
+# A configuration is a name plus CP-SAT parameters (enum values by name).
+PORTFOLIO_SETTINGS = {
+    'enabled': False,
+    'configurations': [
+        {'name': 'default', 'random_seed': 0},
+        {'name': 'seed_1', 'random_seed': 1},
+        {'name': 'linearization_2', 'random_seed': 2, 'linearization_level': 2},
+        {'name': 'core', 'random_seed': 3, 'optimize_with_core': True},
+        {'name': 'pseudo_cost', 'random_seed': 4, 'search_branching': 'PSEUDO_COST_SEARCH'},
+    ],
+    'workers_per_solve': None,   # CP-SAT workers per configuration (None = num_workers / configurations)
+    'start_method': None,        # multiprocessing start method (None = platform default)
+    'log_file': "shift_schedule_output/portfolio_log.jsonl"  # Winner per run, one JSON line
+}
+
+# Staged (lexicographic) objective (see optimizer.solve_staged): stage 1 minimizes only the
+# dominant balance terms (target deviation, MAX_SHIFTS excess); stage 2 keeps them within
+# slack of the stage-1 value and minimizes the full weighted sum, hinted with stage 1.
+STAGED_OBJECTIVE_SETTINGS = {
+    'enabled': False,
+    'stage1_time_fraction': 0.5,  # Share of max_time_seconds for stage 1; stage 2 gets the rest
+    'stage2_min_time': 2.0,       # Seconds stage 2 gets at least (may exceed max_time_seconds)
+    'slack': 0,                   # Absolute slack on the stage-1 balance cost
+    'relative_slack': 0.0         # Relative slack, e.g. 0.02 = 2% (the larger of both is used)
+}
+
+# Per-stage timing of the pipeline (see profiling.py). Stage names: image_parsing,
+# capacity_check, warm_start, build, build.init, build.role_demand, ..., solve, excel.
+PROFILING_SETTINGS = {
+    'enabled': False,         # Print the summary table at the end of the run
+    'jsonl_path': None,       # Also append one JSON line per stage to this file
+    'capture_stage': None,    # Stage to capture in depth, e.g. 'build.objective'
+    'capture_mode': 'cprofile'  # 'cprofile' or 'tracemalloc'
+}
+
 # ==========================================
 #         Shift Rules & Weights
 # ==========================================
@@ -14,9 +141,24 @@ SHIFT_NOON = 1
 SHIFT_NIGHT = 2
 SHIFT_REINFORCEMENT = 3
 
-NUM_DAYS = 7
+NUM_DAYS = 7  # Planning horizon, any length (e.g. 28-35 to plan a month in one solve)
 NUM_SHIFTS = 4
 
+# Day names, Sunday first like the schedule: Hebrew for the report, English for console output
+DAY_NAMES = ["ראשון", "שני", "שלישי", "רביעי", "חמישי", "שישי", "שבת"]
+DAY_NAMES_EN = ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
+
+ROLE_ORDER = ['supervisor', 'controller', 'guard']  # Most capable first; a role can fill every later one
+
+# Planning calendar (see demand_calendar.py). Day 0 is SCHEDULE_START_DATE ('YYYY-MM-DD'),
+# or a Sunday when no date is set; Friday/Saturday use WEEKEND_DEMAND.
+SCHEDULE_START_DATE = None
+# Per-date demand overrides, e.g. holidays: {'2026-12-25': 'weekend'} or a full {shift: reqs} table
+DEMAND_OVERRIDES = {}
+
+# Labor law: no more than this many consecutive work days (sliding window, history included)
+MAX_CONSECUTIVE_DAYS = 6
+
 # Optimization Weights
 WEIGHTS = {
     'TARGET_SHIFTS': 50,
@@ -29,7 +171,20 @@ WEIGHTS = {
     'CONSECUTIVE_NIGHTS': 20,
     'MIN_NIGHTS': 5,
     'MIN_MORNINGS': 4,
-    'MIN_EVENINGS': 2
+    'MIN_EVENINGS': 2,
+
+    # Encoding of the squared target deviation:
+    # 'multiplication' (AddMultiplicationEquality), 'element' (squares lookup table)
+    # or 'piecewise' (convex sum of unit steps). All yield the same penalty.
+    'TARGET_DEVIATION_ENCODING': 'multiplication',
+
+    # Encoding of the sequence penalties (3 nights, rest gaps, 8-8-8 chains):
+    # 'reified' (one BoolVar per pattern and time slot) or 'day_cost' (one cost variable per
+    # employee and day, bounded by linear cuts; about half the variables, the compact encoding).
+    # 'automaton' is experimental: day_cost plus an AddAutomaton per employee that keeps the cost
+    # exact in every solution. It is larger than day_cost and solves much slower (bundled week
+    # 15-20x). All yield the same optimal penalty; see benchmarks/sequence_encoding.py.
+    'SEQUENCE_ENCODING': 'reified'
 }
 
 
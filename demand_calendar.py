@@ -0,0 +1,104 @@
+# demand_calendar.py
+import datetime
+import math
+
+import config
+from config import DAY_NAMES
+
+WEEKEND_DAYS = (5, 6)  # Friday and Saturday, counted from Sunday = 0
+DAY_TYPE_TABLES = {'weekday': 'WEEKDAY_DEMAND', 'weekend': 'WEEKEND_DEMAND'}
+
+
+# ============================================================================
+# 1. Dates & Day Types
+# ============================================================================
+def horizon_dates(num_days, start_date=None):
+    """
+    Calendar date of every planning day, or None per day when no start date is set.
+    start_date: datetime.date or 'YYYY-MM-DD' (defaults to config.SCHEDULE_START_DATE).
+    """
+    start_date = config.SCHEDULE_START_DATE if start_date is None else start_date
+    if start_date is None:
+        return [None] * num_days
+    if isinstance(start_date, str):
+        start_date = datetime.date.fromisoformat(start_date)
+    return [start_date + datetime.timedelta(days=d) for d in range(num_days)]
+
+
+def _sunday_based_weekday(d, date):
+    """0 = Sunday ... 6 = Saturday; without a date, day 0 is a Sunday."""
+    return (date.weekday() + 1) % 7 if date is not None else d % 7
+
+
+def day_types(num_days, start_date=None, overrides=None):
+    """
+    Day type per planning day: 'weekday' or 'weekend' from the weekday, or the override of
+    that date (a day type or a full {shift: reqs} demand table, e.g. for holidays).
+    overrides: {'YYYY-MM-DD': ...}, defaults to config.DEMAND_OVERRIDES.
+    """
+    overrides = config.DEMAND_OVERRIDES if overrides is None else overrides
+    types = []
+    for d, date in enumerate(horizon_dates(num_days, start_date)):
+        if date is not None and date.isoformat() in overrides:
+            types.append(overrides[date.isoformat()])
+            continue
+        types.append('weekend' if _sunday_based_weekday(d, date) in WEEKEND_DAYS else 'weekday')
+    return types
+
+
+def day_labels(num_days, start_date=None):
+    """Column headers of the schedule: the weekday name, plus the date when one is set."""
+    labels = []
+    for d, date in enumerate(horizon_dates(num_days, start_date)):
+        name = DAY_NAMES[_sunday_based_weekday(d, date)]
+        labels.append(f"{name} {date:%d/%m}" if date is not None else name)
+    return labels
+
+
+# ============================================================================
+# 2. Daily Demand
+# ============================================================================
+def build_daily_demand(num_days=None, start_date=None, overrides=None):
+    """
+    Demand table of every planning day: WEEKDAY_DEMAND / WEEKEND_DEMAND by day type, or the
+    override table of that date. Tables are read from config at call time, so instances
+    installed with instance_io.apply_instance are picked up.
+    Returns: list (one entry per day) of {shift: {'guard': n, 'controller': n, 'supervisor': n}}
+    """
+    num_days = config.NUM_DAYS if num_days is None else num_days
+    daily_demand = []
+    for day_type in day_types(num_days, start_date, overrides):
+        if isinstance(day_type, dict):
+            daily_demand.append(day_type)
+        else:
+            daily_demand.append(getattr(config, DAY_TYPE_TABLES[day_type]))
+    return daily_demand
+
+
+# ============================================================================
+# 3. Employee Limits
+# ============================================================================
+HORIZON_LIMIT_KEYS = ['target_shifts', 'max_shifts', 'max_mornings', 'min_mornings',
+                      'max_evenings', 'min_evenings', 'max_nights', 'min_nights']
+
+
+def scale_to_horizon(weekly_value, num_days):
+    """Converts a per-week limit to the planning horizon (values are absolute for the horizon)."""
+    return int(math.ceil(weekly_value * num_days / 7))
+
+
+def scale_employees_to_horizon(employees, num_days):
+    """
+    Copies of the employee dicts with their weekly limits (config.EMPLOYEES) converted to the
+    horizon; unchanged for a 7-day horizon. max_shifts never exceeds one shift per day.
+    """
+    scaled = []
+    for emp in employees:
+        emp = dict(emp)
+        for key in HORIZON_LIMIT_KEYS:
+            if key in emp:
+                emp[key] = scale_to_horizon(emp[key], num_days)
+        if 'max_shifts' in emp:
+            emp['max_shifts'] = min(num_days, emp['max_shifts'])
+        scaled.append(emp)
+    return scaled
@@ -1,5 +1,58 @@
+from collections import deque
+
+import numpy as np
 import openpyxl
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill, Font, Alignment, Border, Side, NamedStyle
+
+from config import DAY_NAMES, ROLE_ORDER
+
+
+# Table layout of the Schedule sheet (one entry per row).
+# Also used by solution_io to read a schedule back from a generated workbook.
+SCHEDULE_LAYOUT = [
+    # --- Building 15 ---
+    {"title": "בניין 15", "is_header": True},
+    {"time": "בוקר", "role": "קבלה", "shift": 0, "role_needed": "guard"},
+    {"time": "", "role": "סייר", "shift": 0, "role_needed": "guard"},
+    {"time": "", "role": "אחמ\"ש", "shift": 3, "role_needed": "supervisor"},
+    {"is_spacer": True},
+    {"time": "צהריים", "role": "קבלה", "shift": 1, "role_needed": "guard"},
+    {"time": "", "role": "סייר", "shift": 1, "role_needed": "guard"},
+    {"is_spacer": True},
+    {"time": "לילה", "role": "קבלה", "shift": 2, "role_needed": "guard"},
+    {"time": "", "role": "סייר", "shift": 2, "role_needed": "guard"},
+
+    # --- Building 18 ---
+    {"title": "בניין 18", "is_header": True},
+
+    # Morning
+    {"time": "בוקר", "role": "קבלה", "shift": 0, "role_needed": "guard"},
+    {"time": "", "role": "בקרה", "shift": 0, "role_needed": "controller"},
+    {"time": "", "role": "אחמ\"ש", "shift": 0, "role_needed": "supervisor"},
+    # New row added for the 4th guard (Patrol/Sayer)
+    {"time": "", "role": "סייר", "shift": 0, "role_needed": "guard"},
+
+    # Reinforcement / Special (07-18)
+    {"time": "", "role": "סייר (7-18)", "shift": 3, "role_needed": "guard"},
+    {"time": "", "role": "מאבטח 1 (7-18)", "shift": 3, "role_needed": "guard"},
+    {"time": "", "role": "מאבטח 2 (7-18)", "shift": 3, "role_needed": "guard"},
+    {"is_spacer": True},
+
+    # Noon
+    {"time": "צהריים", "role": "קבלה", "shift": 1, "role_needed": "guard"},
+    {"time": "", "role": "בקרה", "shift": 1, "role_needed": "controller"},
+    {"time": "", "role": "אחמ\"ש", "shift": 1, "role_needed": "supervisor"},
+    # New row added for the 4th guard (Patrol/Sayer)
+    {"time": "", "role": "סייר", "shift": 1, "role_needed": "guard"},
+
+    {"is_spacer": True},
+
+    # Night
+    {"time": "לילה", "role": "קבלה", "shift": 2, "role_needed": "guard"},
+    {"time": "", "role": "בקרה", "shift": 2, "role_needed": "controller"},
+    {"time": "", "role": "סייר", "shift": 2, "role_needed": "guard"},
+]
 
 
 # ============================================================================
@@ -40,95 +93,248 @@ def _setup_styles():
 # ============================================================================
 # 2. Logic Helpers
 # ============================================================================
-def _get_shift_counts(solver, shift_vars, employees, num_days, num_shifts):
+def _get_shift_counts(solution):
     """
-    Calculates the raw number of shifts assigned to each employee by the solver.
+    Calculates the raw number of shifts assigned to each employee.
+    Returns: dict {emp_idx: {shift_idx: int}}
     """
-    counts = {i: {s: 0 for s in range(num_shifts)} for i in range(len(employees))}
-    for e_idx in range(len(employees)):
-        for d in range(num_days):
-            for s in range(num_shifts):
-                if solver.Value(shift_vars[(e_idx, d, s)]):
-                    counts[e_idx][s] += 1
-    return counts
-
-
-def _get_employee_rank(employees, emp_idx):
-    """Helper to sort employees by rank: Supervisor > Controller > Guard"""
-    r = employees[emp_idx].get('role', 'guard')
-    if r == 'supervisor': return 3
-    if r == 'controller': return 2
-    return 1
+    per_shift = solution.sum(axis=1).tolist()  # (E, S)
+    return {e_idx: dict(enumerate(row)) for e_idx, row in enumerate(per_shift)}
 
 
-def _calculate_penalty_counts(solver, shift_vars, employees, num_days, num_shifts):
+def _calculate_penalty_counts(solution):
     """
     Scans the solution to count specific violations per employee.
     Returns: dict {emp_idx: {'chain_3': int, 'rest_gap': int, 'consecutive_nights': int}}
     """
-    penalties = {i: {'chain_3': 0, 'rest_gap': 0, 'consecutive_nights': 0} for i in range(len(employees))}
+    work = solution.astype(bool)
+    noon = work[:, :, 1]
+    night = work[:, :, 2]
+    # Morning (0) OR Reinforcement (3): both start early
+    morn_reinf = work[:, :, 0] | work[:, :, 3]
+
+    # 1. Consecutive Nights (3 in a row)
+    consecutive_nights = (night[:, :-2] & night[:, 1:-1] & night[:, 2:]).sum(axis=1)
+
+    # 2. Rest Gaps (8-8 Patterns)
+    # A. Same Day: Morning/Reinf -> Night
+    # B. Next Day: Noon -> Morning/Reinf
+    # C. Next Day: Night -> Noon
+    rest_gap = ((morn_reinf & night).sum(axis=1)
+                + (noon[:, :-1] & morn_reinf[:, 1:]).sum(axis=1)
+                + (night[:, :-1] & noon[:, 1:]).sum(axis=1))
+
+    # 3. Chain 3 (The 8-8-8 Patterns)
+    # A: (Morn/Reinf D) -> (Night D) -> (Noon D+1)
+    # B: (Noon D) -> (Morn/Reinf D+1) -> (Night D+1)
+    # C: (Night D) -> (Noon D+1) -> (Morn/Reinf D+2)
+    chain_3 = ((morn_reinf[:, :-1] & night[:, :-1] & noon[:, 1:]).sum(axis=1)
+               + (noon[:, :-1] & morn_reinf[:, 1:] & night[:, 1:]).sum(axis=1)
+               + (night[:, :-2] & noon[:, 1:-1] & morn_reinf[:, 2:]).sum(axis=1))
+
+    return {
+        e: {'chain_3': int(chain_3[e]), 'rest_gap': int(rest_gap[e]), 'consecutive_nights': int(consecutive_nights[e])}
+        for e in range(solution.shape[0])
+    }
+
+
+CLOSED = 'closed'  # Schedule cell that is not staffed (weekend reinforcement / supervisor rows)
+
+
+def _is_closed(row_def, d, daily_demand=None):
+    """
+    A row is closed on a day whose demand has no staff for its shift, or no supervisor for a
+    supervisor row. Without a demand calendar days 5/6 of every week are the weekend.
+    """
+    if daily_demand is None:
+        is_weekend = (d % 7 >= 5)
+        return is_weekend and (row_def["shift"] == 3 or "אחמ\"ש" in row_def["role"])
+    reqs = daily_demand[d].get(row_def["shift"], {})
+    return sum(reqs.values()) == 0 or (row_def["role_needed"] == 'supervisor' and reqs.get('supervisor', 0) == 0)
+
+
+def _day_headers(num_days, day_labels=None):
+    """Schedule column headers: the given labels, or the weekday names repeated per week."""
+    return list(day_labels) if day_labels is not None else [DAY_NAMES[d % 7] for d in range(num_days)]
+
+
+def _match_slot(employee_ids, row_roles, employees, placed_roles=None):
+    """
+    Assigns the employees working one (day, shift) to that slot's layout rows.
+    Since capabilities are nested (supervisor ⊂ controller ⊂ guard), filling the most
+    demanding rows first, each with the least capable employee that qualifies, yields a
+    maximum matching in O(rows + employees).
+    row_roles: role_needed of each open row, in layout order.
+    placed_roles (role-slot model): the role the solver gave each employee, used instead of
+    the employee's own role so every row gets exactly the employee placed on that role.
+    Returns: (emp_idx or None per row, employees left without a row)
+    """
+    pools = {role: deque() for role in ROLE_ORDER}
+    for i, e in enumerate(employee_ids):
+        role = placed_roles[i] if placed_roles is not None else employees[e].get('role', 'guard')
+        pools[role if role in pools else 'guard'].append(e)
+
+    assignment = [None] * len(row_roles)
+    for level, role in enumerate(ROLE_ORDER):
+        for i, role_needed in enumerate(row_roles):
+            if role_needed != role:
+                continue
+            for pool_role in reversed(ROLE_ORDER[:level + 1]):
+                if pools[pool_role]:
+                    assignment[i] = pools[pool_role].popleft()
+                    break
+
+    unplaced = [e for role in ROLE_ORDER for e in pools[role]]
+    return assignment, unplaced
+
+
+def _fill_schedule_rows(solution, employees, roles=None, daily_demand=None):
+    """
+    Matches the assigned employees of every (day, shift) to the SCHEDULE_LAYOUT rows.
+    roles (optional): (E, D, S) ROLE_ORDER indices placed by the role-slot model.
+    daily_demand (optional): demand table per day, decides which rows are closed.
+    Returns: (rows, role_fill_counts, unmatched)
+        rows: one entry per layout row, the layout dict plus 'cells', a list per day
+              of emp_idx / None (empty) / CLOSED.
+        unmatched: {'rows': [(d, layout_idx)] supervisor/controller rows left empty,
+                    'employees': [(e, d, s)] assigned employees without a row}
+    """
+    num_days, num_shifts = solution.shape[1], solution.shape[2]
+    # Employees working each (day, shift), indexed once instead of per layout row
+    assigned_by_slot = {(d, s): np.flatnonzero(solution[:, d, s]).tolist()
+                        for d in range(num_days) for s in range(num_shifts)}
+
+    rows = []
+    rows_by_shift = {}
+    for idx, row_def in enumerate(SCHEDULE_LAYOUT):
+        if row_def.get("is_header") or row_def.get("is_spacer"):
+            rows.append(row_def)
+            continue
+        rows.append(dict(row_def, cells=[CLOSED if _is_closed(row_def, d, daily_demand) else None
+                                         for d in range(num_days)]))
+        rows_by_shift.setdefault(row_def["shift"], []).append(idx)
+
+    role_fill_counts = {i: {'supervisor': 0, 'controller': 0, 'guard': 0} for i in range(len(employees))}
+    unmatched = {'rows': [], 'employees': []}
+
+    for (d, s), employee_ids in assigned_by_slot.items():
+        open_rows = [idx for idx in rows_by_shift.get(s, []) if rows[idx]["cells"][d] != CLOSED]
+        placed_roles = [ROLE_ORDER[roles[e, d, s]] for e in employee_ids] if roles is not None else None
+        assignment, unplaced = _match_slot(employee_ids, [rows[idx]["role_needed"] for idx in open_rows], employees,
+                                           placed_roles)
+
+        for idx, e in zip(open_rows, assignment):
+            role_needed = rows[idx]["role_needed"]
+            if e is None:
+                if role_needed != 'guard':
+                    unmatched['rows'].append((d, idx))
+                continue
+            rows[idx]["cells"][d] = e
+            role_fill_counts[e][role_needed] += 1
+        unmatched['employees'].extend((e, d, s) for e in unplaced)
+
+    return rows, role_fill_counts, unmatched
+
+
+def _print_matching_report(unmatched, employees, max_lines=10):
+    """Warns about role rows that stay empty and assigned employees missing from the sheet."""
+    if not unmatched['rows'] and not unmatched['employees']:
+        return
+    print(f"⚠️ Schedule sheet: {len(unmatched['rows'])} role rows empty, "
+          f"{len(unmatched['employees'])} assigned employees without a row.")
+    lines = []
+    for d, idx in sorted(unmatched['rows']):
+        row_def = SCHEDULE_LAYOUT[idx]
+        lines.append(f"Day {d} ({DAY_NAMES[d % 7]}), shift {row_def['shift']}: no qualified employee "
+                     f"for the {row_def['role_needed']} row")
+    for e, d, s in sorted(unmatched['employees'], key=lambda item: (item[1], item[2], item[0])):
+        lines.append(f"Day {d} ({DAY_NAMES[d % 7]}), shift {s}: {employees[e]['name']} has no free row")
+
+    for line in lines[:max_lines]:
+        print(f"   - {line}")
+    if len(lines) > max_lines:
+        print(f"   ... and {len(lines) - max_lines} more")
+
+
+def _stats_rows(employees, shift_counts):
+    """
+    Rows of the general shift count table.
+    Returns: (rows, totals); each row is (values, alert style key or None).
+    """
+    rows = []
+    totals = [0, 0, 0, 0, 0, 0]
 
-    # Helper lambda to check if working specific shift
-    is_working = lambda e, d, s: solver.Value(shift_vars[(e, d, s)]) == 1
+    for e_idx, emp in enumerate(employees):
+        counts = shift_counts[e_idx]
+        total = sum(counts.values())
+        target = emp.get('target_shifts', 0)
 
-    # Helper: Check if working Morning (0) OR Reinforcement (3)
-    def is_morn_reinf(e, d):
-        if d >= num_days: return False
-        # Assuming Shift 0 is Morning and Shift 3 is Reinforcement (Morning overlap)
-        return is_working(e, d, 0) or is_working(e, d, 3)
+        totals[0] += counts[0];
+        totals[1] += counts[1];
+        totals[2] += counts[2];
+        totals[3] += counts[3]
+        totals[4] += total;
+        totals[5] += target
 
-    for e in range(len(employees)):
+        row_data = [emp['name'], counts[0], counts[1], counts[2], counts[3], total, target]
 
-        # 1. Count Consecutive Nights (3 in a row)
-        for d in range(num_days - 2):
-            if is_working(e, d, 2) and is_working(e, d + 1, 2) and is_working(e, d + 2, 2):
-                penalties[e]['consecutive_nights'] += 1
+        fill = None
+        diff = target - total
+        if diff < 0:
+            fill = 'alert_green'
+        elif diff > 2:
+            fill = 'alert_red'
+        if counts[2] > 2: fill = 'alert_orange'
+        rows.append((row_data, fill))
 
-        # 2. Count Rest Gaps (8-8 Patterns)
-        # We explicitly check for the "Bad Combinations" of shifts that result in 8h rest only.
-        # Combinations:
-        # A. Same Day: Morning/Reinf -> Night
-        # B. Next Day: Noon -> Morning/Reinf
-        # C. Next Day: Night -> Noon
+    return rows, totals
 
-        for d in range(num_days):
-            # A. Same Day: Start Early (0/3) -> End Late (2)
-            if is_morn_reinf(e, d) and is_working(e, d, 2):
-                penalties[e]['rest_gap'] += 1
 
-            # Check Transitions to Next Day
-            if d < num_days - 1:
-                # B. Noon (1) -> Next Morning/Reinf (0/3)
-                if is_working(e, d, 1) and is_morn_reinf(e, d + 1):
-                    penalties[e]['rest_gap'] += 1
+def _special_rows(employees, role_fill_counts):
+    """Rows of the unified special shifts table: (values, alert style key or None)."""
+    rows = []
+    for e_idx, emp in enumerate(employees):
+        role = emp.get('role', 'guard')
+        if role not in ['supervisor', 'controller']:
+            continue
 
-                # C. Night (2) -> Next Noon (1)
-                if is_working(e, d, 2) and is_working(e, d + 1, 1):
-                    penalties[e]['rest_gap'] += 1
+        role_display = "אחמ\"ש" if role == 'supervisor' else "בקר"
+        sup_count = role_fill_counts[e_idx]['supervisor']
+        ctrl_count = role_fill_counts[e_idx]['controller']
+        total_special = sup_count + ctrl_count
+        target = emp.get('target_shifts', 0)
 
-        # 3. Count Chain 3 (The 8-8-8 Patterns: A, B, C)
-        for d in range(num_days - 1):
-            # Pattern A: (Morn/Reinf D) -> (Night D) -> (Noon D+1)
-            if is_morn_reinf(e, d) and is_working(e, d, 2) and is_working(e, d + 1, 1):
-                penalties[e]['chain_3'] += 1
+        row_data = [emp['name'], role_display, sup_count, ctrl_count, total_special, target]
 
-            # Pattern B: (Noon D) -> (Morn/Reinf D+1) -> (Night D+1)
-            if is_working(e, d, 1) and is_morn_reinf(e, d + 1) and is_working(e, d + 1, 2):
-                penalties[e]['chain_3'] += 1
+        fill = None
+        if total_special == target:
+            fill = 'alert_green'
+        elif abs(total_special - target) >= 2:
+            fill = 'alert_red'
+        rows.append((row_data, fill))
+    return rows
 
-            # Pattern C: (Night D) -> (Noon D+1) -> (Morn/Reinf D+2)
-            if d < num_days - 2:
-                if is_working(e, d, 2) and is_working(e, d + 1, 1) and is_morn_reinf(e, d + 2):
-                    penalties[e]['chain_3'] += 1
 
-    return penalties
+def _penalty_rows(employees, penalty_data):
+    """Rows of the penalty report, only for employees with at least one penalty."""
+    rows = []
+    for e_idx, emp in enumerate(employees):
+        p = penalty_data[e_idx]
+        if p['chain_3'] + p['rest_gap'] + p['consecutive_nights'] > 0:
+            rows.append([emp['name'], p['chain_3'], p['rest_gap'], p['consecutive_nights']])
+    return rows
 
 
 # ============================================================================
 # 3. Sheet Generators
 # ============================================================================
-def _create_schedule_sheet(wb, styles, solver, shift_vars, employees, num_days, colors):
-    """Generates the main 'Schedule' sheet."""
+def _filled(values):
+    """Number of cells a row of values fills (None leaves the cell empty)."""
+    return sum(1 for v in values if v is not None)
+
+
+def _create_schedule_sheet(wb, styles, schedule_rows, employees, colors, day_headers):
+    """Generates the main 'Schedule' sheet (one column per planning day). Returns: cells filled."""
     ws = wb.active
     ws.title = "Schedule"
     ws.sheet_view.rightToLeft = True
@@ -136,72 +342,26 @@ def _create_schedule_sheet(wb, styles, solver, shift_vars, employees, num_days,
     # --- Headers ---
     ws.cell(row=1, column=1).value = "זמן"
     ws.cell(row=1, column=2).value = "תפקיד"
-    days_names = ["ראשון", "שני", "שלישי", "רביעי", "חמישי", "שישי", "שבת"]
+    written = 2 + _filled(day_headers)
 
-    for i, day in enumerate(days_names):
+    for i, day in enumerate(day_headers):
         c = ws.cell(row=1, column=i + 3)
         c.value = day
         c.font = styles['header_font']
         c.fill = styles['header_fill']
         c.alignment = styles['center']
 
-    # Define the Table Layout
-    layout = [
-        # --- Building 15 ---
-        {"title": "בניין 15", "is_header": True},
-        {"time": "בוקר", "role": "קבלה", "shift": 0, "role_needed": "guard"},
-        {"time": "", "role": "סייר", "shift": 0, "role_needed": "guard"},
-        {"time": "", "role": "אחמ\"ש", "shift": 3, "role_needed": "supervisor"},
-        {"is_spacer": True},
-        {"time": "צהריים", "role": "קבלה", "shift": 1, "role_needed": "guard"},
-        {"time": "", "role": "סייר", "shift": 1, "role_needed": "guard"},
-        {"is_spacer": True},
-        {"time": "לילה", "role": "קבלה", "shift": 2, "role_needed": "guard"},
-        {"time": "", "role": "סייר", "shift": 2, "role_needed": "guard"},
-
-        # --- Building 18 ---
-        {"title": "בניין 18", "is_header": True},
-
-        # Morning
-        {"time": "בוקר", "role": "קבלה", "shift": 0, "role_needed": "guard"},
-        {"time": "", "role": "בקרה", "shift": 0, "role_needed": "controller"},
-        {"time": "", "role": "אחמ\"ש", "shift": 0, "role_needed": "supervisor"},
-        # New row added for the 4th guard (Patrol/Sayer)
-        {"time": "", "role": "סייר", "shift": 0, "role_needed": "guard"},
-
-        # Reinforcement / Special (07-18)
-        {"time": "", "role": "סייר (7-18)", "shift": 3, "role_needed": "guard"},
-        {"time": "", "role": "מאבטח 1 (7-18)", "shift": 3, "role_needed": "guard"},
-        {"time": "", "role": "מאבטח 2 (7-18)", "shift": 3, "role_needed": "guard"},
-        {"is_spacer": True},
-
-        # Noon
-        {"time": "צהריים", "role": "קבלה", "shift": 1, "role_needed": "guard"},
-        {"time": "", "role": "בקרה", "shift": 1, "role_needed": "controller"},
-        {"time": "", "role": "אחמ\"ש", "shift": 1, "role_needed": "supervisor"},
-        # New row added for the 4th guard (Patrol/Sayer)
-        {"time": "", "role": "סייר", "shift": 1, "role_needed": "guard"},
-
-        {"is_spacer": True},
-
-        # Night
-        {"time": "לילה", "role": "קבלה", "shift": 2, "role_needed": "guard"},
-        {"time": "", "role": "בקרה", "shift": 2, "role_needed": "controller"},
-        {"time": "", "role": "סייר", "shift": 2, "role_needed": "guard"},
-    ]
-
     current_row = 2
-    used_assignments = set()
-    role_fill_counts = {i: {'supervisor': 0, 'controller': 0, 'guard': 0} for i in range(len(employees))}
 
-    for row_def in layout:
+    for row_def in schedule_rows:
         if row_def.get("is_header"):
-            ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=9)
+            ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(day_headers) + 2)
             c = ws.cell(row=current_row, column=1)
             c.value = row_def["title"]
             c.font = Font(bold=True, size=12)
             c.fill = styles['sub_header_fill']
             c.alignment = styles['center']
+            written += 1
             current_row += 1
             continue
 
@@ -219,61 +379,29 @@ def _create_schedule_sheet(wb, styles, solver, shift_vars, employees, num_days,
         role_c.value = row_def["role"]
         role_c.border = styles['border']
         role_c.alignment = styles['right']
+        written += _filled([row_def["time"], row_def["role"]])
 
-        shift_idx = row_def["shift"]
-        role_needed = row_def["role_needed"]
-
-        for d in range(num_days):
+        for d, assigned_emp in enumerate(row_def["cells"]):
             cell = ws.cell(row=current_row, column=d + 3)
             cell.border = styles['border']
             cell.alignment = styles['center']
 
-            is_weekend = (d >= 5)
-            skip = False
-            if is_weekend and (shift_idx == 3 or "אחמ\"ש" in row_def["role"]):
+            if assigned_emp == CLOSED:
                 cell.fill = PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid")
-                skip = True
-
-            if not skip:
-                candidates = [e for e in range(len(employees)) if solver.Value(shift_vars[(e, d, shift_idx)])]
-
-                if role_needed == 'guard':
-                    candidates.sort(key=lambda x: _get_employee_rank(employees, x))
-                elif role_needed == 'controller':
-                    candidates.sort(key=lambda x: (0 if _get_employee_rank(employees, x) == 2 else 1))
-
-                assigned_emp = None
-                for cand_idx in candidates:
-                    if (d, cand_idx) in used_assignments: continue
-
-                    emp_role = employees[cand_idx].get('role', 'guard')
-                    is_match = False
-                    if role_needed == 'guard':
-                        is_match = True
-                    elif role_needed == 'controller' and emp_role in ['controller', 'supervisor']:
-                        is_match = True
-                    elif role_needed == 'supervisor' and emp_role == 'supervisor':
-                        is_match = True
-
-                    if is_match:
-                        assigned_emp = cand_idx
-                        used_assignments.add((d, cand_idx))
-                        role_fill_counts[assigned_emp][role_needed] += 1
-                        break
-
-                if assigned_emp is not None:
-                    name = employees[assigned_emp]['name']
-                    c_code = colors[assigned_emp] if assigned_emp < len(colors) else "FFFFFF"
-                    cell.value = name
-                    cell.fill = PatternFill(start_color=c_code, end_color=c_code, fill_type="solid")
+            elif assigned_emp is not None:
+                name = employees[assigned_emp]['name']
+                c_code = colors[assigned_emp] if assigned_emp < len(colors) else "FFFFFF"
+                cell.value = name
+                cell.fill = PatternFill(start_color=c_code, end_color=c_code, fill_type="solid")
+                written += 1
 
         current_row += 1
 
-    return role_fill_counts
+    return written
 
 
 def _create_stats_sheet(wb, styles, employees, shift_counts, role_fill_counts):
-    """Generates the 'Statistics' sheet."""
+    """Generates the 'Statistics' sheet. Returns: cells filled."""
     ws = wb.create_sheet("סטטיסטיקות")
     ws.sheet_view.rightToLeft = True
 
@@ -284,6 +412,7 @@ def _create_stats_sheet(wb, styles, employees, shift_counts, role_fill_counts):
     row += 1
 
     headers = ["שם העובד", "בוקר", "צהריים", "לילה", "תגבור", 'סה"כ כללי', 'יעד']
+    written = 1 + len(headers)
     for idx, h in enumerate(headers, 1):
         c = ws.cell(row=row, column=idx)
         c.value = h
@@ -293,36 +422,15 @@ def _create_stats_sheet(wb, styles, employees, shift_counts, role_fill_counts):
         c.border = styles['border']
     row += 1
 
-    totals = [0, 0, 0, 0, 0, 0]
-
-    for e_idx, emp in enumerate(employees):
-        counts = shift_counts[e_idx]
-        total = sum(counts.values())
-        target = emp.get('target_shifts', 0)
-
-        totals[0] += counts[0];
-        totals[1] += counts[1];
-        totals[2] += counts[2];
-        totals[3] += counts[3]
-        totals[4] += total;
-        totals[5] += target
-
-        row_data = [emp['name'], counts[0], counts[1], counts[2], counts[3], total, target]
-
-        fill = None
-        diff = target - total
-        if diff < 0:
-            fill = styles['alert_green']
-        elif diff > 2:
-            fill = styles['alert_red']
-        if counts[2] > 2: fill = styles['alert_orange']
-
+    rows, totals = _stats_rows(employees, shift_counts)
+    for row_data, fill in rows:
         for idx, val in enumerate(row_data, 1):
             c = ws.cell(row=row, column=idx)
             c.value = val
             c.border = styles['border']
             c.alignment = styles['center']
-            if fill: c.fill = fill
+            if fill: c.fill = styles[fill]
+        written += _filled(row_data)
         row += 1
 
     summary_vals = ["TOTAL"] + totals
@@ -333,10 +441,11 @@ def _create_stats_sheet(wb, styles, employees, shift_counts, role_fill_counts):
         c.fill = styles['grey_fill']
         c.border = styles['border']
         c.alignment = styles['center']
+    written += _filled(summary_vals)
     row += 3
 
     # --- Table 2: Unified Special Shifts (Supervisor & Controller) ---
-    _create_unified_stats_table(ws, row, styles, employees, role_fill_counts)
+    return written + _create_unified_stats_table(ws, row, styles, employees, role_fill_counts)
 
 
 def _create_unified_stats_table(ws, start_row, styles, employees, role_fill_counts):
@@ -345,6 +454,7 @@ def _create_unified_stats_table(ws, start_row, styles, employees, role_fill_coun
     start_row += 1
 
     headers = ["שם העובד", "תפקיד", "משמרות אחמ\"ש", "משמרות בקרה", "סה\"כ בכירים", "יעד"]
+    written = 1 + len(headers)
     for idx, h in enumerate(headers, 1):
         c = ws.cell(row=start_row, column=idx)
         c.value = h
@@ -354,38 +464,24 @@ def _create_unified_stats_table(ws, start_row, styles, employees, role_fill_coun
         c.alignment = styles['center']
     start_row += 1
 
-    for e_idx, emp in enumerate(employees):
-        role = emp.get('role', 'guard')
-        if role not in ['supervisor', 'controller']:
-            continue
-
-        role_display = "אחמ\"ש" if role == 'supervisor' else "בקר"
-        sup_count = role_fill_counts[e_idx]['supervisor']
-        ctrl_count = role_fill_counts[e_idx]['controller']
-        total_special = sup_count + ctrl_count
-        target = emp.get('target_shifts', 0)
-
-        row_data = [emp['name'], role_display, sup_count, ctrl_count, total_special, target]
-
-        fill = None
-        if total_special == target:
-            fill = styles['alert_green']
-        elif abs(total_special - target) >= 2:
-            fill = styles['alert_red']
-
+    for row_data, fill in _special_rows(employees, role_fill_counts):
         for idx, val in enumerate(row_data, 1):
             c = ws.cell(row=start_row, column=idx)
             c.value = val
             c.border = styles['border']
             c.alignment = styles['center']
-            if idx in [5, 6] and fill: c.fill = fill
+            if idx in [5, 6] and fill: c.fill = styles[fill]
+        written += _filled(row_data)
         start_row += 1
 
+    return written
+
 
 def _create_penalty_sheet(wb, styles, employees, penalty_data):
     """
     Creates a dedicated sheet for penalties (Rest Gap, Chain 3, Consecutive Nights).
     Only lists employees who have at least one penalty.
+    Returns: cells filled.
     """
     ws = wb.create_sheet("דוח חריגות ושחיקה")
     ws.sheet_view.rightToLeft = True
@@ -396,6 +492,7 @@ def _create_penalty_sheet(wb, styles, employees, penalty_data):
     row += 1
 
     headers = ["שם העובד", "רצף שחיקה כבד (Chain 3)", "מרווח מנוחה קצר (Rest Gap)", "3 לילות ברצף"]
+    written = 1 + len(headers)
 
     for idx, h in enumerate(headers, 1):
         c = ws.cell(row=row, column=idx)
@@ -408,57 +505,247 @@ def _create_penalty_sheet(wb, styles, employees, penalty_data):
         ws.column_dimensions[openpyxl.utils.get_column_letter(idx)].width = 25
     row += 1
 
-    has_content = False
-
-    for e_idx, emp in enumerate(employees):
-        p = penalty_data[e_idx]
-        total_p = p['chain_3'] + p['rest_gap'] + p['consecutive_nights']
-
-        if total_p > 0:
-            has_content = True
-            row_data = [emp['name'], p['chain_3'], p['rest_gap'], p['consecutive_nights']]
+    penalty_rows = _penalty_rows(employees, penalty_data)
 
-            for c_idx, val in enumerate(row_data, 1):
-                cell = ws.cell(row=row, column=c_idx)
-                cell.value = val
-                cell.border = styles['border']
-                cell.alignment = styles['center']
+    for row_data in penalty_rows:
+        for c_idx, val in enumerate(row_data, 1):
+            cell = ws.cell(row=row, column=c_idx)
+            cell.value = val
+            cell.border = styles['border']
+            cell.alignment = styles['center']
 
-                # Highlight specific cells with issues
-                if c_idx > 1 and isinstance(val, int) and val > 0:
-                    cell.fill = styles['alert_red']
-                    cell.font = styles['bold']
+            # Highlight specific cells with issues
+            if c_idx > 1 and isinstance(val, int) and val > 0:
+                cell.fill = styles['alert_red']
+                cell.font = styles['bold']
 
-            row += 1
+        written += _filled(row_data)
+        row += 1
 
-    if not has_content:
+    if not penalty_rows:
         ws.cell(row=row, column=1).value = "לא נמצאו חריגות."
+        written += 1
+    return written
 
 
 # ============================================================================
 # 4. Main Entry Point
 # ============================================================================
-def create_excel_schedule(solver, shift_vars, employees, num_days, num_shifts, colors):
+def create_excel_schedule(solution, employees, colors,
+                          output_filename="shift_schedule_output/shift_schedule_colored.xlsx", roles=None,
+                          daily_demand=None, day_labels=None):
+    """
+    Writes the schedule, statistics and penalty sheets to output_filename.
+    solution: (E, D, S) 0/1 array, see solution_io.extract_solution.
+    roles (optional): role placements of the role-slot model, see solution_io.extract_roles.
+    daily_demand / day_labels (optional): planning calendar, see demand_calendar.
+    Returns: number of non-empty cells written (all sheets).
+    """
     # 1. Init Workbook & Styles
     wb = openpyxl.Workbook()
     styles = _setup_styles()
 
     # 2. Create Schedule Sheet & Get Role Stats
-    role_fill_counts = _create_schedule_sheet(wb, styles, solver, shift_vars, employees, num_days, colors)
+    schedule_rows, role_fill_counts, unmatched = _fill_schedule_rows(solution, employees, roles, daily_demand)
+    _print_matching_report(unmatched, employees)
+    cells_written = _create_schedule_sheet(wb, styles, schedule_rows, employees, colors,
+                                           _day_headers(solution.shape[1], day_labels))
 
-    # 3. Calculate Shift Counts (Raw data from solver)
-    shift_counts = _get_shift_counts(solver, shift_vars, employees, num_days, num_shifts)
+    # 3. Calculate Shift Counts
+    shift_counts = _get_shift_counts(solution)
 
-    # 4. Calculate Penalties (NEW)
-    penalty_counts = _calculate_penalty_counts(solver, shift_vars, employees, num_days, num_shifts)
+    # 4. Calculate Penalties
+    penalty_counts = _calculate_penalty_counts(solution)
 
     # 5. Create Statistics Sheet
-    _create_stats_sheet(wb, styles, employees, shift_counts, role_fill_counts)
+    cells_written += _create_stats_sheet(wb, styles, employees, shift_counts, role_fill_counts)
 
     # 6. Create Penalty Sheet (NEW)
-    _create_penalty_sheet(wb, styles, employees, penalty_counts)
+    cells_written += _create_penalty_sheet(wb, styles, employees, penalty_counts)
 
     # 7. Save
-    output_filename = "shift_schedule_output/shift_schedule_colored.xlsx"
     wb.save(output_filename)
-    print(f"Excel file created successfully: {output_filename}")
\ No newline at end of file
+    print(f"Excel file created successfully: {output_filename}")
+
+    return cells_written
+
+
+# ============================================================================
+# 5. Fast Export (write-only workbook)
+# ============================================================================
+def _named_style(name, font=None, fill=None, border=None, alignment=None):
+    style = NamedStyle(name=name)
+    if font is not None: style.font = font
+    if fill is not None: style.fill = fill
+    if border is not None: style.border = border
+    if alignment is not None: style.alignment = alignment
+    return style
+
+
+def _register_named_styles(wb, styles, colors):
+    """
+    Registers every cell format of the report once as a NamedStyle, so cells only carry
+    a style name instead of their own Font/Fill/Border objects.
+    colors: colour codes that actually appear (one style per distinct colour).
+    Returns: style name by colour code
+    """
+    border, center = styles['border'], styles['center']
+    cell_styles = [
+        _named_style('day_header', styles['header_font'], styles['header_fill'], alignment=center),
+        _named_style('building_header', Font(bold=True, size=12), styles['sub_header_fill'], alignment=center),
+        _named_style('slot_time', styles['bold'], border=border, alignment=center),
+        _named_style('slot_role', border=border, alignment=styles['right']),
+        _named_style('slot', border=border, alignment=center),
+        _named_style('slot_closed', fill=PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid"),
+                     border=border, alignment=center),
+        _named_style('sheet_title', Font(bold=True, size=14)),
+        _named_style('stats_header', styles['header_font'], styles['stats_header_fill'], border, center),
+        _named_style('purple_header', styles['header_font'], styles['purple_header_fill'], border, center),
+        _named_style('red_header', styles['header_font'], styles['red_header_fill'], border, center),
+        _named_style('total', styles['bold'], styles['grey_fill'], border, center),
+        _named_style('penalty_hit', styles['bold'], styles['alert_red'], border, center),
+    ]
+    for alert in ['alert_red', 'alert_green', 'alert_orange']:
+        cell_styles.append(_named_style(alert, fill=styles[alert], border=border, alignment=center))
+
+    color_styles = {}
+    for code in colors:
+        if code not in color_styles:
+            color_styles[code] = f'employee_{code}'
+            cell_styles.append(_named_style(color_styles[code], border=border, alignment=center,
+                                            fill=PatternFill(start_color=code, end_color=code, fill_type="solid")))
+
+    for style in cell_styles:
+        wb.add_named_style(style)
+    return color_styles
+
+
+class _RowWriter:
+    """Appends rows of (value, style name) cells to a write-only sheet and counts filled cells."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.cells_written = 0
+
+    def append(self, cells=()):
+        row = []
+        for value, style in cells:
+            cell = WriteOnlyCell(self.ws, value=value)
+            if style is not None:
+                cell.style = style
+            row.append(cell)
+            if value is not None:
+                self.cells_written += 1
+        self.ws.append(row)
+
+
+def _append_schedule_sheet(wb, schedule_rows, employees, emp_colors, color_styles, day_headers):
+    ws = wb.create_sheet("Schedule")
+    ws.sheet_view.rightToLeft = True
+    out = _RowWriter(ws)
+
+    out.append([("זמן", None), ("תפקיד", None)] + [(day, 'day_header') for day in day_headers])
+    last_column = openpyxl.utils.get_column_letter(len(day_headers) + 2)
+
+    for row_idx, row_def in enumerate(schedule_rows, 2):
+        if row_def.get("is_header"):
+            ws.merged_cells.add(f"A{row_idx}:{last_column}{row_idx}")
+            out.append([(row_def["title"], 'building_header')])
+            continue
+
+        if row_def.get("is_spacer"):
+            out.append()
+            continue
+
+        cells = [(row_def["time"], 'slot_time' if row_def["time"] else 'slot'),
+                 (row_def["role"], 'slot_role')]
+        for assigned_emp in row_def["cells"]:
+            if assigned_emp == CLOSED:
+                cells.append((None, 'slot_closed'))
+            elif assigned_emp is None:
+                cells.append((None, 'slot'))
+            else:
+                cells.append((employees[assigned_emp]['name'], color_styles[emp_colors[assigned_emp]]))
+        out.append(cells)
+
+    return out.cells_written
+
+
+def _append_stats_sheet(wb, employees, shift_counts, role_fill_counts):
+    ws = wb.create_sheet("סטטיסטיקות")
+    ws.sheet_view.rightToLeft = True
+    out = _RowWriter(ws)
+
+    # --- Table 1: General Shift Counts ---
+    out.append()
+    out.append([("סיכום משמרות לעובד (כללי)", 'sheet_title')])
+    headers = ["שם העובד", "בוקר", "צהריים", "לילה", "תגבור", 'סה"כ כללי', 'יעד']
+    out.append([(h, 'stats_header') for h in headers])
+
+    rows, totals = _stats_rows(employees, shift_counts)
+    for row_data, fill in rows:
+        out.append([(val, fill or 'slot') for val in row_data])
+    out.append([(val, 'total') for val in ["TOTAL"] + totals])
+    out.append()
+    out.append()
+
+    # --- Table 2: Unified Special Shifts (Supervisor & Controller) ---
+    out.append([("סיכום משמרות בכירים (אחמ\"ש + בקרה)", 'sheet_title')])
+    headers = ["שם העובד", "תפקיד", "משמרות אחמ\"ש", "משמרות בקרה", "סה\"כ בכירים", "יעד"]
+    out.append([(h, 'purple_header') for h in headers])
+    for row_data, fill in _special_rows(employees, role_fill_counts):
+        out.append([(val, fill if idx in [5, 6] and fill else 'slot') for idx, val in enumerate(row_data, 1)])
+
+    return out.cells_written
+
+
+def _append_penalty_sheet(wb, employees, penalty_data):
+    ws = wb.create_sheet("דוח חריגות ושחיקה")
+    ws.sheet_view.rightToLeft = True
+    headers = ["שם העובד", "רצף שחיקה כבד (Chain 3)", "מרווח מנוחה קצר (Rest Gap)", "3 לילות ברצף"]
+    for idx in range(1, len(headers) + 1):
+        ws.column_dimensions[openpyxl.utils.get_column_letter(idx)].width = 25
+    out = _RowWriter(ws)
+
+    out.append()
+    out.append([("דוח חריגות ושחיקה", 'sheet_title')])
+    out.append([(h, 'red_header') for h in headers])
+
+    penalty_rows = _penalty_rows(employees, penalty_data)
+    for row_data in penalty_rows:
+        out.append([(val, 'penalty_hit' if c_idx > 1 and isinstance(val, int) and val > 0 else 'slot')
+                    for c_idx, val in enumerate(row_data, 1)])
+
+    if not penalty_rows:
+        out.append([("לא נמצאו חריגות.", None)])
+
+    return out.cells_written
+
+
+def create_excel_schedule_fast(solution, employees, colors,
+                               output_filename="shift_schedule_output/shift_schedule_colored.xlsx", roles=None,
+                               daily_demand=None, day_labels=None):
+    """
+    Same workbook as create_excel_schedule, written in openpyxl's write-only mode:
+    rows are appended top to bottom and every format is a pre-registered named style
+    (one per employee colour on the schedule), so memory stays flat for large sites and
+    long horizons.
+    Returns: number of non-empty cells written (all sheets).
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    schedule_rows, role_fill_counts, unmatched = _fill_schedule_rows(solution, employees, roles, daily_demand)
+    _print_matching_report(unmatched, employees)
+
+    # Only employees placed on the schedule sheet need a colour style
+    emp_colors = {e: colors[e] if e < len(colors) else "FFFFFF"
+                  for row_def in schedule_rows for e in row_def.get("cells", []) if e not in (None, CLOSED)}
+    color_styles = _register_named_styles(wb, _setup_styles(), sorted(set(emp_colors.values())))
+
+    cells_written = _append_schedule_sheet(wb, schedule_rows, employees, emp_colors, color_styles,
+                                           _day_headers(solution.shape[1], day_labels))
+    cells_written += _append_stats_sheet(wb, employees, _get_shift_counts(solution), role_fill_counts)
+    cells_written += _append_penalty_sheet(wb, employees, _calculate_penalty_counts(solution))
+
+    wb.save(output_filename)
+    print(f"Excel file created successfully: {output_filename}")
+    return cells_written
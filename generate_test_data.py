@@ -1,34 +1,183 @@
+# generate_test_data.py
+# Seeded generator of complete synthetic scheduling instances (JSON fixtures).
+# Usage:
+#   python generate_test_data.py --employees 500 --days 14 --seed 7
+#   python generate_test_data.py --print-requests      (legacy: print a MANUAL_REQUESTS literal)
+import argparse
+import copy
+import math
+import os
 import random
 
-# System Configuration
-NUM_EMPLOYEES = 36  # Total number of employees
-NUM_DAYS = 7
-NUM_SHIFTS = 4  # Includes reinforcement shift
+import config
+import instance_io
+from capacity_check import check_capacity
+from demand_calendar import scale_to_horizon
 
-# Number of constraints per employee
-CONSTRAINTS_PER_EMPLOYEE = 7
+# Role mix of the bundled site (10 supervisors, 8 controllers, 19 guards)
+ROLE_RATIOS = {'supervisor': 0.27, 'controller': 0.22, 'guard': 0.51}
 
-all_requests = []
+# Weekly (target_shifts, max_shifts) profiles and their share in the bundled site
+TARGET_PROFILES = [((5, 6), 0.60), ((3, 4), 0.19), ((4, 4), 0.11), ((3, 3), 0.10)]
 
-for emp_id in range(NUM_EMPLOYEES):
-    # Use a set to ensure unique constraints for this specific employee
-    employee_constraints = set()
+# Size of the bundled site; its demand is scaled by num_employees / BASE_EMPLOYEES.
+# Copied at import time, since instance_io.apply_instance later overwrites config.
+BASE_EMPLOYEES = 36
+BASE_WEEKDAY_DEMAND = copy.deepcopy(config.WEEKDAY_DEMAND)
+BASE_WEEKEND_DEMAND = copy.deepcopy(config.WEEKEND_DEMAND)
 
-    while len(employee_constraints) < CONSTRAINTS_PER_EMPLOYEE:
-        day = random.randint(0, NUM_DAYS - 1)
-        shift = random.randint(0, NUM_SHIFTS - 1)
-        employee_constraints.add((day, shift))
+# Unavailability model (per employee)
+RANDOM_BLOCKS_PER_WEEK = (3, 10)  # Uniform number of single blocked (day, shift) cells per week
+DAY_OFF_PROBABILITY = 0.12        # Probability that a whole day is blocked
+WEEKEND_OFF_PROBABILITY = 0.20    # Probability that both weekend days of a week are blocked
 
-    # Add this employee's constraints to the main list
-    for day, shift in employee_constraints:
-        all_requests.append((emp_id, day, shift))
+# Previous-week history
+WORKED_SAT_NOON_SHARE = 0.10
+WORKED_SAT_NIGHT_SHARE = 0.10
+STREAK_SHARE = 0.20
 
-# Sort the list by Employee ID, then Day, then Shift for readability
-all_requests.sort()
 
-# Output the result
-print(f"# Generated {len(all_requests)} Constraints ({CONSTRAINTS_PER_EMPLOYEE} per employee)")
-print("MANUAL_REQUESTS = [")
-for req in all_requests:
-    print(f"    {req},")
-print("]")
\ No newline at end of file
+# ============================================================================
+# 1. Instance Parts
+# ============================================================================
+def _generate_employees(rng, num_employees, num_days):
+    roles = list(ROLE_RATIOS)
+    role_weights = [ROLE_RATIOS[r] for r in roles]
+    profiles = [p for p, _ in TARGET_PROFILES]
+    profile_weights = [w for _, w in TARGET_PROFILES]
+
+    employees = []
+    for e in range(num_employees):
+        role = rng.choices(roles, role_weights)[0]
+        target, max_shifts = rng.choices(profiles, profile_weights)[0]
+        employees.append({
+            'id': e,
+            'name': f'Employee {e:04d}',
+            'target_shifts': scale_to_horizon(target, num_days),
+            'max_shifts': min(num_days, scale_to_horizon(max_shifts, num_days)),
+            'role': role,
+            'history_streak': rng.randint(1, 4) if rng.random() < STREAK_SHARE else 0,
+            'max_mornings': scale_to_horizon(5, num_days), 'min_mornings': 0,
+            'max_evenings': scale_to_horizon(5, num_days), 'min_evenings': 0,
+            'max_nights': scale_to_horizon(5, num_days), 'min_nights': 0
+        })
+    return employees
+
+
+def _scale_demand(demand, factor):
+    return {s: {role: int(round(count * factor)) for role, count in reqs.items()}
+            for s, reqs in demand.items()}
+
+
+def _generate_unavailability(rng, num_employees, num_days, num_shifts):
+    """
+    Correlated unavailability: scattered single cells, whole days off and
+    weekend clusters (both weekend days of a week blocked together).
+    """
+    blocked = set()
+    weekend_days = [5, 6]
+    num_weeks = int(math.ceil(num_days / 7))
+
+    for e in range(num_employees):
+        for week in range(num_weeks):
+            week_days = [d for d in range(week * 7, min(num_days, week * 7 + 7))]
+
+            # A. Scattered single cells
+            for _ in range(rng.randint(*RANDOM_BLOCKS_PER_WEEK)):
+                blocked.add((e, rng.choice(week_days), rng.randrange(num_shifts)))
+
+            # B. Weekend cluster
+            if rng.random() < WEEKEND_OFF_PROBABILITY:
+                for d in week_days:
+                    if d % 7 in weekend_days:
+                        blocked.update((e, d, s) for s in range(num_shifts))
+
+        # C. Whole days off
+        for d in range(num_days):
+            if rng.random() < DAY_OFF_PROBABILITY:
+                blocked.update((e, d, s) for s in range(num_shifts))
+
+    return sorted(blocked)
+
+
+def _generate_colors(rng, num_employees):
+    """Light pastel colors, readable behind black text."""
+    return [''.join(f'{rng.randint(150, 255):02X}' for _ in range(3)) for _ in range(num_employees)]
+
+
+# ============================================================================
+# 2. Main Entry Point
+# ============================================================================
+def generate_instance(num_employees=36, num_days=7, seed=0):
+    """
+    Generates a complete, reproducible instance: employees, roles, targets, demand,
+    previous-week history and unavailability. Same arguments -> same instance.
+    """
+    rng = random.Random(seed)
+    num_shifts = config.NUM_SHIFTS
+
+    employees = _generate_employees(rng, num_employees, num_days)
+    factor = num_employees / BASE_EMPLOYEES
+
+    # Previous-week context: disjoint samples for Saturday Noon / Night
+    shuffled = list(range(num_employees))
+    rng.shuffle(shuffled)
+    n_noon = int(num_employees * WORKED_SAT_NOON_SHARE)
+    n_night = int(num_employees * WORKED_SAT_NIGHT_SHARE)
+
+    return {
+        'name': f'synthetic_{num_employees}e_{num_days}d_s{seed}',
+        'seed': seed,
+        'num_days': num_days,
+        'num_shifts': num_shifts,
+        'employees': employees,
+        'weekday_demand': _scale_demand(BASE_WEEKDAY_DEMAND, factor),
+        'weekend_demand': _scale_demand(BASE_WEEKEND_DEMAND, factor),
+        'worked_last_sat_noon': sorted(shuffled[:n_noon]),
+        'worked_last_sat_night': sorted(shuffled[n_noon:n_noon + n_night]),
+        'manual_assignments': [],
+        'unavailable_requests': _generate_unavailability(rng, num_employees, num_days, num_shifts),
+        'colors': _generate_colors(rng, num_employees)
+    }
+
+
+def default_fixture_path(num_employees, num_days, seed):
+    return os.path.join("benchmarks", "instances", f"synthetic_{num_employees}e_{num_days}d_s{seed}.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic scheduling instances.")
+    parser.add_argument('--employees', type=int, default=36)
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Output JSON path (default: benchmarks/instances/...).")
+    parser.add_argument('--print-requests', action='store_true',
+                        help="Print the unavailability as a MANUAL_REQUESTS literal instead of writing JSON.")
+    args = parser.parse_args()
+
+    instance = generate_instance(args.employees, args.days, args.seed)
+
+    if args.print_requests:
+        requests = instance['unavailable_requests']
+        print(f"# Generated {len(requests)} Constraints ({args.employees} employees, seed {args.seed})")
+        print("MANUAL_REQUESTS = [")
+        for req in requests:
+            print(f"    {req},")
+        print("]")
+        return
+
+    output = args.output or default_fixture_path(args.employees, args.days, args.seed)
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    instance_io.save_instance(output, instance)
+
+    # Quick sanity check so obviously infeasible fixtures are noticed right away
+    instance_io.apply_instance(instance)
+    report = check_capacity(instance['employees'], instance['unavailable_requests'],
+                            instance['worked_last_sat_night'], args.days, instance['num_shifts'])
+    status = "passes" if report['feasible'] else f"FAILS ({len(report['issues'])} slots)"
+    print(f"Instance written to {output}: {args.employees} employees, {args.days} days, "
+          f"{len(instance['unavailable_requests'])} blocked cells; capacity pre-check {status}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# greedy_scheduler.py
+# Constructive heuristic: fills every (day, shift) of the demand calendar in order, always
+# taking the available candidates furthest below their target_shifts. Runs in milliseconds,
+# so it serves as a quick draft (e.g. after a call-in) and as a warm start for CP-SAT.
+# Usage:
+#   python greedy_scheduler.py                       (draft of the config instance + Excel)
+#   python main.py --greedy-hint                     (CP-SAT, hinted with the greedy draft)
+import argparse
+import time
+
+import numpy as np
+
+import config
+import demand_calendar
+import excel_writer
+import penalty_eval
+from config import ROLE_ORDER
+from optimizer import collect_blocked_cells
+
+GREEDY_OUTPUT_FILE = "shift_schedule_output/shift_schedule_greedy.xlsx"
+
+
+# ============================================================================
+# 1. Feasibility Checks
+# ============================================================================
+class _ScheduleState:
+    """Partial schedule plus the counters the hard rules need."""
+
+    def __init__(self, employees, num_days, num_shifts, blocked_cells):
+        self.employees = employees
+        self.num_days = num_days
+        self.num_shifts = num_shifts
+        self.blocked = blocked_cells
+        self.solution = np.zeros((len(employees), num_days, num_shifts), dtype=np.uint8)
+        self.worked = np.zeros(len(employees), dtype=np.int64)
+
+    def assign(self, e, d, s):
+        self.solution[e, d, s] = 1
+        self.worked[e] += 1
+
+    def _works(self, e, t):
+        """Worked on flattened slot t = day * num_shifts + shift (False outside the horizon)."""
+        if not 0 <= t < self.num_days * self.num_shifts:
+            return False
+        return bool(self.solution[e, t // self.num_shifts, t % self.num_shifts])
+
+    def _run_length(self, e, d):
+        """Consecutive worked days through day d if d is worked, incl. the history streak at day 0."""
+        before = 0
+        while d - before - 1 >= 0 and self.solution[e, d - before - 1].any():
+            before += 1
+        after = 0
+        while d + after + 1 < self.num_days and self.solution[e, d + after + 1].any():
+            after += 1
+        history = self.employees[e].get('history_streak', 0) if before == d else 0
+        return history + before + 1 + after
+
+    def can_work(self, e, d, s):
+        """Hard rules of the optimizer: availability, one shift per day, back-to-back, streak, max_shifts."""
+        if (e, d, s) in self.blocked or self.solution[e, d].any():
+            return False
+        t = d * self.num_shifts + s
+        if self._works(e, t - 1) or self._works(e, t + 1):
+            return False
+        if self.worked[e] >= self.employees[e]['max_shifts']:
+            return False
+        return self._run_length(e, d) <= config.MAX_CONSECUTIVE_DAYS
+
+
+# ============================================================================
+# 2. Constructive Heuristic
+# ============================================================================
+def _candidate_key(state, e, d, s, slot_level):
+    """
+    Ranking of a candidate (smaller first): furthest below target, then no rest gap / third
+    night in a row, then the least over-qualified role, then the employee index.
+    """
+    emp = state.employees[e]
+    t = d * state.num_shifts + s
+    rest_gap = state._works(e, t - 2)
+    third_night = (s == config.SHIFT_NIGHT and d >= 2
+                   and state.solution[e, d - 1, s] and state.solution[e, d - 2, s])
+    level = ROLE_ORDER.index(emp['role']) if emp.get('role') in ROLE_ORDER else len(ROLE_ORDER) - 1
+    return state.worked[e] - emp['target_shifts'], bool(third_night) + bool(rest_gap), slot_level - level, e
+
+
+def greedy_schedule(employees, unavailable_requests, manual_assignments, worked_last_sat_noon,
+                    worked_last_sat_night, daily_demand=None):
+    """
+    Fills the days in order, the shifts of a day scarcest first: supervisors first, then the
+    remaining skilled places (supervisors or controllers), then the rest of the headcount. Manual assignments are placed
+    before anything else. worked_last_sat_noon only matters for the objective and is not used.
+    Returns: (solution, unfilled)
+        solution - (E, D, S) uint8 array
+        unfilled - [(d, s, role, missing)] places no candidate could take (empty = valid schedule)
+    """
+    num_days, num_shifts = config.NUM_DAYS, config.NUM_SHIFTS
+    daily_demand = demand_calendar.build_daily_demand(num_days) if daily_demand is None else daily_demand
+    state = _ScheduleState(employees, num_days, num_shifts,
+                           collect_blocked_cells(employees, unavailable_requests, worked_last_sat_night))
+
+    for (e, d, s) in manual_assignments:
+        if 0 <= e < len(employees) and 0 <= d < num_days and 0 <= s < num_shifts:
+            state.assign(e, d, s)
+
+    # Capable employees per place kind, in ROLE_ORDER (a role can fill every later one)
+    capable = {role: [e for e, emp in enumerate(employees) if emp.get('role') in ROLE_ORDER[:i + 1]]
+               for i, role in enumerate(ROLE_ORDER)}
+    capable['guard'] = list(range(len(employees)))
+
+    unfilled = []
+    for d in range(num_days):
+        # Scarcest shift of the day first (fewest available employees per place), so the
+        # overlapping Reinforcement is not left with whoever Morning and Noon did not take
+        def slack(s):
+            available = sum(1 for e in range(len(employees)) if state.can_work(e, d, s))
+            return available - sum(daily_demand[d].get(s, {}).values())
+
+        for s in sorted(range(num_shifts), key=slack):
+            reqs = daily_demand[d].get(s, {})
+            required = {'supervisor': reqs.get('supervisor', 0),
+                        'controller': reqs.get('supervisor', 0) + reqs.get('controller', 0),
+                        'guard': sum(reqs.values())}
+            for slot_level, role in enumerate(ROLE_ORDER):
+                # Places taken by a more capable kind count for the later kinds too
+                missing = required[role] - int(state.solution[capable[role], d, s].sum())
+                if missing <= 0:
+                    continue
+                # Taking one candidate changes no other candidate's rules or rank within the slot
+                candidates = sorted((e for e in capable[role] if state.can_work(e, d, s)),
+                                    key=lambda e: _candidate_key(state, e, d, s, slot_level))
+                for e in candidates[:missing]:
+                    state.assign(e, d, s)
+                if len(candidates) < missing:
+                    unfilled.append((d, s, role, missing - len(candidates)))
+
+    return state.solution, unfilled
+
+
+# ============================================================================
+# 3. Standalone Draft
+# ============================================================================
+def print_greedy_report(solution, unfilled, employees, elapsed):
+    """Timing, objective (penalty_eval) and the places the heuristic could not fill."""
+    objective = penalty_eval.evaluate_objective(solution, employees, config.WORKED_LAST_SAT_NOON,
+                                                config.WORKED_LAST_SAT_NIGHT)
+    if unfilled:
+        print(f"⚠️ Greedy draft ({elapsed * 1000:.1f} ms) leaves {sum(m for *_, m in unfilled)} place(s) open, "
+              f"cost of the filled part {objective}:")
+        for d, s, role, missing in unfilled:
+            print(f"   - day {d} shift {s}: {missing} x {role}")
+    else:
+        print(f"✅ Greedy draft ({elapsed * 1000:.1f} ms), Cost (Penalty): {objective}")
+    return objective
+
+
+def write_greedy_excel(solution, employees, daily_demand=None, day_labels=None, output_filename=GREEDY_OUTPUT_FILE):
+    """Excel report of the draft, next to (not over) the solver's report."""
+    write_excel = (excel_writer.create_excel_schedule_fast if config.EXCEL_WRITE_ONLY
+                   else excel_writer.create_excel_schedule)
+    return write_excel(solution, employees, config.EMPLOYEE_COLORS, output_filename=output_filename,
+                       daily_demand=daily_demand, day_labels=day_labels)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Greedy draft schedule of the config instance.")
+    parser.add_argument('--output', default=GREEDY_OUTPUT_FILE, help="Excel output file.")
+    args = parser.parse_args(argv)
+
+    employees = demand_calendar.scale_employees_to_horizon(config.EMPLOYEES, config.NUM_DAYS)
+    daily_demand = demand_calendar.build_daily_demand(config.NUM_DAYS)
+
+    start = time.perf_counter()
+    solution, unfilled = greedy_schedule(employees, config.MANUAL_REQUESTS, config.MANUAL_ASSIGNMENTS,
+                                         config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT, daily_demand)
+    print_greedy_report(solution, unfilled, employees, time.perf_counter() - start)
+
+    write_greedy_excel(solution, employees, daily_demand, demand_calendar.day_labels(config.NUM_DAYS), args.output)
+
+
+if __name__ == "__main__":
+    main()
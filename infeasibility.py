@@ -0,0 +1,136 @@
+# infeasibility.py
+import time
+
+from ortools.sat.python import cp_model
+
+import config
+import optimizer
+from capacity_check import SHIFT_NAMES, day_name
+
+
+# ============================================================================
+# 1. Assumption Literals
+# ============================================================================
+class AssumptionRegistry:
+    """
+    Creates one enforcement literal per constraint family on demand, e.g. ('demand', d, s)
+    or ('availability', e, d). The literals are later passed to CP-SAT as assumptions.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.literals = {}  # key -> BoolVar
+
+    def literal(self, key):
+        if key not in self.literals:
+            name = 'assume_' + '_'.join(str(part) for part in key)
+            self.literals[key] = self.model.NewBoolVar(name)
+        return self.literals[key]
+
+
+def _slot_name(d, s):
+    shift = SHIFT_NAMES[s] if s < len(SHIFT_NAMES) else f"Shift {s}"
+    return f"{day_name(d)} {shift}"
+
+
+def describe_assumption(key, employees):
+    """Human readable description of a constraint family key."""
+    kind = key[0]
+    if kind == 'demand':
+        return f"Role demand of {_slot_name(key[1], key[2])}"
+    if kind == 'manual':
+        return f"Manual assignment: {employees[key[1]]['name']} -> {_slot_name(key[2], key[3])}"
+
+    name = employees[key[1]]['name']
+    if kind == 'availability':
+        return f"Availability requests of {name} on {day_name(key[2])}"
+    if kind == 'back_to_back':
+        return f"No back-to-back shifts for {name}"
+    if kind == 'streak':
+        days = f"{day_name(key[2])} - {day_name(key[3])}"
+        if key[2] == 0 and employees[key[1]].get('history_streak', 0):
+            days += f", after a history streak of {employees[key[1]]['history_streak']}"
+        return f"Max {config.MAX_CONSECUTIVE_DAYS} consecutive work days for {name} ({days})"
+    if kind == 'max_shifts':
+        return f"Max {employees[key[1]]['max_shifts']} shifts for {name}"
+    return str(key)
+
+
+# ============================================================================
+# 2. Main Entry Point
+# ============================================================================
+def _minimize_conflict(model, guards, conflict, deadline):
+    """
+    Deletion-based minimization: drops each family in turn and re-solves with the rest as
+    assumptions; a family stays only if the rest is no longer infeasible on its own.
+    Returns: (conflict, minimal) - minimal is False if a re-solve ran out of time.
+    """
+    conflict = list(conflict)
+    minimal = True
+    for key in list(conflict):
+        remaining = [k for k in conflict if k != key]
+        time_left = deadline - time.monotonic()
+        if time_left <= 0:
+            return conflict, False
+        model.ClearAssumptions()
+        model.AddAssumptions([guards.literals[k] for k in remaining])
+        solver = optimizer._create_solver({'num_workers': 1, 'max_time_seconds': time_left,
+                                           'relative_gap_limit': None, 'log_search_progress': False})
+        status = solver.Solve(model)
+        if status == cp_model.INFEASIBLE:
+            conflict = remaining
+        elif status == cp_model.UNKNOWN:
+            minimal = False
+    return conflict, minimal
+
+
+def explain_infeasibility(employees, unavailable_requests, manual_assignments,
+                          worked_last_sat_noon, worked_last_sat_night, max_time_seconds=60.0):
+    """
+    Rebuilds the hard constraints with one enforcement literal per constraint family and
+    solves once with all literals as assumptions. CP-SAT's SufficientAssumptionsForInfeasibility
+    returns a conflicting subset of families, which is then minimized by deletion
+    (max_time_seconds covers all solves).
+    Returns: (conflict, minimal)
+        conflict - list of family keys (empty if the hard constraints are actually feasible)
+        minimal  - True if relaxing any single family of the conflict was proven to remove it
+    """
+    deadline = time.monotonic() + max_time_seconds
+    num_days, num_shifts = config.NUM_DAYS, config.NUM_SHIFTS
+
+    model, shift_vars = optimizer._init_model_and_variables(employees, num_days, num_shifts)
+    guards = AssumptionRegistry(model)
+
+    optimizer._add_role_demand_constraints(model, shift_vars, employees, num_days, num_shifts, guards=guards)
+    optimizer._add_shift_rules_constraints(model, shift_vars, len(employees), num_days, num_shifts, guards=guards)
+    optimizer._add_availability_constraints(model, shift_vars, employees, unavailable_requests, manual_assignments,
+                                            worked_last_sat_noon, worked_last_sat_night, guards=guards)
+    optimizer._add_labor_law_constraints(model, shift_vars, employees, num_days, num_shifts, guards=guards)
+
+    keys = list(guards.literals)
+    index_to_key = {guards.literals[key].Index(): key for key in keys}
+    model.AddAssumptions([guards.literals[key] for key in keys])
+
+    # Cores are only reported by the single-worker search
+    solver = optimizer._create_solver({'num_workers': 1, 'max_time_seconds': max_time_seconds,
+                                       'relative_gap_limit': None, 'log_search_progress': False})
+    status = solver.Solve(model)
+    if status != cp_model.INFEASIBLE:
+        return [], False
+
+    conflict = [index_to_key[idx] for idx in solver.SufficientAssumptionsForInfeasibility()]
+    return _minimize_conflict(model, guards, conflict, deadline)
+
+
+def print_infeasibility_report(conflict, employees, minimal=False):
+    """Prints the conflicting constraint families."""
+    if not conflict:
+        print("   No conflicting set found (the hard constraints may be feasible; check the time limit).")
+        return
+
+    if minimal:
+        print(f"\n🔍 Conflicting constraints ({len(conflict)}): relaxing any one of them removes this particular conflict.")
+    else:
+        print(f"\n🔍 Conflicting constraints ({len(conflict)}): a conflicting subset (minimization did not finish).")
+    for key in conflict:
+        print(f"   - {describe_assumption(key, employees)}")
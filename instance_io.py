@@ -0,0 +1,76 @@
+# instance_io.py
+import json
+
+import config
+
+
+# ============================================================================
+# 1. Serialization
+# ============================================================================
+def _demand_to_json(demand):
+    return {str(s): dict(reqs) for s, reqs in demand.items()}
+
+
+def _demand_from_json(demand):
+    return {int(s): dict(reqs) for s, reqs in demand.items()}
+
+
+def save_instance(path, instance):
+    """Writes a complete scheduling instance (see instance_from_config for the keys) to JSON."""
+    payload = dict(instance)
+    payload['weekday_demand'] = _demand_to_json(instance['weekday_demand'])
+    payload['weekend_demand'] = _demand_to_json(instance['weekend_demand'])
+    payload['unavailable_requests'] = [list(cell) for cell in instance['unavailable_requests']]
+    payload['manual_assignments'] = [list(cell) for cell in instance['manual_assignments']]
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False)
+
+
+def load_instance(path):
+    """Reads an instance written by save_instance. Cells come back as (e, d, s) tuples."""
+    with open(path, encoding='utf-8') as f:
+        instance = json.load(f)
+
+    instance['weekday_demand'] = _demand_from_json(instance['weekday_demand'])
+    instance['weekend_demand'] = _demand_from_json(instance['weekend_demand'])
+    instance['unavailable_requests'] = [tuple(cell) for cell in instance['unavailable_requests']]
+    instance['manual_assignments'] = [tuple(cell) for cell in instance['manual_assignments']]
+    return instance
+
+
+# ============================================================================
+# 2. Config Bridge
+# ============================================================================
+def instance_from_config():
+    """Packs the data currently defined in config.py as an instance dict."""
+    return {
+        'name': 'config',
+        'num_days': config.NUM_DAYS,
+        'num_shifts': config.NUM_SHIFTS,
+        'employees': config.EMPLOYEES,
+        'weekday_demand': config.WEEKDAY_DEMAND,
+        'weekend_demand': config.WEEKEND_DEMAND,
+        'worked_last_sat_noon': config.WORKED_LAST_SAT_NOON,
+        'worked_last_sat_night': config.WORKED_LAST_SAT_NIGHT,
+        'manual_assignments': config.MANUAL_ASSIGNMENTS,
+        'unavailable_requests': config.MANUAL_REQUESTS,
+        'colors': config.EMPLOYEE_COLORS
+    }
+
+
+def apply_instance(instance):
+    """
+    Installs an instance into the config module, so the optimizer and writer (which read
+    NUM_DAYS, the demand tables, etc. from config) run on it unchanged.
+    """
+    config.NUM_DAYS = instance['num_days']
+    config.NUM_SHIFTS = instance['num_shifts']
+    config.EMPLOYEES = instance['employees']
+    config.WEEKDAY_DEMAND = instance['weekday_demand']
+    config.WEEKEND_DEMAND = instance['weekend_demand']
+    config.WORKED_LAST_SAT_NOON = instance['worked_last_sat_noon']
+    config.WORKED_LAST_SAT_NIGHT = instance['worked_last_sat_night']
+    config.MANUAL_ASSIGNMENTS = instance['manual_assignments']
+    config.MANUAL_REQUESTS = instance['unavailable_requests']
+    config.EMPLOYEE_COLORS = instance['colors']
@@ -0,0 +1,191 @@
+# lns.py
+# Large Neighborhood Search around the optimizer model: after a short initial solve, most of
+# the schedule is fixed and one structured neighborhood is re-optimized under a short time
+# limit, again and again. The model comes from optimizer.build_model, so every hard rule
+# lives in one place; a neighborhood only fixes the shift variables outside of it.
+import random
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+import config
+import optimizer
+import penalty_eval
+import solution_io
+from config import ROLE_ORDER
+from profiling import profile_stage
+
+NEIGHBORHOODS = ['day', 'role', 'worst_employees', 'shift']
+
+
+# ============================================================================
+# 1. Neighborhoods
+# ============================================================================
+def _employee_penalties(solution, employees, worked_last_sat_noon, worked_last_sat_night):
+    """Objective contribution of every employee in the current schedule, shape (E,)."""
+    terms = penalty_eval.penalty_terms(solution, employees, worked_last_sat_noon, worked_last_sat_night)
+    return sum(terms.values())
+
+
+def choose_neighborhood(kind, rng, solution, employees, worked_last_sat_noon, worked_last_sat_night,
+                        num_worst=5):
+    """
+    Cells re-optimized by one LNS step; everything else keeps its current value.
+    kind: 'day'             - all cells of one random day
+          'role'            - all cells of the employees of one role tier
+          'worst_employees' - all cells of num_worst employees drawn from the 2 * num_worst worst
+          'shift'           - one shift type on every day
+    Returns: (label, free mask of shape (E, D, S))
+    """
+    num_employees, num_days, num_shifts = solution.shape
+    free = np.zeros(solution.shape, dtype=bool)
+
+    if kind == 'day':
+        d = rng.randrange(num_days)
+        free[:, d, :] = True
+        return f"day {d}", free
+
+    if kind == 'role':
+        role = rng.choice([r for r in ROLE_ORDER if any(emp.get('role') == r for emp in employees)])
+        members = [e for e, emp in enumerate(employees) if emp.get('role') == role]
+        free[members] = True
+        return f"role {role}", free
+
+    if kind == 'worst_employees':
+        penalties = _employee_penalties(solution, employees, worked_last_sat_noon, worked_last_sat_night)
+        worst = np.argsort(-penalties, kind='stable')[:2 * num_worst].tolist()
+        chosen = rng.sample(worst, min(num_worst, len(worst)))
+        free[chosen] = True
+        return f"worst employees {sorted(chosen)}", free
+
+    if kind == 'shift':
+        s = rng.randrange(num_shifts)
+        free[:, :, s] = True
+        return f"shift {s}", free
+
+    raise ValueError(f"Unknown LNS neighborhood '{kind}', expected one of {NEIGHBORHOODS}.")
+
+
+def _neighborhood_model(model, response, solution_index, free):
+    """
+    Copy of the model with every shift variable outside `free` fixed to its value in `response`,
+    and the whole response as solution hint (the search starts from the incumbent).
+    """
+    neighborhood = model.Clone()
+    neighborhood.ClearHints()
+    proto = neighborhood.Proto()
+    values = response.solution
+
+    fixed = solution_index[~free]
+    for idx in fixed[fixed >= 0].tolist():
+        domain = proto.variables[idx].domain
+        domain[0] = domain[1] = values[idx]
+
+    proto.solution_hint.vars.extend(range(len(values)))
+    proto.solution_hint.values.extend(values)
+    return neighborhood
+
+
+# ============================================================================
+# 2. Main Entry Point
+# ============================================================================
+def solve_lns(employees, unavailable_requests, manual_assignments, worked_last_sat_noon, worked_last_sat_night,
+              solver_settings=None, model_settings=None, lns_settings=None, hint_values=None, profiler=None,
+              role_vars=None):
+    """
+    LNS search (lns_settings defaults to config.LNS_SETTINGS).
+    Returns: (solver, status, shift_vars, stats) - like optimizer.build_and_solve_model;
+        solver holds the best solution found (read it with solution_io.extract_solution),
+        stats is optimizer.get_solve_stats of the whole search (bound of the initial solve)
+        plus 'iterations' and per-neighborhood 'neighborhoods' statistics.
+    """
+    settings = dict(config.LNS_SETTINGS)
+    if lns_settings:
+        settings.update(lns_settings)
+    rng = random.Random(settings['seed'])
+    num_days, num_shifts = config.NUM_DAYS, config.NUM_SHIFTS
+    start_time = time.perf_counter()
+
+    with profile_stage(profiler, 'build') as counts:
+        model, shift_vars = optimizer.build_model(employees, unavailable_requests, manual_assignments,
+                                                  worked_last_sat_noon, worked_last_sat_night, model_settings,
+                                                  profiler=profiler, role_vars=role_vars)
+        counts['variables'], counts['constraints'] = optimizer.get_model_size(model)
+    if hint_values:
+        blocked_cells = optimizer.collect_blocked_cells(employees, unavailable_requests, worked_last_sat_night)
+        optimizer._add_solution_hints(model, shift_vars, hint_values, blocked_cells)
+    solution_index = solution_io.build_solution_index(shift_vars, len(employees), num_days, num_shifts)
+
+    # 1. Initial solution (full model, short budget taken from the total)
+    deadline = time.perf_counter() + settings['time_limit']
+    solver = optimizer._create_solver(dict(solver_settings or {},
+                                           max_time_seconds=min(settings['initial_time_limit'], settings['time_limit'])))
+    with profile_stage(profiler, 'solve') as counts:
+        status = solver.Solve(model)
+        best_bound = solver.BestObjectiveBound()
+        if status == cp_model.UNKNOWN:
+            # Nothing found yet: spend the rest of the budget on the first solution instead
+            solver = optimizer._create_solver(dict(solver_settings or {},
+                                                   max_time_seconds=max(0.0, deadline - time.perf_counter())))
+            solver.parameters.stop_after_first_solution = True
+            status = solver.Solve(model)
+        counts['status'] = solver.StatusName(status)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return solver, status, shift_vars, None
+
+    best_solver, best_bound = solver, max(best_bound, solver.BestObjectiveBound())
+    objective = solver.ObjectiveValue()
+    print(f"--- LNS: initial solution {objective:.0f} (bound {best_bound:.0f}, "
+          f"{time.perf_counter() - start_time:.2f}s) ---")
+
+    # 2. Neighborhood search
+    neighborhood_settings = dict(solver_settings or {}, max_time_seconds=settings['neighborhood_time_limit'],
+                                 log_search_progress=False)
+    kinds = settings['neighborhoods']
+    neighborhood_stats = {kind: {'tries': 0, 'improved': 0, 'gain': 0.0, 'time': 0.0} for kind in kinds}
+    iteration = 0
+    with profile_stage(profiler, 'lns') as counts:
+        while (status != cp_model.OPTIMAL and objective > best_bound and time.perf_counter() < deadline
+               and (settings['max_iterations'] is None or iteration < settings['max_iterations'])):
+            iteration += 1
+            kind = rng.choice(kinds)
+            solution = solution_io.extract_solution(best_solver, solution_index)
+            label, free = choose_neighborhood(kind, rng, solution, employees, worked_last_sat_noon,
+                                              worked_last_sat_night, settings['worst_employees'])
+
+            neighborhood = _neighborhood_model(model, best_solver.response_proto, solution_index, free)
+            solver = optimizer._create_solver(dict(neighborhood_settings, random_seed=rng.randrange(2 ** 31),
+                                                   max_time_seconds=min(settings['neighborhood_time_limit'],
+                                                                        deadline - time.perf_counter())))
+            step_status = solver.Solve(neighborhood)
+
+            stats = neighborhood_stats[kind]
+            stats['tries'] += 1
+            stats['time'] += solver.WallTime()
+            if step_status in (cp_model.OPTIMAL, cp_model.FEASIBLE) and solver.ObjectiveValue() < objective:
+                stats['improved'] += 1
+                stats['gain'] += objective - solver.ObjectiveValue()
+                print(f"   [LNS {iteration}] {label}: {objective:.0f} -> {solver.ObjectiveValue():.0f} "
+                      f"({time.perf_counter() - start_time:.2f}s)")
+                best_solver, objective = solver, solver.ObjectiveValue()
+        counts['iterations'] = iteration
+
+    status = cp_model.OPTIMAL if objective <= best_bound else cp_model.FEASIBLE
+    stats = {
+        'wall_time': time.perf_counter() - start_time,
+        'objective': objective,
+        'best_bound': best_bound,
+        'gap': abs(objective - best_bound) / max(1.0, abs(objective)),
+        'iterations': iteration,
+        'neighborhoods': neighborhood_stats
+    }
+    return best_solver, status, shift_vars, stats
+
+
+def print_lns_report(stats):
+    """Per-neighborhood summary: tries, improving steps, total gain and solve time."""
+    print(f"\n--- LNS: {stats['iterations']} neighborhoods in {stats['wall_time']:.2f}s ---")
+    print(f"   {'neighborhood':<18}{'tries':>7}{'improved':>10}{'gain':>10}{'time [s]':>10}")
+    for kind, s in stats['neighborhoods'].items():
+        print(f"   {kind:<18}{s['tries']:>7}{s['improved']:>10}{s['gain']:>10.0f}{s['time']:>10.2f}")
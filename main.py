@@ -1,61 +1,457 @@
 # main.py
+import argparse
 import os
+import time
 from ortools.sat.python import cp_model
 
 # Import modules
 import config
 import optimizer
 import excel_writer
+from solution_stream import SolutionStreamer
+import solution_io
+import capacity_check
+import demand_calendar
+import infeasibility
+import penalty_eval
+import greedy_scheduler
+import lns
+import rolling_horizon
+import role_decomposition
+from profiling import PipelineProfiler, profile_stage
+
+
+def _parse_args(argv=None):
+    """
+    Command-line overrides for config.SOLVER_SETTINGS.
+    """
+    parser = argparse.ArgumentParser(description="Weekly shift scheduler (CP-SAT).")
+    modes = parser.add_mutually_exclusive_group()  # Solve modes; only one of them runs
+    parser.add_argument('--workers', type=int, help="Number of parallel search workers (0 = all cores).")
+    parser.add_argument('--time-limit', type=float, help="Max solve time in seconds.")
+    parser.add_argument('--gap', type=float, help="Relative gap limit, e.g. 0.01 for 1%%.")
+    parser.add_argument('--seed', type=int, help="Random seed for the search.")
+    parser.add_argument('--log', action='store_true', help="Print the CP-SAT search log.")
+    parser.add_argument('--stream', action='store_true',
+                        help="Write a snapshot of every improving solution (Ctrl+C stops the search).")
+    parser.add_argument('--snapshot-format', choices=['json', 'xlsx'], help="Snapshot file format.")
+    parser.add_argument('--skip-precheck', action='store_true', help="Skip the capacity pre-check.")
+    parser.add_argument('--lean', action='store_true',
+                        help="Build the reduced model and print its size (with --profile, against the full model).")
+    parser.add_argument('--symmetry-breaking', action='store_true',
+                        help="Order interchangeable employees lexicographically.")
+    parser.add_argument('--role-slots', action='store_true',
+                        help="Let the solver place employees on roles (exact role fairness, larger model).")
+    modes.add_argument('--rolling', action='store_true',
+                       help="Solve long horizons as overlapping windows (see config.ROLLING_HORIZON_SETTINGS).")
+    parser.add_argument('--window-days', type=int, help="Rolling horizon: days solved per window.")
+    parser.add_argument('--commit-days', type=int, help="Rolling horizon: days fixed per window.")
+    modes.add_argument('--role-tiers', action='store_true',
+                       help="Solve supervisors/controllers first, then the guards (see "
+                            "config.ROLE_DECOMPOSITION_SETTINGS); --time-limit is the total budget of all stages.")
+    parser.add_argument('--no-repair', action='store_true',
+                        help="Role tiers: skip the final repair pass on the joint model.")
+    modes.add_argument('--lns', action='store_true',
+                       help="Large Neighborhood Search (see config.LNS_SETTINGS); --time-limit is its total budget.")
+    parser.add_argument('--greedy', action='store_true',
+                        help="Only build the greedy draft (milliseconds, no solver) and write its own report.")
+    parser.add_argument('--greedy-hint', action='store_true',
+                        help="Hint CP-SAT with the greedy draft when no warm start file is given.")
+    modes.add_argument('--portfolio', action='store_true',
+                       help="Solve with several configurations in parallel processes (see config.PORTFOLIO_SETTINGS).")
+    modes.add_argument('--staged', action='store_true',
+                       help="Two-stage objective: balance terms first, then all terms (see config.STAGED_OBJECTIVE_SETTINGS).")
+    parser.add_argument('--staged-slack', type=float, metavar='FRACTION',
+                        help="Staged objective: relative slack on the stage-1 balance cost, e.g. 0.02.")
+    parser.add_argument('--warm-start', metavar='PATH',
+                        help="Previous solution (.json dump or output .xlsx) used as solution hints.")
+    parser.add_argument('--profile', action='store_true', help="Print per-stage timing at the end of the run.")
+    parser.add_argument('--profile-jsonl', metavar='PATH', help="Append per-stage timing as JSON lines.")
+    parser.add_argument('--profile-stage', metavar='NAME',
+                        help="Capture one stage in depth, e.g. build.objective or excel.")
+    parser.add_argument('--profile-mode', choices=['cprofile', 'tracemalloc'], help="Capture tool for --profile-stage.")
+    return parser.parse_args(argv)
+
+
+def _solver_settings_from_args(args):
+    """Merges CLI values on top of config.SOLVER_SETTINGS."""
+    settings = dict(config.SOLVER_SETTINGS)
+    overrides = {
+        'num_workers': args.workers,
+        'max_time_seconds': args.time_limit,
+        'relative_gap_limit': args.gap,
+        'random_seed': args.seed,
+    }
+    settings.update({k: v for k, v in overrides.items() if v is not None})
+    if args.log:
+        settings['log_search_progress'] = True
+    return settings
+
+
+def _model_settings_from_args(args):
+    """Merges CLI flags on top of config.MODEL_SETTINGS."""
+    settings = dict(config.MODEL_SETTINGS)
+    if args.lean:
+        settings['lean'] = True
+    if args.symmetry_breaking:
+        settings['symmetry_breaking'] = True
+    if args.role_slots:
+        settings['role_slots'] = True
+    return settings
+
+
+def _rolling_settings_from_args(args):
+    """Merges CLI values on top of config.ROLLING_HORIZON_SETTINGS."""
+    settings = dict(config.ROLLING_HORIZON_SETTINGS)
+    if args.rolling:
+        settings['enabled'] = True
+    if args.window_days is not None:
+        settings['window_days'] = args.window_days
+    if args.commit_days is not None:
+        settings['commit_days'] = args.commit_days
+    return settings
+
+
+def _decomposition_settings_from_args(args):
+    """Merges CLI values on top of config.ROLE_DECOMPOSITION_SETTINGS."""
+    settings = dict(config.ROLE_DECOMPOSITION_SETTINGS)
+    if args.role_tiers:
+        settings['enabled'] = True
+    if args.no_repair:
+        settings['repair'] = False
+    return settings
+
+
+def _lns_settings_from_args(args):
+    """Merges CLI values on top of config.LNS_SETTINGS."""
+    settings = dict(config.LNS_SETTINGS)
+    if args.lns:
+        settings['enabled'] = True
+    if args.time_limit is not None:
+        settings['time_limit'] = args.time_limit
+    return settings
+
+
+def _staged_settings_from_args(args):
+    """Merges CLI values on top of config.STAGED_OBJECTIVE_SETTINGS."""
+    settings = dict(config.STAGED_OBJECTIVE_SETTINGS)
+    if args.staged:
+        settings['enabled'] = True
+    if args.staged_slack is not None:
+        settings['relative_slack'] = args.staged_slack
+    return settings
+
+
+def _profiler_from_args(args):
+    """Returns a PipelineProfiler if profiling is requested (config or CLI), else None."""
+    settings = dict(config.PROFILING_SETTINGS)
+    if args.profile_jsonl:
+        settings['jsonl_path'] = args.profile_jsonl
+    if args.profile_stage:
+        settings['capture_stage'] = args.profile_stage
+    if args.profile_mode:
+        settings['capture_mode'] = args.profile_mode
+
+    if not (args.profile or settings['enabled'] or settings['jsonl_path'] or settings['capture_stage']):
+        return None
+    return PipelineProfiler(settings['jsonl_path'], settings['capture_stage'], settings['capture_mode'])
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    solver_settings = _solver_settings_from_args(args)
+    profiler = _profiler_from_args(args)
+    try:
+        _run_pipeline(args, solver_settings, profiler)
+    finally:
+        if profiler is not None and (args.profile or config.PROFILING_SETTINGS['enabled']):
+            profiler.print_summary()
+
+
+def _write_reports(solution, roles, stats, employees, daily_demand, day_labels, profiler):
+    """Solution dump (next run's warm start) and the Excel report."""
+    # Persist the solution so next week's run can warm-start from it
+    if config.SOLUTION_DUMP_FILE:
+        solution_io.save_solution_json(config.SOLUTION_DUMP_FILE, solution_io.solution_to_values(solution),
+                                       employees, stats)
+
+    # --------------------------------------------------------
+    # Generate Excel Report
+    # --------------------------------------------------------
+    with profile_stage(profiler, 'excel') as counts:
+        write_excel = (excel_writer.create_excel_schedule_fast if config.EXCEL_WRITE_ONLY
+                       else excel_writer.create_excel_schedule)
+        counts['cells_written'] = write_excel(
+            solution,
+            employees,
+            config.EMPLOYEE_COLORS,
+            roles=roles,
+            daily_demand=daily_demand,
+            day_labels=day_labels
+        )
+
+
+def _committed_days_writer(employees, daily_demand, day_labels, snapshot_dir):
+    """Rolling horizon: on_commit callback writing the days committed so far as an xlsx snapshot."""
+    os.makedirs(snapshot_dir, exist_ok=True)
+
+    def on_commit(solution, committed_days):
+        write_excel = (excel_writer.create_excel_schedule_fast if config.EXCEL_WRITE_ONLY
+                       else excel_writer.create_excel_schedule)
+        write_excel(solution[:, :committed_days], employees, config.EMPLOYEE_COLORS,
+                    output_filename=os.path.join(snapshot_dir, f"committed_{committed_days:03d}.xlsx"),
+                    daily_demand=daily_demand[:committed_days], day_labels=day_labels[:committed_days])
+    return on_commit
+
+
+def _run_pipeline(args, solver_settings, profiler):
+    """Image parsing -> pre-check -> warm start -> build & solve -> reports."""
+    # Employee limits in config are weekly; the planning calendar may span several weeks
+    employees = demand_calendar.scale_employees_to_horizon(config.EMPLOYEES, config.NUM_DAYS)
+    daily_demand = demand_calendar.build_daily_demand(config.NUM_DAYS)
+    day_labels = demand_calendar.day_labels(config.NUM_DAYS)
+
+    stream_settings = dict(config.STREAMING_SETTINGS)
+    if args.snapshot_format:
+        stream_settings['format'] = args.snapshot_format
+    rolling_settings = _rolling_settings_from_args(args)
+    decomposition_settings = _decomposition_settings_from_args(args)
+    lns_settings = _lns_settings_from_args(args)
+    streamer = None
+    portfolio_enabled = args.portfolio or config.PORTFOLIO_SETTINGS['enabled']
+    staged_enabled = _staged_settings_from_args(args)['enabled']
+
+    # argparse rejects two mode flags; modes enabled in config are checked here (first one wins)
+    enabled_modes = [name for name, enabled in (('rolling horizon', rolling_settings['enabled']),
+                                                ('role tiers', decomposition_settings['enabled']),
+                                                ('LNS', lns_settings['enabled']),
+                                                ('portfolio', portfolio_enabled),
+                                                ('staged objective', staged_enabled)) if enabled]
+    if len(enabled_modes) > 1:
+        print(f"⚠️ Several solve modes enabled ({', '.join(enabled_modes)}); only {enabled_modes[0]} runs.")
+    if (args.stream or stream_settings['enabled']) and not (rolling_settings['enabled'] or lns_settings['enabled']
+                                                             or portfolio_enabled
+                                                             or decomposition_settings['enabled']):
+        streamer = SolutionStreamer(employees, config.NUM_DAYS, config.NUM_SHIFTS,
+                                    config.EMPLOYEE_COLORS, stream_settings,
+                                    daily_demand=daily_demand, day_labels=day_labels)
+        print(f"--- Streaming snapshots to {stream_settings['snapshot_dir']} ---")
 
-def main():
     # --------------------------------------------------------
     # Image Parsing Logic
     # --------------------------------------------------------
-    image_constraints = []
-
-    if config.ENABLE_IMAGE_PARSING:
-        print(f"--- Image Mode Enabled: Parsing {config.IMAGE_FILENAME} ---")
-        if os.path.exists(config.IMAGE_FILENAME):
-            try:
-                # Import only if needed
-                from image_process.cv2_image_parser import ScheduleImageParser
-
-                # Define employee order in image (Top -> Down)
-                img_employee_order = list(range(len(config.EMPLOYEES))) # 0 to N
-
-                parser = ScheduleImageParser(config.IMAGE_FILENAME)
-                image_constraints = parser.parse_tables(img_employee_order)
-                print(f"V Success: Extracted {len(image_constraints)} constraints from image.")
-            except ImportError:
-                print("X Error: cv2_image_parser.py is missing or invalid.")
-            except AttributeError:
-                print("X Error: 'parse_tables' function not found.")
-            except Exception as e:
-                print(f"X General Error parsing image: {e}")
+    with profile_stage(profiler, 'image_parsing') as counts:
+        image_constraints = []
+
+        if config.ENABLE_IMAGE_PARSING:
+            print(f"--- Image Mode Enabled: Parsing {config.IMAGE_FILENAME} ---")
+            if os.path.exists(config.IMAGE_FILENAME):
+                try:
+                    # Import only if needed
+                    from image_process.cv2_image_parser import ScheduleImageParser
+
+                    # Define employee order in image (Top -> Down)
+                    img_employee_order = list(range(len(employees))) # 0 to N
+
+                    parser = ScheduleImageParser(config.IMAGE_FILENAME)
+                    image_constraints = parser.parse_tables(img_employee_order)
+                    print(f"V Success: Extracted {len(image_constraints)} constraints from image.")
+                except ImportError:
+                    print("X Error: cv2_image_parser.py is missing or invalid.")
+                except AttributeError:
+                    print("X Error: 'parse_tables' function not found.")
+                except Exception as e:
+                    print(f"X General Error parsing image: {e}")
+            else:
+                print(f"X Error: File {config.IMAGE_FILENAME} not found.")
         else:
-            print(f"X Error: File {config.IMAGE_FILENAME} not found.")
-    else:
-        print("--- Image Mode Disabled: Using manual list only ---")
+            print("--- Image Mode Disabled: Using manual list only ---")
+        counts['constraints_extracted'] = len(image_constraints)
 
     # Combine Lists
     unavailable_requests = config.MANUAL_REQUESTS + image_constraints
 
+    # --------------------------------------------------------
+    # Capacity Pre-Check (Fail Fast)
+    # --------------------------------------------------------
+    if config.ENABLE_CAPACITY_CHECK and not args.skip_precheck:
+        with profile_stage(profiler, 'capacity_check') as counts:
+            report = capacity_check.check_capacity(employees, unavailable_requests,
+                                                   config.WORKED_LAST_SAT_NIGHT, config.NUM_DAYS, config.NUM_SHIFTS)
+            counts['issues'] = len(report['issues'])
+        capacity_check.print_capacity_report(report)
+        if not report['feasible']:
+            print("Solver skipped: demand cannot be met with the current availability.")
+            return
+
+    # --------------------------------------------------------
+    # Warm Start (Previous Solution)
+    # --------------------------------------------------------
+    hint_values = None
+    warm_start_file = args.warm_start or config.WARM_START_FILE
+    if warm_start_file:
+        if os.path.exists(warm_start_file):
+            with profile_stage(profiler, 'warm_start') as counts:
+                hint_values = solution_io.load_previous_solution(warm_start_file, employees, config.NUM_DAYS)
+                counts['hints'] = len(hint_values)
+        else:
+            print(f"X Warm start file {warm_start_file} not found, starting from scratch.")
+
+    # --------------------------------------------------------
+    # Greedy Draft (Standalone or Warm Start)
+    # --------------------------------------------------------
+    if args.greedy or ((args.greedy_hint or config.WARM_START_GREEDY) and hint_values is None):
+        with profile_stage(profiler, 'greedy') as counts:
+            start = time.perf_counter()
+            draft, unfilled = greedy_scheduler.greedy_schedule(
+                employees, unavailable_requests, config.MANUAL_ASSIGNMENTS,
+                config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT, daily_demand)
+            greedy_scheduler.print_greedy_report(draft, unfilled, employees, time.perf_counter() - start)
+            counts['unfilled'] = len(unfilled)
+        if args.greedy:
+            with profile_stage(profiler, 'excel') as counts:
+                counts['cells_written'] = greedy_scheduler.write_greedy_excel(draft, employees, daily_demand,
+                                                                              day_labels)
+            return
+        hint_values = solution_io.solution_to_values(draft)
+
+    # --------------------------------------------------------
+    # Rolling Horizon (Long Horizons)
+    # --------------------------------------------------------
+    if rolling_settings['enabled']:
+        on_commit = None
+        if args.stream or stream_settings['enabled']:
+            on_commit = _committed_days_writer(employees, daily_demand, day_labels, stream_settings['snapshot_dir'])
+            print(f"--- Streaming committed days to {stream_settings['snapshot_dir']} ---")
+        solution, roles, windows = rolling_horizon.solve_rolling_horizon(
+            employees, unavailable_requests, config.MANUAL_ASSIGNMENTS,
+            config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT,
+            solver_settings=solver_settings,
+            model_settings=_model_settings_from_args(args),
+            rolling_settings=rolling_settings,
+            daily_demand=daily_demand,
+            hint_values=hint_values,
+            on_commit=on_commit,
+            profiler=profiler
+        )
+        if solution is None:
+            print("\n❌ No feasible solution found for a rolling-horizon window. Try relaxing constraints.")
+            return
+
+        # Windows only see their own days; the evaluator scores the whole horizon
+        objective = penalty_eval.evaluate_objective(solution, employees, config.WORKED_LAST_SAT_NOON,
+                                                    config.WORKED_LAST_SAT_NIGHT, roles=roles)
+        stats = {'wall_time': sum(w['wall_time'] for w in windows), 'objective': objective,
+                 'windows': len(windows)}
+        print(f"\n✅ Rolling-horizon solution: {len(windows)} windows | Cost (Penalty): {objective} | "
+              f"Wall time: {stats['wall_time']:.2f}s")
+        _write_reports(solution, roles, stats, employees, daily_demand, day_labels, profiler)
+        return
+
+    # --------------------------------------------------------
+    # Role-Tier Decomposition (Large Sites)
+    # --------------------------------------------------------
+    if decomposition_settings['enabled']:
+        solution, stages = role_decomposition.solve_role_tiers(
+            employees, unavailable_requests, config.MANUAL_ASSIGNMENTS,
+            config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT,
+            solver_settings=solver_settings,
+            model_settings=_model_settings_from_args(args),
+            decomposition_settings=decomposition_settings,
+            daily_demand=daily_demand,
+            hint_values=hint_values,
+            profiler=profiler
+        )
+        if solution is None:
+            print("\n❌ No feasible solution found by the role-tier decomposition. Try relaxing constraints.")
+            return
+
+        objective = penalty_eval.evaluate_objective(solution, employees, config.WORKED_LAST_SAT_NOON,
+                                                    config.WORKED_LAST_SAT_NIGHT)
+        role_decomposition.print_decomposition_report(stages, objective)
+        stats = {'wall_time': sum(s['wall_time'] for s in stages), 'objective': objective, 'stages': len(stages)}
+        print(f"\n✅ Role-tier solution: {len(stages)} stages | Cost (Penalty): {objective} | "
+              f"Wall time: {stats['wall_time']:.2f}s")
+        _write_reports(solution, None, stats, employees, daily_demand, day_labels, profiler)
+        return
+
     # --------------------------------------------------------
     # Run Optimization
     # --------------------------------------------------------
-    solver, status, shift_vars = optimizer.build_and_solve_model(
-        employees=config.EMPLOYEES,
-        unavailable_requests=unavailable_requests,
-        manual_assignments=config.MANUAL_ASSIGNMENTS,
-        worked_last_sat_noon=config.WORKED_LAST_SAT_NOON,
-        worked_last_sat_night=config.WORKED_LAST_SAT_NIGHT
-    )
+    role_vars = {}  # Filled by the role-slot model variant only
+    stage_stats = []  # Filled by the staged objective only
+    lns_stats = None
+    if lns_settings['enabled']:
+        solver, status, shift_vars, lns_stats = lns.solve_lns(
+            employees, unavailable_requests, config.MANUAL_ASSIGNMENTS,
+            config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT,
+            solver_settings=solver_settings,
+            model_settings=_model_settings_from_args(args),
+            lns_settings=lns_settings,
+            hint_values=hint_values,
+            profiler=profiler,
+            role_vars=role_vars
+        )
+        if lns_stats is not None:
+            lns.print_lns_report(lns_stats)
+    else:
+        solver, status, shift_vars = optimizer.build_and_solve_model(
+            employees=employees,
+            unavailable_requests=unavailable_requests,
+            manual_assignments=config.MANUAL_ASSIGNMENTS,
+            worked_last_sat_noon=config.WORKED_LAST_SAT_NOON,
+            worked_last_sat_night=config.WORKED_LAST_SAT_NIGHT,
+            solver_settings=solver_settings,
+            solution_callback=streamer,
+            hint_values=hint_values,
+            model_settings=_model_settings_from_args(args),
+            profiler=profiler,
+            role_vars=role_vars,
+            portfolio_settings={'enabled': True} if args.portfolio else None,
+            staged_settings=_staged_settings_from_args(args),
+            stage_stats=stage_stats
+        )
+        if stage_stats:
+            optimizer.print_staged_report(stage_stats)
 
     # --------------------------------------------------------
     # Output Results
     # --------------------------------------------------------
     if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-        print(f"\n✅ Solution Found! Cost (Penalty): {solver.ObjectiveValue()}")
+        stats = lns_stats if lns_stats is not None else optimizer.get_solve_stats(solver)
+        if stage_stats:
+            stats['wall_time'] = sum(s['wall_time'] for s in stage_stats)
+        # Staged fallback: the stage-1 solver only knows the balance cost
+        stage1_kept = len(stage_stats) > 1 and stage_stats[0].get('kept', False)
+
+        # Read the assignment once; every report below works on this array
+        solution_index = solution_io.build_solution_index(shift_vars, len(employees),
+                                                          config.NUM_DAYS, config.NUM_SHIFTS)
+        solution = solution_io.extract_solution(solver, solution_index)
+        roles = None
+        if role_vars:
+            roles = solution_io.extract_roles(solver, role_vars, len(employees),
+                                              config.NUM_DAYS, config.NUM_SHIFTS)
+
+        if stage1_kept:
+            objective = penalty_eval.evaluate_objective(solution, employees, config.WORKED_LAST_SAT_NOON,
+                                                        config.WORKED_LAST_SAT_NIGHT, roles=roles)
+            print(f"\n✅ Solution Found (stage 1 only)! Cost (Penalty): {objective}")
+            print(f"   Status: FEASIBLE | Wall time: {stats['wall_time']:.2f}s | "
+                  f"Balance cost: {stats['objective']} | Balance gap: {stats['gap']:.2%}")
+            stats = dict(stats, objective=objective)
+        else:
+            status_name = "OPTIMAL" if status == cp_model.OPTIMAL else "FEASIBLE"
+            print(f"\n✅ Solution Found! Cost (Penalty): {stats['objective']}")
+            print(f"   Status: {status_name} | Wall time: {stats['wall_time']:.2f}s | "
+                  f"Best bound: {stats['best_bound']} | Gap: {stats['gap']:.2%}")
+
+            # Cross-check the model against the independent NumPy evaluator
+            ok, evaluated = penalty_eval.check_objective(stats['objective'], solution, employees,
+                                                         config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT,
+                                                         optimal=status == cp_model.OPTIMAL, roles=roles)
+            if not ok:
+                print(f"⚠️ Objective mismatch: solver reports {stats['objective']}, evaluator computes {evaluated}.")
 
         # --------------------------------------------------------
         # DEBUG: RAW SOLVER VALIDATION
@@ -110,19 +506,14 @@ def main():
         #
         # print("=" * 50 + "\n")
 
-        # --------------------------------------------------------
-        # Generate Excel Report
-        # --------------------------------------------------------
-        excel_writer.create_excel_schedule(
-            solver,
-            shift_vars,
-            config.EMPLOYEES,
-            config.NUM_DAYS,
-            config.NUM_SHIFTS,
-            config.EMPLOYEE_COLORS
-        )
+        _write_reports(solution, roles, stats, employees, daily_demand, day_labels, profiler)
     else:
         print("\n❌ No feasible solution found. Try relaxing constraints.")
+        if status == cp_model.INFEASIBLE and config.EXPLAIN_INFEASIBILITY:
+            conflict, minimal = infeasibility.explain_infeasibility(
+                employees, unavailable_requests, config.MANUAL_ASSIGNMENTS,
+                config.WORKED_LAST_SAT_NOON, config.WORKED_LAST_SAT_NIGHT)
+            infeasibility.print_infeasibility_report(conflict, employees, minimal)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,23 +1,67 @@
 # optimizer.py
+import contextlib
+import itertools
+from collections import Counter
+
 from ortools.sat.python import cp_model
 import config
+import demand_calendar
+import portfolio
+from config import ROLE_ORDER
+from profiling import profile_stage
 
 
 # ============================================================================
 # 1. Model Initialization & Variables
 # ============================================================================
-def _init_model_and_variables(employees, num_days, num_shifts):
+def collect_blocked_cells(employees, unavailable_requests, worked_last_sat_night):
+    """
+    Returns the set of (e, d, s) cells that can never be assigned:
+    direct requests, the implied Reinforcement block (Morning/Noon blocked) and
+    Sunday Morning after a Saturday Night shift.
+    """
+    blocked = set(unavailable_requests)
+    for (e, d, s) in list(blocked):
+        if s in (config.SHIFT_MORNING, config.SHIFT_NOON):
+            blocked.add((e, d, config.SHIFT_REINFORCEMENT))
+    for emp_id in worked_last_sat_night:
+        if 0 <= emp_id < len(employees):
+            blocked.add((emp_id, 0, config.SHIFT_MORNING))
+    return blocked
+
+
+def _is_fixed_zero(var):
+    """Lean mode stores blocked cells as the constant 0 instead of a BoolVar."""
+    return isinstance(var, int)
+
+
+def _guard(constraint, guards, key):
+    """
+    Attaches the enforcement literal of a constraint family (infeasibility explanation only).
+    `guards` maps a family key to its literal, e.g. infeasibility.AssumptionRegistry.
+    """
+    if guards is not None:
+        constraint.OnlyEnforceIf(guards.literal(key))
+    return constraint
+
+
+def _init_model_and_variables(employees, num_days, num_shifts, blocked_cells=None):
     """
     Initializes the CP Model and creates the boolean variables grid.
+    Cells in `blocked_cells` (lean mode) get the constant 0 instead of a variable.
     Returns: model, shift_vars (dict)
     """
     model = cp_model.CpModel()
     shift_vars = {}
+    blocked_cells = blocked_cells or set()
 
     for e in range(len(employees)):
         for d in range(num_days):
             for s in range(num_shifts):
-                shift_vars[(e, d, s)] = model.NewBoolVar(f'shift_{e}_{d}_{s}')
+                if (e, d, s) in blocked_cells:
+                    shift_vars[(e, d, s)] = 0
+                else:
+                    shift_vars[(e, d, s)] = model.NewBoolVar(f'shift_{e}_{d}_{s}')
 
     return model, shift_vars
 
@@ -25,11 +69,16 @@ def _init_model_and_variables(employees, num_days, num_shifts):
 # ============================================================================
 # 2. Hard Constraints: Role Demands
 # ============================================================================
-def _add_role_demand_constraints(model, shift_vars, employees, num_days, num_shifts):
+def _add_role_demand_constraints(model, shift_vars, employees, num_days, num_shifts, guards=None, daily_demand=None,
+                                 partial_headcount=False):
     """
     Enforces that every shift has the required number of Guards, Controllers, and Supervisors.
+    guards (optional): enforcement literals per slot, key ('demand', d, s).
+    daily_demand (optional): demand table per day, defaults to demand_calendar.build_daily_demand.
+    partial_headcount: the headcount is an upper bound only (role-tier decomposition: the
+    supervisors and controllers are scheduled first, the guards fill the rest later).
     """
-    weekend_days = [5, 6]
+    daily_demand = demand_calendar.build_daily_demand(num_days) if daily_demand is None else daily_demand
 
     # Helper: Group employees by role capabilities
     supervisors_idx = [i for i, emp in enumerate(employees) if emp.get('role') == 'supervisor']
@@ -39,7 +88,7 @@ def _add_role_demand_constraints(model, shift_vars, employees, num_days, num_shi
     capable_controller_idx = supervisors_idx + controllers_idx
 
     for d in range(num_days):
-        daily_config = config.WEEKEND_DEMAND if d in weekend_days else config.WEEKDAY_DEMAND
+        daily_config = daily_demand[d]
 
         for s in range(num_shifts):
             # Retrieve specific shift requirements
@@ -50,25 +99,82 @@ def _add_role_demand_constraints(model, shift_vars, employees, num_days, num_shi
 
             total_needed = req_guard + req_controller + req_supervisor
 
+            slot_key = ('demand', d, s)
+
             # A. Total Headcount Constraint
-            model.Add(sum(shift_vars[(e, d, s)] for e in range(len(employees))) == total_needed)
+            headcount = sum(shift_vars[(e, d, s)] for e in range(len(employees)))
+            _guard(model.Add(headcount <= total_needed) if partial_headcount else model.Add(headcount == total_needed),
+                   guards, slot_key)
 
             # B. Supervisor Constraint (Strict)
             if req_supervisor > 0:
-                model.Add(sum(shift_vars[(e, d, s)] for e in supervisors_idx) >= req_supervisor)
+                _guard(model.Add(sum(shift_vars[(e, d, s)] for e in supervisors_idx) >= req_supervisor),
+                       guards, slot_key)
 
             # C. Skilled Workers Constraint (Controller + Supervisor coverage)
             needed_skilled = req_controller + req_supervisor
             if needed_skilled > 0:
-                model.Add(sum(shift_vars[(e, d, s)] for e in capable_controller_idx) >= needed_skilled)
+                _guard(model.Add(sum(shift_vars[(e, d, s)] for e in capable_controller_idx) >= needed_skilled),
+                       guards, slot_key)
+
+
+def _add_role_slot_constraints(model, shift_vars, employees, num_days, num_shifts, role_vars, daily_demand=None):
+    """
+    Role-slot model variant: one BoolVar per (employee, day, shift, role) the employee is qualified for.
+    Every worked shift fills exactly one role and every role gets exactly its demand, so the
+    solver decides role placement instead of the report matching it afterwards.
+    Fills role_vars: {(e, d, s, role): BoolVar}.
+    """
+    daily_demand = demand_calendar.build_daily_demand(num_days) if daily_demand is None else daily_demand
+    level = {role: i for i, role in enumerate(ROLE_ORDER)}
+    emp_level = [level.get(emp.get('role'), level['guard']) for emp in employees]
+
+    for d in range(num_days):
+        daily_config = daily_demand[d]
+
+        for s in range(num_shifts):
+            reqs = daily_config.get(s, {})
+            candidates = [e for e in range(len(employees)) if not _is_fixed_zero(shift_vars[(e, d, s)])]
+            placements = {e: [] for e in candidates}
+
+            for role in ROLE_ORDER:
+                required = reqs.get(role, 0)
+                if required == 0:
+                    continue
+                fillers = []
+                for e in candidates:
+                    if emp_level[e] > level[role]:
+                        continue
+                    var = model.NewBoolVar(f'role_{e}_{d}_{s}_{role}')
+                    role_vars[(e, d, s, role)] = var
+                    placements[e].append(var)
+                    fillers.append(var)
+                model.Add(sum(fillers) == required)
+
+            # A worked shift is exactly one role placement (none if the slot needs no role of this level)
+            for e, options in placements.items():
+                model.Add(sum(options) == shift_vars[(e, d, s)])
 
 
 # ============================================================================
 # 3. Hard Constraints: Shift Rules (Overlap & Spacing)
 # ============================================================================
-def _add_shift_rules_constraints(model, shift_vars, num_employees, num_days, num_shifts):
+def _boundary_pairs(num_shifts, distance):
+    """
+    (shift of the day before day 0, shift of day 0) pairs that are `distance` slots apart in the
+    flattened day*shift timeline: the in-horizon sequence rules that cross the start of the horizon.
+    """
+    return [(prev, prev + distance - num_shifts) for prev in range(num_shifts)
+            if 0 <= prev + distance - num_shifts < num_shifts]
+
+
+def _add_shift_rules_constraints(model, shift_vars, num_employees, num_days, num_shifts, guards=None,
+                                 previous_day=None):
     """
     Enforces logical shift rules: No back-to-back shifts, no overlapping shifts.
+    guards (optional): enforcement literals for the back-to-back rule, key ('back_to_back', e).
+    previous_day (optional): (E, S) 0/1 schedule of the day before day 0 (rolling horizon);
+    the back-to-back rule then also holds across the start of the horizon.
     """
     # A. Prevent back-to-back shifts (Global check)
     total_slots = num_days * num_shifts
@@ -77,38 +183,57 @@ def _add_shift_rules_constraints(model, shift_vars, num_employees, num_days, num
             day, shift = t // num_shifts, t % num_shifts
             next_day, next_shift = (t + 1) // num_shifts, (t + 1) % num_shifts
 
-            model.Add(shift_vars[(e, day, shift)] + shift_vars[(e, next_day, next_shift)] <= 1)
+            pair = [shift_vars[(e, day, shift)], shift_vars[(e, next_day, next_shift)]]
+            if any(_is_fixed_zero(v) for v in pair):
+                continue
+            _guard(model.Add(sum(pair) <= 1), guards, ('back_to_back', e))
+
+    # Across the start of the horizon: the last slot of the previous day -> the first slot of day 0
+    if previous_day is not None:
+        for e in range(num_employees):
+            for prev_shift, shift in _boundary_pairs(num_shifts, 1):
+                if previous_day[e][prev_shift] and not _is_fixed_zero(shift_vars[(e, 0, shift)]):
+                    _guard(model.Add(shift_vars[(e, 0, shift)] == 0), guards, ('back_to_back', e))
 
     # B. Reinforcement Shift Overlaps (Specific to this business logic)
     # Reinforcement (3) overlaps with Morning (0) and Noon (1)
     for e in range(num_employees):
         for d in range(num_days):
+            reinforcement = shift_vars[(e, d, config.SHIFT_REINFORCEMENT)]
+            if _is_fixed_zero(reinforcement):
+                continue
             # Conflict: Reinforcement vs Morning
-            model.Add(shift_vars[(e, d, config.SHIFT_REINFORCEMENT)] +
-                      shift_vars[(e, d, config.SHIFT_MORNING)] <= 1)
+            if not _is_fixed_zero(shift_vars[(e, d, config.SHIFT_MORNING)]):
+                model.Add(reinforcement + shift_vars[(e, d, config.SHIFT_MORNING)] <= 1)
             # Conflict: Reinforcement vs Noon
-            model.Add(shift_vars[(e, d, config.SHIFT_REINFORCEMENT)] +
-                      shift_vars[(e, d, config.SHIFT_NOON)] <= 1)
+            if not _is_fixed_zero(shift_vars[(e, d, config.SHIFT_NOON)]):
+                model.Add(reinforcement + shift_vars[(e, d, config.SHIFT_NOON)] <= 1)
 
     # C. Absolute Max One Shift Per Day
     # This ensures an employee works AT MOST one shift per calendar day.
     for e in range(num_employees):
         for d in range(num_days):
             # הסכום של כל המשמרות (בוקר, צהריים, לילה, תגבור) ביום ספציפי חייב להיות <= 1
-            model.Add(sum(shift_vars[(e, d, s)] for s in range(num_shifts)) <= 1)
+            day_vars = [shift_vars[(e, d, s)] for s in range(num_shifts)
+                        if not _is_fixed_zero(shift_vars[(e, d, s)])]
+            if len(day_vars) > 1:
+                model.Add(sum(day_vars) <= 1)
 
 
 # ============================================================================
 # 4. Hard Constraints: Availability & Assignments
 # ============================================================================
 def _add_availability_constraints(model, shift_vars, employees, unavailable_requests,
-                                  manual_assignments, worked_last_sat_noon, worked_last_sat_night):
+                                  manual_assignments, worked_last_sat_noon, worked_last_sat_night, guards=None,
+                                  num_days=None):
     """
     Handles specific user requests, forced assignments, and history from previous week.
     Also propagates overlapping constraints (e.g., Blocked Morning -> Blocked Reinforcement).
+    guards (optional): enforcement literals, keys ('availability', e, d) and ('manual', e, d, s).
+    num_days (optional): planning horizon, defaults to config.NUM_DAYS.
     """
     num_employees = len(employees)
-    num_days = config.NUM_DAYS
+    num_days = config.NUM_DAYS if num_days is None else num_days
     num_shifts = config.NUM_SHIFTS
 
     # Convert list to set for O(1) lookups
@@ -119,8 +244,8 @@ def _add_availability_constraints(model, shift_vars, employees, unavailable_requ
         for d in range(num_days):
             # 1. Apply Direct Constraints
             for s in range(num_shifts):
-                if (e, d, s) in unavailable_set:
-                    model.Add(shift_vars[(e, d, s)] == 0)
+                if (e, d, s) in unavailable_set and not _is_fixed_zero(shift_vars[(e, d, s)]):
+                    _guard(model.Add(shift_vars[(e, d, s)] == 0), guards, ('availability', e, d))
 
             # 2. Apply Implied Constraints for Reinforcement (Shift 3)
             # If employee cannot work Morning (0) OR Noon (1), they cannot work Reinforcement (3)
@@ -128,15 +253,16 @@ def _add_availability_constraints(model, shift_vars, employees, unavailable_requ
             is_morning_blocked = (e, d, config.SHIFT_MORNING) in unavailable_set
             is_noon_blocked = (e, d, config.SHIFT_NOON) in unavailable_set
 
-            if is_morning_blocked or is_noon_blocked:
+            reinforcement = shift_vars[(e, d, config.SHIFT_REINFORCEMENT)]
+            if (is_morning_blocked or is_noon_blocked) and not _is_fixed_zero(reinforcement):
                 # Force Reinforcement to be 0 as well
-                model.Add(shift_vars[(e, d, config.SHIFT_REINFORCEMENT)] == 0)
+                _guard(model.Add(reinforcement == 0), guards, ('availability', e, d))
 
     # B. Previous Week Context (Rest Rules)
     for emp_id in worked_last_sat_night:
-        if 0 <= emp_id < num_employees:
+        if 0 <= emp_id < num_employees and not _is_fixed_zero(shift_vars[(emp_id, 0, 0)]):
             # Cannot work Sunday Morning if worked Saturday Night
-            model.Add(shift_vars[(emp_id, 0, 0)] == 0)
+            _guard(model.Add(shift_vars[(emp_id, 0, 0)] == 0), guards, ('availability', emp_id, 0))
 
     # C. Manual Assignments (Force Shift)
     for assign in manual_assignments:
@@ -147,53 +273,268 @@ def _add_availability_constraints(model, shift_vars, employees, unavailable_requ
                 name = employees[e]['name']
                 raise ValueError(f"CRITICAL CONFLICT: {name} forced to (D:{d}, S:{s}) but marked unavailable.")
 
-            model.Add(shift_vars[(e, d, s)] == 1)
+            _guard(model.Add(shift_vars[(e, d, s)] == 1), guards, ('manual', e, d, s))
 
 
-def _add_labor_law_constraints(model, shift_vars, employees, num_days, num_shifts):
+def _add_labor_law_constraints(model, shift_vars, employees, num_days, num_shifts, lean=False, guards=None):
     """
-    Enforces max consecutive work days (7-day streak prevention).
+    Enforces max consecutive work days (config.MAX_CONSECUTIVE_DAYS, sliding window over any
+    horizon, continuing the history streak) and the absolute max_shifts limit.
+    Lean mode uses the day sums directly: "max one shift per day" already makes them 0/1.
+    guards (optional): enforcement literals, keys ('streak', e, first_day, last_day) and ('max_shifts', e).
     """
+    window = config.MAX_CONSECUTIVE_DAYS + 1
     for e in range(len(employees)):
         work_days_vars = []
         for d in range(num_days):
+            if lean:
+                work_days_vars.append(sum(shift_vars[(e, d, s)] for s in range(num_shifts)))
+                continue
             is_working = model.NewBoolVar(f'working_day_{e}_{d}')
             # Link shift_vars to is_working
             model.Add(sum(shift_vars[(e, d, s)] for s in range(num_shifts)) > 0).OnlyEnforceIf(is_working)
             model.Add(sum(shift_vars[(e, d, s)] for s in range(num_shifts)) == 0).OnlyEnforceIf(is_working.Not())
             work_days_vars.append(is_working)
 
-        streak = employees[e].get('history_streak', 0)
+        streak = min(employees[e].get('history_streak', 0), window - 1)
 
-        # If they already have a streak, limit the beginning of the week
+        # If they already have a streak, the first window continues it: not all of its first
+        # `limit` days may be worked. Later windows containing those days are implied.
+        first_window = 0
         if streak > 0:
-            limit = 7 - streak
-            if limit <= num_days and limit > 0:
-                model.Add(sum(work_days_vars[0:limit]) < limit)
+            limit = window - streak
+            if limit <= num_days:
+                _guard(model.Add(sum(work_days_vars[0:limit]) < limit), guards, ('streak', e, 0, limit - 1))
+            first_window = 1
 
-        # Standard check within the current week
-        if streak == 0:
-            model.Add(sum(work_days_vars) < 7)
+        # Sliding window: no `window` consecutive days all worked
+        for start in range(first_window, num_days - window + 1):
+            _guard(model.Add(sum(work_days_vars[start:start + window]) < window), guards,
+                   ('streak', e, start, start + window - 1))
+
+        # Hard Limit (Absolute Max)
+        total_worked = sum(shift_vars[(e, d, s)] for d in range(num_days) for s in range(num_shifts))
+        _guard(model.Add(total_worked <= employees[e]['max_shifts']), guards, ('max_shifts', e))
 
 
 # ============================================================================
-# 5. Soft Constraints (Objective Function)
+# 5. Symmetry Breaking
 # ============================================================================
-def _build_objective_function(model, shift_vars, employees, num_days, num_shifts, worked_last_sat_noon,
-                              worked_last_sat_night):
+def _find_interchangeable_groups(employees, unavailable_requests, manual_assignments,
+                                 worked_last_sat_noon, worked_last_sat_night, previous_day=None):
     """
-    Constructs the objective function to minimize penalties (Balance, Fairness, Rest).
+    Groups employees that are identical from the model's point of view: same attributes
+    (everything except id/name), same unavailability, forced shifts and previous-week history
+    (including the previous_day row, see _add_shift_rules_constraints).
+    Returns: list of groups (lists of employee indices), only groups with 2+ members.
     """
-    w = config.WEIGHTS
-    objective_terms = []
+    per_employee_cells = {i: set() for i in range(len(employees))}
+    per_employee_forced = {i: set() for i in range(len(employees))}
+    for (e, d, s) in unavailable_requests:
+        if e in per_employee_cells:
+            per_employee_cells[e].add((d, s))
+    for (e, d, s) in manual_assignments:
+        if e in per_employee_forced:
+            per_employee_forced[e].add((d, s))
+
+    groups = {}
+    for i, emp in enumerate(employees):
+        attributes = tuple(sorted((k, v) for k, v in emp.items() if k not in ('id', 'name')))
+        key = (attributes,
+               frozenset(per_employee_cells[i]),
+               frozenset(per_employee_forced[i]),
+               i in worked_last_sat_noon,
+               i in worked_last_sat_night,
+               None if previous_day is None else tuple(int(v) for v in previous_day[i]))
+        groups.setdefault(key, []).append(i)
+
+    return [members for members in groups.values() if len(members) > 1]
+
+
+def _add_lex_greater_equal(model, x_vars, y_vars, name):
+    """
+    Adds x >=lex y for two equal-length lists of literals.
+    eq_i means "the first i positions are equal"; while it holds, x_i >= y_i is required.
+    eq_i only has to be forced true (never false) for the ordering to be enforced.
+    """
+    eq_prev = None  # None stands for the constant True at position 0
+    for i, (x, y) in enumerate(zip(x_vars, y_vars)):
+        not_eq = [] if eq_prev is None else [eq_prev.Not()]
+        # eq_i => x_i >= y_i
+        model.AddBoolOr(not_eq + [x, y.Not()])
+        if i == len(x_vars) - 1:
+            break
+        eq_next = model.NewBoolVar(f'{name}_eq_{i + 1}')
+        # eq_i AND (x_i == y_i) => eq_{i+1}
+        model.AddBoolOr(not_eq + [x.Not(), y.Not(), eq_next])
+        model.AddBoolOr(not_eq + [x, y, eq_next])
+        eq_prev = eq_next
+
+
+def _add_symmetry_breaking_constraints(model, shift_vars, employees, unavailable_requests, manual_assignments,
+                                       worked_last_sat_noon, worked_last_sat_night, num_days, num_shifts,
+                                       previous_day=None):
+    """
+    Orders the schedules of fully interchangeable employees lexicographically, so CP-SAT
+    does not explore their permutations. Names are still mapped by index afterwards;
+    since the employees are identical, any order is an equally good schedule.
+    Returns: list of interchangeable groups.
+    """
+    groups = _find_interchangeable_groups(employees, unavailable_requests, manual_assignments,
+                                          worked_last_sat_noon, worked_last_sat_night, previous_day)
+
+    for members in groups:
+        for a, b in zip(members, members[1:]):
+            x_vars, y_vars = [], []
+            for d in range(num_days):
+                for s in range(num_shifts):
+                    x, y = shift_vars[(a, d, s)], shift_vars[(b, d, s)]
+                    # Blocked cells (lean mode) are identical within a group
+                    if _is_fixed_zero(x) or _is_fixed_zero(y):
+                        continue
+                    x_vars.append(x)
+                    y_vars.append(y)
+            if x_vars:
+                _add_lex_greater_equal(model, x_vars, y_vars, f'lex_{a}_{b}')
+
+    return groups
 
-    # --- Helper: Identify ALL Special Role Slots (Supervisor + Controller) ---
-    # We create a unified pool of 36 shifts (15 Sup + 21 Ctrl)
+
+# ============================================================================
+# 6. Soft Constraints (Objective Function)
+# ============================================================================
+def _add_lean_penalty(model, shift_vars, cell_groups, name):
+    """
+    Lean encoding of a penalty literal p >= AND(OR(group) for group in cell_groups).
+    Minimization only needs the "pattern => p" direction, so one clause is emitted per
+    combination of cells and nothing forces p back to 0.
+    Returns None when the pattern can never occur: a group has only blocked cells, or two
+    groups fall on the same day (ruled out by "max one shift per day").
+    """
+    days = [group[0][1] for group in cell_groups]
+    if len(set(days)) < len(days):
+        return None
+
+    groups = []
+    for group in cell_groups:
+        live = [shift_vars[cell] for cell in group if not _is_fixed_zero(shift_vars[cell])]
+        if not live:
+            return None
+        groups.append(live)
+
+    penalty = model.NewBoolVar(name)
+    for combo in itertools.product(*groups):
+        model.AddBoolOr([lit.Not() for lit in combo] + [penalty])
+    return penalty
+
+
+def _sequence_patterns(num_shifts, w):
+    """
+    Sequence penalties as data: (weight, [(day_offset, shifts), ...]) with offsets -2..0
+    relative to the day the pattern ends on. Same-day patterns (chains A/B, gaps inside a day)
+    need two shifts on one day and are left out: "max one shift per day" rules them out.
+    """
+    night, noon = config.SHIFT_NIGHT, config.SHIFT_NOON
+    early = {s for s in (config.SHIFT_MORNING, config.SHIFT_REINFORCEMENT) if s < num_shifts}
+
+    patterns = [(w['CONSECUTIVE_NIGHTS'], [(-2, {night}), (-1, {night}), (0, {night})])]
+    # Rest gap across midnight: slots t and t + 2 of the flattened day * shift timeline
+    for s in range(max(0, num_shifts - 2), num_shifts):
+        patterns.append((w['REST_GAP'], [(-1, {s}), (0, {s + 2 - num_shifts})]))
+    if 'CHAIN_3_PENALTY' in w and early:
+        # Chain C: (Night D-2) -> (Noon D-1) -> (Morn/Reinf D)
+        patterns.append((w['CHAIN_3_PENALTY'], [(-2, {night}), (-1, {noon}), (0, early)]))
+    return patterns
+
+
+def _sequence_automaton(num_shifts, patterns):
+    """
+    Transition table of the per-employee sequence automaton (SEQUENCE_ENCODING 'automaton',
+    experimental: it adds to the day_cost variables and slows the search, use 'day_cost').
+    Each day is read as two symbols: its label (0 = off, 1 + s = shift s), then its penalty.
+    State (a, b): the label two days back (reduced to the labels some pattern looks at) and
+    yesterday's label. Reading label c leads to an intermediate state that only accepts the
+    penalty of the patterns ending on this day, then to (b, c).
+    Returns: (transitions, initial_state, final_states, cost_values)
+    """
+    num_labels = num_shifts + 1
+    watched_two_back = {1 + s for _, groups in patterns for offset, shifts in groups if offset == -2 for s in shifts}
+
+    def reduce_two_back(label):
+        return label if label in watched_two_back else 0
+
+    def day_cost(a, b, c):
+        window = {-2: a, -1: b, 0: c}
+        return sum(weight for weight, groups in patterns
+                   if all(window[offset] - 1 in shifts for offset, shifts in groups))
+
+    def day_state(a, b):
+        return a * num_labels + b
+
+    transitions = []
+    cost_values = set()
+    next_state = num_labels * num_labels
+    for a in sorted({0} | watched_two_back):
+        for b, c in itertools.product(range(num_labels), repeat=2):
+            cost = day_cost(a, b, c)
+            cost_values.add(cost)
+            transitions.append((day_state(a, b), c, next_state))
+            transitions.append((next_state, cost, day_state(reduce_two_back(b), c)))
+            next_state += 1
+
+    final_states = sorted({day_state(a, b) for a in {0} | watched_two_back for b in range(num_labels)})
+    return transitions, day_state(0, 0), final_states, sorted(cost_values)
+
+
+def _add_sequence_day_costs(model, shift_vars, e, num_days, num_shifts, patterns, automaton=None):
+    """
+    One penalty variable per day for one employee's sequence patterns, bounded below by the
+    linear cut cost_d >= weight * (matched cells - (len - 1)) per pattern. Patterns ending on
+    the same day exclude each other, so at the optimum cost_d is exactly the day's penalty.
+    automaton (optional, experimental, see _sequence_automaton) also pins cost_d for every
+    solution, at the price of more variables and a much slower search.
+    Returns: list of per-day penalty variables (already weighted).
+    """
+    if automaton:
+        cost_values = automaton[3]
+    else:
+        cost_values = {0}
+        for weight, _ in patterns:
+            cost_values |= {v + weight for v in cost_values}
+    cost_domain = cp_model.Domain.FromValues(cost_values)
+
+    symbols = []
+    day_costs = []
+    for d in range(num_days):
+        cost = model.NewIntVarFromDomain(cost_domain, f'seq_cost_{e}_{d}')
+        day_costs.append(cost)
+        for weight, groups in patterns:
+            if d + min(offset for offset, _ in groups) < 0:
+                continue
+            matched = sum(shift_vars[(e, d + offset, s)] for offset, shifts in groups for s in shifts)
+            model.Add(cost >= weight * (matched - (len(groups) - 1)))
+
+        if automaton:
+            label = model.NewIntVar(0, num_shifts, f'seq_label_{e}_{d}')
+            model.Add(label == sum((s + 1) * shift_vars[(e, d, s)] for s in range(num_shifts)))
+            symbols.extend([label, cost])
+
+    if automaton:
+        transitions, initial_state, final_states, _ = automaton
+        model.AddAutomaton(symbols, initial_state, final_states, transitions)
+    return day_costs
+
+
+def special_role_slots(num_days, num_shifts, daily_demand=None):
+    """
+    Unified pool of special role slots (Supervisor + Controller) used by the role fairness term.
+    A (d, s) slot appears once per special role it needs (36 slots = 15 Sup + 21 Ctrl for a week).
+    """
+    daily_demand = demand_calendar.build_daily_demand(num_days) if daily_demand is None else daily_demand
     special_slots = []
-    weekend_days = [5, 6]
 
     for d in range(num_days):
-        daily_config = config.WEEKEND_DEMAND if d in weekend_days else config.WEEKDAY_DEMAND
+        daily_config = daily_demand[d]
         for s in range(num_shifts):
             reqs = daily_config.get(s, {})
             # If shift requires supervisor OR controller, add to pool
@@ -202,9 +543,67 @@ def _build_objective_function(model, shift_vars, employees, num_days, num_shifts
                 special_slots.append((d, s))
             if reqs.get('controller', 0) > 0:
                 special_slots.append((d, s))
+    return special_slots
+
+
+def special_role_demand(num_days, num_shifts, daily_demand=None):
+    """Exact number of Supervisor + Controller placements over the horizon (role-slot model)."""
+    daily_demand = demand_calendar.build_daily_demand(num_days) if daily_demand is None else daily_demand
+    total = 0
+    for d in range(num_days):
+        daily_config = daily_demand[d]
+        for s in range(num_shifts):
+            reqs = daily_config.get(s, {})
+            total += reqs.get('supervisor', 0) + reqs.get('controller', 0)
+    return total
+
+
+def _live_count(cells):
+    """Number of cells that are real variables (not fixed to 0 in lean mode)."""
+    return sum(1 for v in cells if not _is_fixed_zero(v))
+
+
+def _largest_sum(values, k):
+    """Sum of the k largest values (0 for k <= 0)."""
+    return sum(sorted(values, reverse=True)[:max(k, 0)])
+
+
+def _build_objective_function(model, shift_vars, employees, num_days, num_shifts, worked_last_sat_noon,
+                              worked_last_sat_night, lean=False, role_vars=None, daily_demand=None,
+                              objective_parts=None, previous_day=None):
+    """
+    Constructs the objective function to minimize penalties (Balance, Fairness, Rest).
+    Every auxiliary gets the tightest domain the instance allows (horizon, max_shifts,
+    live cells, special slots), so the bounds stay valid for any NUM_DAYS.
+    Lean mode encodes the burnout patterns (B, C) with one-sided implications only;
+    WEIGHTS['SEQUENCE_ENCODING'] 'day_cost' replaces them with one cost per day ('automaton',
+    experimental, adds an automaton on top of those costs).
+    role_vars (role-slot model): role fairness counts the special roles actually filled.
+    objective_parts (optional dict) receives the 'balance' (D: target deviation, MAX_SHIFTS
+    excess) and 'total' expressions for staged solving (see solve_staged).
+    previous_day (optional): (E, S) schedule of the day before day 0; the rest gaps that cross
+    the start of the horizon are penalized as inside it (rolling horizon).
+    """
+    w = config.WEIGHTS
+    objective_terms = []
+    balance_terms = []  # Dominant terms (section D), also part of objective_terms
+
+    # --- Helper: Identify ALL Special Role Slots (Supervisor + Controller) ---
+    special_slots = special_role_slots(num_days, num_shifts, daily_demand)
 
     # Calculate Totals for the Unified Pool
     total_special_demand = len(special_slots)  # Should be 36
+    slot_multiplicity = Counter(special_slots)
+
+    # Role-slot model: exact placements instead of every shift worked in a special slot
+    special_placements = special_placement_days = None
+    if role_vars:
+        total_special_demand = special_role_demand(num_days, num_shifts, daily_demand)
+        special_placements, special_placement_days = {}, {}
+        for (e, d, s, role), var in role_vars.items():
+            if role in ('supervisor', 'controller'):
+                special_placements.setdefault(e, []).append(var)
+                special_placement_days.setdefault(e, set()).add(d)
 
     # Calculate Total Capacity of ALL eligible employees (Supervisors + Controllers)
     # We sum the 'target_shifts' of everyone who belongs to this "Upper Tier"
@@ -216,6 +615,13 @@ def _build_objective_function(model, shift_vars, employees, num_days, num_shifts
     total_special_capacity = sum(employees[i]['target_shifts'] for i in special_employees_indices)
     if total_special_capacity == 0: total_special_capacity = 1  # Avoid division by zero
 
+    sequence_encoding = w.get('SEQUENCE_ENCODING', 'reified')
+    sequence_patterns = sequence_automaton = None
+    if sequence_encoding in ('automaton', 'day_cost'):
+        sequence_patterns = _sequence_patterns(num_shifts, w)
+        if sequence_encoding == 'automaton':
+            sequence_automaton = _sequence_automaton(num_shifts, sequence_patterns)
+
     for e in range(len(employees)):
         # Gather shift lists for easy summing
         all_shifts = []
@@ -231,209 +637,598 @@ def _build_objective_function(model, shift_vars, employees, num_days, num_shifts
             for s in range(num_shifts):
                 all_shifts.append(shift_vars[(e, d, s)])
 
+        # Upper bounds of the counts: at most one shift per day and never above max_shifts
+        live_days = sum(1 for d in range(num_days) if _live_count(shift_vars[(e, d, s)] for s in range(num_shifts)))
+        max_worked = min(live_days, employees[e]['max_shifts'])
+        night_ub = min(max_worked, _live_count(night_shifts))
+        morning_ub = min(max_worked, _live_count(morning_shifts))
+        evening_ub = min(max_worked, _live_count(evening_shifts))
+
         # --- A. Min/Max Constraints (Soft) ---
         # Nights
-        excess_nights = model.NewIntVar(0, 7, f'exc_night_{e}')
-        shortage_nights = model.NewIntVar(0, 7, f'short_night_{e}')
+        excess_nights = model.NewIntVar(0, max(0, night_ub - employees[e]['max_nights']), f'exc_night_{e}')
+        shortage_nights = model.NewIntVar(0, max(0, employees[e]['min_nights']), f'short_night_{e}')
         model.Add(sum(night_shifts) <= employees[e]['max_nights'] + excess_nights)
         model.Add(sum(night_shifts) + shortage_nights >= employees[e]['min_nights'])
         objective_terms.append(excess_nights * w['MAX_NIGHTS'])
         objective_terms.append(shortage_nights * w['MIN_NIGHTS'])
 
         # Mornings
-        excess_morns = model.NewIntVar(0, 7, f'exc_morn_{e}')
-        shortage_morns = model.NewIntVar(0, 7, f'short_morn_{e}')
+        excess_morns = model.NewIntVar(0, max(0, morning_ub - employees[e]['max_mornings']), f'exc_morn_{e}')
+        shortage_morns = model.NewIntVar(0, max(0, employees[e]['min_mornings']), f'short_morn_{e}')
         model.Add(sum(morning_shifts) <= employees[e]['max_mornings'] + excess_morns)
         model.Add(sum(morning_shifts) + shortage_morns >= employees[e]['min_mornings'])
         objective_terms.append(excess_morns * w['MAX_MORNINGS'])
         objective_terms.append(shortage_morns * w['MIN_MORNINGS'])
 
         # Evenings
-        excess_evenings = model.NewIntVar(0, 7, f'exc_eve_{e}')
-        shortage_evenings = model.NewIntVar(0, 7, f'short_eve_{e}')
+        excess_evenings = model.NewIntVar(0, max(0, evening_ub - employees[e]['max_evenings']), f'exc_eve_{e}')
+        shortage_evenings = model.NewIntVar(0, max(0, employees[e]['min_evenings']), f'short_eve_{e}')
         model.Add(sum(evening_shifts) <= employees[e]['max_evenings'] + excess_evenings)
         model.Add(sum(evening_shifts) + shortage_evenings >= employees[e]['min_evenings'])
         objective_terms.append(excess_evenings * w['MAX_EVENINGS'])
 
-        # --- B. Consecutive Nights ---
-        for d in range(num_days - 2):
-            is_3_nights = model.NewBoolVar(f'3nights_{e}_{d}')
-            # (Night D) AND (Night D+1) AND (Night D+2)
-            model.AddBoolAnd([
-                shift_vars[(e, d, 2)],
-                shift_vars[(e, d + 1, 2)],
-                shift_vars[(e, d + 2, 2)]
-            ]).OnlyEnforceIf(is_3_nights)
-
-            # Logic inversion for clean optimization
-            model.AddBoolOr([
-                shift_vars[(e, d, 2)].Not(),
-                shift_vars[(e, d + 1, 2)].Not(),
-                shift_vars[(e, d + 2, 2)].Not()
-            ]).OnlyEnforceIf(is_3_nights.Not())
-
-            objective_terms.append(is_3_nights * w['CONSECUTIVE_NIGHTS'])
-
-        # --- C. Rest Gaps (Quick Turnarounds) ---
-        total_slots = num_days * num_shifts
-
-        # 1. Standard Gap Check: Work Shift X -> Skip 1 -> Work Shift Y
-        for t in range(total_slots - 2):
-            day, shift = t // num_shifts, t % num_shifts
-            t2 = t + 2
-            day2, shift2 = t2 // num_shifts, t2 % num_shifts
-
-            bad_gap = model.NewBoolVar(f'bad_gap_{e}_{t}')
-            model.AddBoolAnd([shift_vars[(e, day, shift)], shift_vars[(e, day2, shift2)]]).OnlyEnforceIf(bad_gap)
-            model.AddBoolOr([shift_vars[(e, day, shift)].Not(), shift_vars[(e, day2, shift2)].Not()]).OnlyEnforceIf(
-                bad_gap.Not())
-            objective_terms.append(bad_gap * w['REST_GAP'])
-
-        # 2. Smart Heavy Burnout Check (8-8-8 Pattern)
-        # Identifies exhausting sequences: Work -> 8h Rest -> Work -> 8h Rest -> Work
-        if 'CHAIN_3_PENALTY' in w:
-            for d in range(num_days - 1):
-                # --- Helper Vars: Is employee working Morning OR Reinforcement? ---
-
-                # Check for Day D
-                is_morn_reinf_today = model.NewBoolVar(f'is_mr_{e}_{d}')
-                model.AddBoolOr([shift_vars[(e, d, 0)], shift_vars[(e, d, 3)]]).OnlyEnforceIf(is_morn_reinf_today)
-                model.AddBoolAnd([shift_vars[(e, d, 0)].Not(), shift_vars[(e, d, 3)].Not()]).OnlyEnforceIf(
-                    is_morn_reinf_today.Not())
-
-                # Check for Day D+1
-                is_morn_reinf_tom = model.NewBoolVar(f'is_mr_{e}_{d + 1}')
-                model.AddBoolOr([shift_vars[(e, d + 1, 0)], shift_vars[(e, d + 1, 3)]]).OnlyEnforceIf(
-                    is_morn_reinf_tom)
-                model.AddBoolAnd([shift_vars[(e, d + 1, 0)].Not(), shift_vars[(e, d + 1, 3)].Not()]).OnlyEnforceIf(
-                    is_morn_reinf_tom.Not())
-
-                # --- Pattern A: (Morn/Reinf D) -> (Night D) -> (Noon D+1) ---
-                # Sequence: Early Start -> Late Finish -> Mid Start next day
-                is_chain_a = model.NewBoolVar(f'chainA_{e}_{d}')
+        # --- B/C. Sequence Penalties ---
+        if sequence_patterns is not None:
+            # One penalty variable per day instead of a BoolVar per pattern and time slot
+            objective_terms.extend(_add_sequence_day_costs(model, shift_vars, e, num_days, num_shifts,
+                                                           sequence_patterns, sequence_automaton))
+        else:
+            # --- B. Consecutive Nights ---
+            for d in range(num_days - 2):
+                if lean:
+                    is_3_nights = _add_lean_penalty(model, shift_vars, [[(e, d + k, 2)] for k in range(3)],
+                                                    f'3nights_{e}_{d}')
+                    if is_3_nights is not None:
+                        objective_terms.append(is_3_nights * w['CONSECUTIVE_NIGHTS'])
+                    continue
+
+                is_3_nights = model.NewBoolVar(f'3nights_{e}_{d}')
+                # (Night D) AND (Night D+1) AND (Night D+2)
                 model.AddBoolAnd([
-                    is_morn_reinf_today,
                     shift_vars[(e, d, 2)],
-                    shift_vars[(e, d + 1, 1)]
-                ]).OnlyEnforceIf(is_chain_a)
-                # Logic inversion
-                model.AddBoolOr([is_morn_reinf_today.Not(), shift_vars[(e, d, 2)].Not(),
-                                 shift_vars[(e, d + 1, 1)].Not()]).OnlyEnforceIf(is_chain_a.Not())
+                    shift_vars[(e, d + 1, 2)],
+                    shift_vars[(e, d + 2, 2)]
+                ]).OnlyEnforceIf(is_3_nights)
+
+                # Logic inversion for clean optimization
+                model.AddBoolOr([
+                    shift_vars[(e, d, 2)].Not(),
+                    shift_vars[(e, d + 1, 2)].Not(),
+                    shift_vars[(e, d + 2, 2)].Not()
+                ]).OnlyEnforceIf(is_3_nights.Not())
+
+                objective_terms.append(is_3_nights * w['CONSECUTIVE_NIGHTS'])
+
+            # --- C. Rest Gaps (Quick Turnarounds) ---
+            total_slots = num_days * num_shifts
+
+            # 1. Standard Gap Check: Work Shift X -> Skip 1 -> Work Shift Y
+            for t in range(total_slots - 2):
+                day, shift = t // num_shifts, t % num_shifts
+                t2 = t + 2
+                day2, shift2 = t2 // num_shifts, t2 % num_shifts
+
+                if lean:
+                    bad_gap = _add_lean_penalty(model, shift_vars, [[(e, day, shift)], [(e, day2, shift2)]],
+                                                f'bad_gap_{e}_{t}')
+                    if bad_gap is not None:
+                        objective_terms.append(bad_gap * w['REST_GAP'])
+                    continue
+
+                bad_gap = model.NewBoolVar(f'bad_gap_{e}_{t}')
+                model.AddBoolAnd([shift_vars[(e, day, shift)], shift_vars[(e, day2, shift2)]]).OnlyEnforceIf(bad_gap)
+                model.AddBoolOr([shift_vars[(e, day, shift)].Not(), shift_vars[(e, day2, shift2)].Not()]).OnlyEnforceIf(
+                    bad_gap.Not())
+                objective_terms.append(bad_gap * w['REST_GAP'])
+
+            # 2. Smart Heavy Burnout Check (8-8-8 Pattern)
+            # Identifies exhausting sequences: Work -> 8h Rest -> Work -> 8h Rest -> Work
+            if 'CHAIN_3_PENALTY' in w and lean:
+                for d in range(num_days - 1):
+                    morn_reinf = lambda day: [(e, day, 0), (e, day, 3)]
+                    patterns = [
+                        ('chainA', [morn_reinf(d), [(e, d, 2)], [(e, d + 1, 1)]]),
+                        ('chainB', [[(e, d, 1)], morn_reinf(d + 1), [(e, d + 1, 2)]]),
+                    ]
+                    if d < num_days - 2:
+                        patterns.append(('chainC', [[(e, d, 2)], [(e, d + 1, 1)], morn_reinf(d + 2)]))
+
+                    for label, cell_groups in patterns:
+                        is_chain = _add_lean_penalty(model, shift_vars, cell_groups, f'{label}_{e}_{d}')
+                        if is_chain is not None:
+                            objective_terms.append(is_chain * w['CHAIN_3_PENALTY'])
+
+            elif 'CHAIN_3_PENALTY' in w:
+                for d in range(num_days - 1):
+                    # --- Helper Vars: Is employee working Morning OR Reinforcement? ---
+
+                    # Check for Day D
+                    is_morn_reinf_today = model.NewBoolVar(f'is_mr_{e}_{d}')
+                    model.AddBoolOr([shift_vars[(e, d, 0)], shift_vars[(e, d, 3)]]).OnlyEnforceIf(is_morn_reinf_today)
+                    model.AddBoolAnd([shift_vars[(e, d, 0)].Not(), shift_vars[(e, d, 3)].Not()]).OnlyEnforceIf(
+                        is_morn_reinf_today.Not())
+
+                    # Check for Day D+1
+                    is_morn_reinf_tom = model.NewBoolVar(f'is_mr_{e}_{d + 1}')
+                    model.AddBoolOr([shift_vars[(e, d + 1, 0)], shift_vars[(e, d + 1, 3)]]).OnlyEnforceIf(
+                        is_morn_reinf_tom)
+                    model.AddBoolAnd([shift_vars[(e, d + 1, 0)].Not(), shift_vars[(e, d + 1, 3)].Not()]).OnlyEnforceIf(
+                        is_morn_reinf_tom.Not())
+
+                    # --- Pattern A: (Morn/Reinf D) -> (Night D) -> (Noon D+1) ---
+                    # Sequence: Early Start -> Late Finish -> Mid Start next day
+                    is_chain_a = model.NewBoolVar(f'chainA_{e}_{d}')
+                    model.AddBoolAnd([
+                        is_morn_reinf_today,
+                        shift_vars[(e, d, 2)],
+                        shift_vars[(e, d + 1, 1)]
+                    ]).OnlyEnforceIf(is_chain_a)
+                    # Logic inversion
+                    model.AddBoolOr([is_morn_reinf_today.Not(), shift_vars[(e, d, 2)].Not(),
+                                     shift_vars[(e, d + 1, 1)].Not()]).OnlyEnforceIf(is_chain_a.Not())
 
-                objective_terms.append(is_chain_a * w['CHAIN_3_PENALTY'])
+                    objective_terms.append(is_chain_a * w['CHAIN_3_PENALTY'])
 
-                # --- Pattern B: (Noon D) -> (Morn/Reinf D+1) -> (Night D+1) ---
-                # Sequence: Noon -> Early Start next day -> Late Finish next day
-                is_chain_b = model.NewBoolVar(f'chainB_{e}_{d}')
-                model.AddBoolAnd([
-                    shift_vars[(e, d, 1)],
-                    is_morn_reinf_tom,
-                    shift_vars[(e, d + 1, 2)]
-                ]).OnlyEnforceIf(is_chain_b)
-                # Logic inversion
-                model.AddBoolOr([shift_vars[(e, d, 1)].Not(), is_morn_reinf_tom.Not(),
-                                 shift_vars[(e, d + 1, 2)].Not()]).OnlyEnforceIf(is_chain_b.Not())
-
-                objective_terms.append(is_chain_b * w['CHAIN_3_PENALTY'])
-
-                # --- Pattern C: (Night D) -> (Noon D+1) -> (Morn/Reinf D+2) ---
-                # Sequence: Night -> Noon next day -> Early Start the following day
-                # Must check bounds for D+2
-                if d < num_days - 2:
-                    # Check for Day D+2
-                    is_morn_reinf_after_tom = model.NewBoolVar(f'is_mr_{e}_{d + 2}')
-                    model.AddBoolOr([shift_vars[(e, d + 2, 0)], shift_vars[(e, d + 2, 3)]]).OnlyEnforceIf(
-                        is_morn_reinf_after_tom)
-                    model.AddBoolAnd(
-                        [shift_vars[(e, d + 2, 0)].Not(), shift_vars[(e, d + 2, 3)].Not()]).OnlyEnforceIf(
-                        is_morn_reinf_after_tom.Not())
-
-                    is_chain_c = model.NewBoolVar(f'chainC_{e}_{d}')
+                    # --- Pattern B: (Noon D) -> (Morn/Reinf D+1) -> (Night D+1) ---
+                    # Sequence: Noon -> Early Start next day -> Late Finish next day
+                    is_chain_b = model.NewBoolVar(f'chainB_{e}_{d}')
                     model.AddBoolAnd([
-                        shift_vars[(e, d, 2)],  # Night (Day D)
-                        shift_vars[(e, d + 1, 1)],  # Noon (Day D+1)
-                        is_morn_reinf_after_tom  # Morn/Reinf (Day D+2)
-                    ]).OnlyEnforceIf(is_chain_c)
+                        shift_vars[(e, d, 1)],
+                        is_morn_reinf_tom,
+                        shift_vars[(e, d + 1, 2)]
+                    ]).OnlyEnforceIf(is_chain_b)
                     # Logic inversion
-                    model.AddBoolOr([shift_vars[(e, d, 2)].Not(), shift_vars[(e, d + 1, 1)].Not(),
-                                     is_morn_reinf_after_tom.Not()]).OnlyEnforceIf(is_chain_c.Not())
-
-                    objective_terms.append(is_chain_c * w['CHAIN_3_PENALTY'])
+                    model.AddBoolOr([shift_vars[(e, d, 1)].Not(), is_morn_reinf_tom.Not(),
+                                     shift_vars[(e, d + 1, 2)].Not()]).OnlyEnforceIf(is_chain_b.Not())
+
+                    objective_terms.append(is_chain_b * w['CHAIN_3_PENALTY'])
+
+                    # --- Pattern C: (Night D) -> (Noon D+1) -> (Morn/Reinf D+2) ---
+                    # Sequence: Night -> Noon next day -> Early Start the following day
+                    # Must check bounds for D+2
+                    if d < num_days - 2:
+                        # Check for Day D+2
+                        is_morn_reinf_after_tom = model.NewBoolVar(f'is_mr_{e}_{d + 2}')
+                        model.AddBoolOr([shift_vars[(e, d + 2, 0)], shift_vars[(e, d + 2, 3)]]).OnlyEnforceIf(
+                            is_morn_reinf_after_tom)
+                        model.AddBoolAnd(
+                            [shift_vars[(e, d + 2, 0)].Not(), shift_vars[(e, d + 2, 3)].Not()]).OnlyEnforceIf(
+                            is_morn_reinf_after_tom.Not())
+
+                        is_chain_c = model.NewBoolVar(f'chainC_{e}_{d}')
+                        model.AddBoolAnd([
+                            shift_vars[(e, d, 2)],  # Night (Day D)
+                            shift_vars[(e, d + 1, 1)],  # Noon (Day D+1)
+                            is_morn_reinf_after_tom  # Morn/Reinf (Day D+2)
+                        ]).OnlyEnforceIf(is_chain_c)
+                        # Logic inversion
+                        model.AddBoolOr([shift_vars[(e, d, 2)].Not(), shift_vars[(e, d + 1, 1)].Not(),
+                                         is_morn_reinf_after_tom.Not()]).OnlyEnforceIf(is_chain_c.Not())
+
+                        objective_terms.append(is_chain_c * w['CHAIN_3_PENALTY'])
 
         # Previous week gap penalties
         if e in worked_last_sat_noon:
             objective_terms.append(shift_vars[(e, 0, 0)] * w['REST_GAP'])
         if e in worked_last_sat_night:
             objective_terms.append(shift_vars[(e, 0, 1)] * w['REST_GAP'])
+        # Rest gaps across the start of the horizon, as inside it (rolling horizon)
+        if previous_day is not None:
+            for prev_shift, shift in _boundary_pairs(num_shifts, 2):
+                if previous_day[e][prev_shift]:
+                    objective_terms.append(shift_vars[(e, 0, shift)] * w['REST_GAP'])
 
         # --- D. Target Shifts (General Balance) ---
         total_worked = sum(all_shifts)
         target = employees[e]['target_shifts']
 
         # 1. Quadratic Penalty for deviation (Smoother distribution)
-        delta = model.NewIntVar(0, 21, f'delta_target_{e}')
+        delta_lb = max(0, target - max_worked)
+        delta_ub = max(target, max_worked - target)
+        delta = model.NewIntVar(delta_lb, delta_ub, f'delta_target_{e}')
         model.Add(total_worked - target <= delta)
         model.Add(target - total_worked <= delta)
 
-        delta_sq = model.NewIntVar(0, 400, f'delta_sq_{e}')
-        model.AddMultiplicationEquality(delta_sq, [delta, delta])
-        objective_terms.append(delta_sq * w['TARGET_SHIFTS'])
+        encoding = w.get('TARGET_DEVIATION_ENCODING', 'multiplication')
+        if encoding == 'element':
+            # Table lookup: delta_sq = squares[delta]
+            delta_sq = model.NewIntVar(delta_lb * delta_lb, delta_ub * delta_ub, f'delta_sq_{e}')
+            model.AddElement(delta, [k * k for k in range(delta_ub + 1)], delta_sq)
+            balance_terms.append(delta_sq * w['TARGET_SHIFTS'])
+        elif encoding == 'piecewise':
+            # Convex unit steps: the k-th unit of deviation costs 2k - 1, so k units cost k^2.
+            # Ordering the steps keeps the value exact for any solution, not only at the optimum.
+            steps = [model.NewBoolVar(f'delta_step_{e}_{k}') for k in range(1, delta_ub + 1)]
+            model.Add(sum(steps) == delta)
+            for k in range(len(steps) - 1):
+                model.AddImplication(steps[k + 1], steps[k])
+            balance_terms.append(sum((2 * k - 1) * step for k, step in enumerate(steps, 1)) * w['TARGET_SHIFTS'])
+        else:
+            delta_sq = model.NewIntVar(delta_lb * delta_lb, delta_ub * delta_ub, f'delta_sq_{e}')
+            model.AddMultiplicationEquality(delta_sq, [delta, delta])
+            balance_terms.append(delta_sq * w['TARGET_SHIFTS'])
 
         # 2. Soft Cap Penalty (Anti-Hogging)
         if 'MAX_SHIFTS' in w:
-            excess_shifts = model.NewIntVar(0, 7, f'excess_shifts_{e}')
+            excess_shifts = model.NewIntVar(0, max(0, max_worked - target), f'excess_shifts_{e}')
             model.Add(excess_shifts >= total_worked - target)
-            objective_terms.append(excess_shifts * w['MAX_SHIFTS'])
-
-        # 3. Hard Limit (Absolute Max)
-        model.Add(total_worked <= employees[e]['max_shifts'])
+            balance_terms.append(excess_shifts * w['MAX_SHIFTS'])
 
         # --- E. Unified Special Role Fairness (Supervisor + Controller) ---
         # Balancing the 36 "Prestige" shifts across all eligible staff
         if employees[e].get('role') in ['supervisor', 'controller']:
             # Count how many special shifts this employee actually got
-            assigned_special = sum(shift_vars[(e, d, s)] for d, s in special_slots)
+            if special_placements is not None:
+                assigned_special = sum(special_placements.get(e, []))
+            else:
+                assigned_special = sum(shift_vars[(e, d, s)] for d, s in special_slots)
 
             # Cross-multiplication for Integer Arithmetic:
             # (ActualSpecial * TotalSpecialCapacity) should equal (Target * TotalSpecialDemand)
             val_actual = assigned_special * total_special_capacity
             val_expected = target * total_special_demand
 
+            # Most special slots the employee can get: one shift per day, the max_worked best days
+            if special_placements is not None:
+                special_per_day = [int(d in special_placement_days.get(e, ())) for d in range(num_days)]
+            else:
+                special_per_day = [max((slot_multiplicity[(d, s)] for s in range(num_shifts)
+                                        if not _is_fixed_zero(shift_vars[(e, d, s)])), default=0)
+                                   for d in range(num_days)]
+            special_ub = _largest_sum(special_per_day, max_worked)
+
             # Calculate difference
-            diff = model.NewIntVar(-2000, 2000, f'spec_diff_{e}')
+            diff_lb = -val_expected
+            diff_ub = special_ub * total_special_capacity - val_expected
+            diff = model.NewIntVar(diff_lb, diff_ub, f'spec_diff_{e}')
             model.Add(diff == val_actual - val_expected)
 
-            abs_diff = model.NewIntVar(0, 2000, f'abs_spec_diff_{e}')
+            abs_diff = model.NewIntVar(max(0, diff_lb, -diff_ub), max(-diff_lb, diff_ub), f'abs_spec_diff_{e}')
             model.AddAbsEquality(abs_diff, diff)
 
             # Apply dynamic weight from employee config (default 5)
             role_weight = employees[e].get('role_priority', 5)
             objective_terms.append(abs_diff * role_weight)
 
+    objective_terms.extend(balance_terms)
     model.Minimize(sum(objective_terms))
+    if objective_parts is not None:
+        objective_parts['balance'] = sum(balance_terms)
+        objective_parts['total'] = sum(objective_terms)
 
 
 # ============================================================================
-# 6. Main Orchestrator
+# 7. Warm Start (Solution Hints)
 # ============================================================================
-def build_and_solve_model(employees, unavailable_requests, manual_assignments,
-                          worked_last_sat_noon, worked_last_sat_night):
+def _add_solution_hints(model, shift_vars, hint_values, blocked_cells):
+    """
+    Feeds a previous solution (e.g. last week's schedule) to CP-SAT as hints.
+    hint_values: dict {(e, d, s): 0/1}; missing cells are hinted as 0.
+    Cells that are unavailable this week (see collect_blocked_cells) are not hinted at all.
+    Returns: number of previously assigned cells that were dropped.
+    """
+    dropped = 0
+    for key, var in shift_vars.items():
+        value = 1 if hint_values.get(key) else 0
+        if key in blocked_cells or _is_fixed_zero(var):
+            dropped += value
+            continue
+        model.AddHint(var, value)
+
+    return dropped
+
+
+# ============================================================================
+# 8. Solver Configuration
+# ============================================================================
+def _create_solver(solver_settings=None):
+    """
+    Creates a CpSolver and applies the given settings (defaults to config.SOLVER_SETTINGS).
+    Keys with a None value are left at the CP-SAT default.
+    """
+    settings = dict(config.SOLVER_SETTINGS)
+    if solver_settings:
+        settings.update(solver_settings)
+
+    solver = cp_model.CpSolver()
+    params = solver.parameters
+
+    if settings.get('num_workers') is not None:
+        params.num_workers = settings['num_workers']
+    if settings.get('max_time_seconds') is not None:
+        params.max_time_in_seconds = settings['max_time_seconds']
+    if settings.get('relative_gap_limit') is not None:
+        params.relative_gap_limit = settings['relative_gap_limit']
+    if settings.get('random_seed') is not None:
+        params.random_seed = settings['random_seed']
+    params.log_search_progress = bool(settings.get('log_search_progress', False))
+
+    return solver
+
+
+def get_solve_stats(solver):
+    """
+    Summarizes the search: wall time, objective, best bound and relative gap.
+    Returns: dict {'wall_time', 'objective', 'best_bound', 'gap'}
+    """
+    objective = solver.ObjectiveValue()
+    best_bound = solver.BestObjectiveBound()
+    gap = abs(objective - best_bound) / max(1.0, abs(objective))
+
+    return {
+        'wall_time': solver.WallTime(),
+        'objective': objective,
+        'best_bound': best_bound,
+        'gap': gap
+    }
+
+
+def get_model_size(model):
+    """Returns: (num_variables, num_constraints) of the underlying CP-SAT proto."""
+    proto = model.Proto()
+    return len(proto.variables), len(proto.constraints)
+
+
+@contextlib.contextmanager
+def _builder_stage(profiler, name, model):
+    """Profiles one sub-builder and records how many variables/constraints it added."""
+    with profile_stage(profiler, name) as counts:
+        if profiler is None:
+            yield counts
+            return
+        vars_before, cts_before = get_model_size(model)
+        yield counts
+        vars_after, cts_after = get_model_size(model)
+        counts['variables_added'] = vars_after - vars_before
+        counts['constraints_added'] = cts_after - cts_before
+
+
+# ============================================================================
+# 9. Staged (Lexicographic) Solve
+# ============================================================================
+def solve_staged(model, objective_parts, solver_settings=None, staged_settings=None, solution_callback=None,
+                 stage_stats=None):
+    """
+    Two-stage solve of a model built with objective_parts (staged_settings defaults to
+    config.STAGED_OBJECTIVE_SETTINGS). Stage 1 minimizes the balance terms only; stage 2 adds
+    balance <= stage-1 cost + slack and minimizes the full weighted sum, hinted with the
+    stage-1 solution. The model is modified in place.
+    Stage 2 gets at least 'stage2_min_time' seconds, even if stage 1 used up the budget.
+    solution_callback (optional) streams the solutions of stage 2.
+    stage_stats (optional list) receives one dict per stage: get_solve_stats plus
+    'stage', 'status' and the 'balance' cost of its solution. The stage whose solver is
+    returned has 'kept': True.
+    Returns: (solver, status) of stage 2, or of stage 1 if stage 1 failed or stage 2 found
+    no solution. In the latter case the solver's objective is the balance cost only.
+    """
+    settings = dict(config.STAGED_OBJECTIVE_SETTINGS)
+    if staged_settings:
+        settings.update(staged_settings)
+    solver_settings = dict(config.SOLVER_SETTINGS, **(solver_settings or {}))
+    time_limit = solver_settings.get('max_time_seconds')
+    stage_stats = [] if stage_stats is None else stage_stats
+    balance, total = objective_parts['balance'], objective_parts['total']
+
+    def record(stage, solver, status):
+        stats = {'stage': stage, 'status': solver.StatusName(status)}
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            stats.update(get_solve_stats(solver), balance=solver.Value(balance))
+        else:
+            stats['wall_time'] = solver.WallTime()
+        stage_stats.append(stats)
+        cost = f"cost {stats['objective']:.0f} (balance {stats['balance']})" if 'objective' in stats else "no solution"
+        print(f"--- Stage {len(stage_stats)} ({stage}): {stats['status']} | {cost} | {stats['wall_time']:.2f}s ---")
+
+    # Stage 1: dominant balance terms only
+    stage1_limit = None if time_limit is None else time_limit * settings['stage1_time_fraction']
+    model.Minimize(balance)
+    solver = _create_solver(dict(solver_settings, max_time_seconds=stage1_limit))
+    status = solver.Solve(model)
+    record('balance', solver, status)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        stage_stats[-1]['kept'] = True
+        return solver, status
+    stage1_solver, stage1_status = solver, status
+
+    # Stage 2: full weighted sum, balance kept within slack of stage 1
+    stage1_cost = round(solver.ObjectiveValue())
+    slack = max(settings['slack'], int(settings['relative_slack'] * stage1_cost))
+    model.Add(balance <= stage1_cost + slack)
+    model.Minimize(total)
+    model.ClearHints()
+    values = solver.response_proto.solution
+    proto = model.Proto()
+    proto.solution_hint.vars.extend(range(len(values)))
+    proto.solution_hint.values.extend(values)
+
+    # A hinted solve still needs presolve time; with (almost) nothing left CP-SAT returns UNKNOWN
+    stage2_limit = None if time_limit is None else max(settings['stage2_min_time'], time_limit - solver.WallTime())
+    solver = _create_solver(dict(solver_settings, max_time_seconds=stage2_limit))
+    if solution_callback is not None:
+        status = solver.Solve(model, solution_callback)
+        solution_callback.flush()
+    else:
+        status = solver.Solve(model)
+    record(f"all terms, balance <= {stage1_cost + slack}", solver, status)
+
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        print("⚠️ Stage 2 found no solution, keeping the stage-1 solution.")
+        stage_stats[0]['kept'] = True
+        return stage1_solver, stage1_status
+    stage_stats[-1]['kept'] = True
+    return solver, status
+
+
+def print_staged_report(stage_stats):
+    """Per-stage time, objective and balance cost, plus the totals of the staged solve (kept stage marked *)."""
+    print(f"\n--- Staged objective: {len(stage_stats)} stage(s) in "
+          f"{sum(s['wall_time'] for s in stage_stats):.2f}s ---")
+    print(f"   {'stage':<8}{'status':>10}{'time [s]':>10}{'objective':>12}{'balance':>10}{'gap':>8}")
+    for i, s in enumerate(stage_stats, 1):
+        stage = f"{i}*" if s.get('kept') else str(i)
+        line = f"   {stage:<8}{s['status']:>10}{s['wall_time']:>10.2f}"
+        if 'objective' in s:
+            line += f"{s['objective']:>12.0f}{s['balance']:>10}{s['gap']:>8.2%}"
+        print(line)
+    print("   * = solution kept")
+
+
+# ============================================================================
+# 10. Main Orchestrator
+# ============================================================================
+def build_model(employees, unavailable_requests, manual_assignments,
+                worked_last_sat_noon, worked_last_sat_night, model_settings=None, verbose=True, profiler=None,
+                role_vars=None, daily_demand=None, objective_parts=None, partial_headcount=False, num_days=None,
+                previous_day=None):
+    """
+    Builds the full CP-SAT model (variables, hard constraints, objective).
+    model_settings defaults to config.MODEL_SETTINGS.
+    profiler (profiling.PipelineProfiler, optional) times every sub-builder.
+    role_vars (optional dict) receives the placement variables when 'role_slots' is enabled.
+    daily_demand (optional): demand table per day, defaults to the calendar of num_days.
+    objective_parts (optional dict) receives the 'balance' and 'total' objective expressions.
+    partial_headcount: headcount demand is an upper bound (see role_decomposition.py).
+    num_days (optional): planning horizon, defaults to config.NUM_DAYS.
+    previous_day (optional): (E, S) 0/1 schedule of the day before day 0 (rolling horizon). The
+    back-to-back rule and the rest gaps then cross the start of the horizon as they do inside it.
+    Returns: model, shift_vars
+    """
+    settings = dict(config.MODEL_SETTINGS)
+    if model_settings:
+        settings.update(model_settings)
+    lean = settings.get('lean', False)
+    num_days = config.NUM_DAYS if num_days is None else num_days
+
+    if daily_demand is None:
+        daily_demand = demand_calendar.build_daily_demand(num_days)
+
     # 1. Init
-    model, shift_vars = _init_model_and_variables(employees, config.NUM_DAYS, config.NUM_SHIFTS)
+    with profile_stage(profiler, 'build.init') as counts:
+        blocked_cells = None
+        if lean:
+            blocked_cells = collect_blocked_cells(employees, unavailable_requests, worked_last_sat_night)
+        model, shift_vars = _init_model_and_variables(employees, num_days, config.NUM_SHIFTS, blocked_cells)
+        if profiler is not None:
+            counts['variables_added'] = get_model_size(model)[0]
 
     # 2. Hard Constraints
-    _add_role_demand_constraints(model, shift_vars, employees, config.NUM_DAYS, config.NUM_SHIFTS)
-    _add_shift_rules_constraints(model, shift_vars, len(employees), config.NUM_DAYS, config.NUM_SHIFTS)
-    _add_availability_constraints(model, shift_vars, employees, unavailable_requests,
-                                  manual_assignments, worked_last_sat_noon, worked_last_sat_night)
-    _add_labor_law_constraints(model, shift_vars, employees, config.NUM_DAYS, config.NUM_SHIFTS)
+    with _builder_stage(profiler, 'build.role_demand', model):
+        _add_role_demand_constraints(model, shift_vars, employees, num_days, config.NUM_SHIFTS,
+                                     daily_demand=daily_demand, partial_headcount=partial_headcount)
+    if settings.get('role_slots', False):
+        role_vars = {} if role_vars is None else role_vars
+        with _builder_stage(profiler, 'build.role_slots', model):
+            _add_role_slot_constraints(model, shift_vars, employees, num_days, config.NUM_SHIFTS, role_vars,
+                                       daily_demand)
+    else:
+        role_vars = None
+    with _builder_stage(profiler, 'build.shift_rules', model):
+        _add_shift_rules_constraints(model, shift_vars, len(employees), num_days, config.NUM_SHIFTS,
+                                     previous_day=previous_day)
+    with _builder_stage(profiler, 'build.availability', model):
+        _add_availability_constraints(model, shift_vars, employees, unavailable_requests,
+                                      manual_assignments, worked_last_sat_noon, worked_last_sat_night,
+                                      num_days=num_days)
+    with _builder_stage(profiler, 'build.labor_law', model):
+        _add_labor_law_constraints(model, shift_vars, employees, num_days, config.NUM_SHIFTS, lean=lean)
+
+    if settings.get('symmetry_breaking', False):
+        with _builder_stage(profiler, 'build.symmetry_breaking', model):
+            groups = _add_symmetry_breaking_constraints(model, shift_vars, employees, unavailable_requests,
+                                                        manual_assignments, worked_last_sat_noon,
+                                                        worked_last_sat_night, num_days, config.NUM_SHIFTS,
+                                                        previous_day)
+        if verbose:
+            print(f"--- Symmetry breaking: {len(groups)} groups of interchangeable employees "
+                  f"({sum(len(g) for g in groups)} employees) ---")
 
     # 3. Objective (Soft Constraints)
-    _build_objective_function(model, shift_vars, employees, config.NUM_DAYS, config.NUM_SHIFTS,
-                              worked_last_sat_noon, worked_last_sat_night)
+    with _builder_stage(profiler, 'build.objective', model):
+        _build_objective_function(model, shift_vars, employees, num_days, config.NUM_SHIFTS,
+                                  worked_last_sat_noon, worked_last_sat_night, lean=lean, role_vars=role_vars,
+                                  daily_demand=daily_demand, objective_parts=objective_parts,
+                                  previous_day=previous_day)
 
-    # 4. Solve
-    solver = cp_model.CpSolver()
-    status = solver.Solve(model)
+    return model, shift_vars
+
+
+def build_and_solve_model(employees, unavailable_requests, manual_assignments,
+                          worked_last_sat_noon, worked_last_sat_night, solver_settings=None,
+                          solution_callback=None, hint_values=None, model_settings=None, profiler=None,
+                          role_vars=None, daily_demand=None, portfolio_settings=None, staged_settings=None,
+                          stage_stats=None, num_days=None, previous_day=None):
+    settings = dict(config.MODEL_SETTINGS)
+    if model_settings:
+        settings.update(model_settings)
+
+    staged_settings = dict(config.STAGED_OBJECTIVE_SETTINGS, **(staged_settings or {}))
+    objective_parts = {}
+
+    # 1-3. Variables, Hard Constraints, Objective
+    with profile_stage(profiler, 'build') as counts:
+        model, shift_vars = build_model(employees, unavailable_requests, manual_assignments,
+                                        worked_last_sat_noon, worked_last_sat_night, settings, profiler=profiler,
+                                        role_vars=role_vars, daily_demand=daily_demand,
+                                        objective_parts=objective_parts, num_days=num_days,
+                                        previous_day=previous_day)
+        counts['variables'], counts['constraints'] = get_model_size(model)
+
+    if settings.get('lean'):
+        lean_vars, lean_cts = get_model_size(model)
+        if profiler is not None:
+            # Build the standard model too, only to report how much the lean mode saves
+            # (profiling runs only: it doubles build time and memory on large sites)
+            reference_model, _ = build_model(employees, unavailable_requests, manual_assignments,
+                                             worked_last_sat_noon, worked_last_sat_night,
+                                             dict(settings, lean=False), verbose=False, daily_demand=daily_demand,
+                                             num_days=num_days, previous_day=previous_day)
+            ref_vars, ref_cts = get_model_size(reference_model)
+            print(f"--- Lean model: {ref_vars} -> {lean_vars} variables, "
+                  f"{ref_cts} -> {lean_cts} constraints ---")
+        else:
+            fixed = sum(1 for var in shift_vars.values() if _is_fixed_zero(var))
+            print(f"--- Lean model: {lean_vars} variables, {lean_cts} constraints "
+                  f"({fixed} of {len(shift_vars)} shift cells fixed to 0; --profile compares with the full model) ---")
+
+    # 4. Warm Start (Optional)
+    if hint_values:
+        blocked_cells = collect_blocked_cells(employees, unavailable_requests, worked_last_sat_night)
+        dropped = _add_solution_hints(model, shift_vars, hint_values, blocked_cells)
+        assigned = sum(1 for v in hint_values.values() if v)
+        print(f"--- Warm start: {assigned - dropped} hinted assignments "
+              f"({dropped} dropped as unavailable) ---")
+
+    # 5. Solve
+    portfolio_settings = dict(config.PORTFOLIO_SETTINGS, **(portfolio_settings or {}))
+    if portfolio_settings['enabled']:
+        # Several configurations in parallel processes (no streaming callback)
+        with profile_stage(profiler, 'solve') as counts:
+            solver, status = portfolio.solve_portfolio(model, solver_settings, portfolio_settings,
+                                                       {'employees': len(employees),
+                                                        'days': config.NUM_DAYS if num_days is None else num_days})
+            counts['status'] = solver.StatusName(status)
+        return solver, status, shift_vars
+
+    if staged_settings['enabled']:
+        # Balance terms first, then the full weighted sum (streams stage 2 only)
+        if solution_callback is not None:
+            solution_callback.bind(shift_vars)
+        with profile_stage(profiler, 'solve') as counts:
+            solver, status = solve_staged(model, objective_parts, solver_settings, staged_settings,
+                                          solution_callback, stage_stats)
+            counts['status'] = solver.StatusName(status)
+        return solver, status, shift_vars
+
+    solver = _create_solver(solver_settings)
+    with profile_stage(profiler, 'solve') as counts:
+        if solution_callback is not None:
+            # Anytime mode: stream every improving solution while the search runs
+            solution_callback.bind(shift_vars)
+            status = solver.Solve(model, solution_callback)
+            solution_callback.flush()
+        else:
+            status = solver.Solve(model)
+        counts['status'] = solver.StatusName(status)
 
     return solver, status, shift_vars
\ No newline at end of file
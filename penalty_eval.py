@@ -0,0 +1,204 @@
+# penalty_eval.py
+import numpy as np
+
+import config
+import demand_calendar
+from config import ROLE_ORDER
+from optimizer import special_role_demand, special_role_slots
+
+
+# ============================================================================
+# 1. Pattern Counts (Shifted-Array Logic)
+# ============================================================================
+def pattern_counts(solutions):
+    """
+    Counts the sequence patterns of the objective for every employee at once.
+    solutions: 0/1 array of shape (..., E, D, S); leading dimensions are batches of schedules.
+    Returns: dict of int arrays of shape (..., E):
+        'consecutive_nights' - nights on d, d+1, d+2
+        'rest_gap'           - worked slot pairs (t, t+2) in the flattened day*shift timeline
+        'chain_a/b/c'        - the 8-8-8 patterns (see optimizer section 6, C.2)
+    """
+    work = np.asarray(solutions).astype(bool)
+    noon = work[..., 1]
+    night = work[..., 2]
+    # Morning (0) OR Reinforcement (3): both start early
+    morn_reinf = work[..., 0] | work[..., 3]
+
+    flat = work.reshape(work.shape[:-2] + (-1,))
+
+    return {
+        'consecutive_nights': (night[..., :-2] & night[..., 1:-1] & night[..., 2:]).sum(axis=-1),
+        'rest_gap': (flat[..., :-2] & flat[..., 2:]).sum(axis=-1),
+        # A: (Morn/Reinf D) -> (Night D) -> (Noon D+1)
+        'chain_a': (morn_reinf[..., :-1] & night[..., :-1] & noon[..., 1:]).sum(axis=-1),
+        # B: (Noon D) -> (Morn/Reinf D+1) -> (Night D+1)
+        'chain_b': (noon[..., :-1] & morn_reinf[..., 1:] & night[..., 1:]).sum(axis=-1),
+        # C: (Night D) -> (Noon D+1) -> (Morn/Reinf D+2)
+        'chain_c': (night[..., :-2] & noon[..., 1:-1] & morn_reinf[..., 2:]).sum(axis=-1),
+    }
+
+
+# ============================================================================
+# 2. Objective Terms
+# ============================================================================
+def _employee_array(employees, key, default=0):
+    return np.array([emp.get(key, default) for emp in employees], dtype=np.int64)
+
+
+def penalty_terms(solutions, employees, worked_last_sat_noon, worked_last_sat_night, weights=None, roles=None):
+    """
+    Weighted objective terms of optimizer._build_objective_function for any assignment.
+    solutions: 0/1 array of shape (..., E, D, S).
+    roles (role-slot model): same shape, ROLE_ORDER index per worked cell (solution_io.extract_roles).
+    Returns: dict term -> int array of shape (..., E) (already multiplied by its weight).
+
+    Slack variables are evaluated at their smallest feasible value, so the sum equals
+    solver.ObjectiveValue() at the optimum and is a lower bound on it for intermediate solutions.
+    """
+    w = config.WEIGHTS if weights is None else weights
+    x = np.asarray(solutions).astype(np.int64)
+    num_employees, num_days, num_shifts = x.shape[-3:]
+
+    per_shift = x.sum(axis=-2)  # (..., E, S)
+    mornings, evenings, nights = per_shift[..., 0], per_shift[..., 1], per_shift[..., 2]
+    total_worked = per_shift.sum(axis=-1)
+    target = _employee_array(employees, 'target_shifts')
+
+    # --- A. Min/Max (Soft) --- (no shortage term for evenings, as in the model)
+    terms = {
+        'max_nights': np.maximum(0, nights - _employee_array(employees, 'max_nights')) * w['MAX_NIGHTS'],
+        'min_nights': np.maximum(0, _employee_array(employees, 'min_nights') - nights) * w['MIN_NIGHTS'],
+        'max_mornings': np.maximum(0, mornings - _employee_array(employees, 'max_mornings')) * w['MAX_MORNINGS'],
+        'min_mornings': np.maximum(0, _employee_array(employees, 'min_mornings') - mornings) * w['MIN_MORNINGS'],
+        'max_evenings': np.maximum(0, evenings - _employee_array(employees, 'max_evenings')) * w['MAX_EVENINGS'],
+    }
+
+    # --- B/C. Sequences ---
+    counts = pattern_counts(x)
+    terms['consecutive_nights'] = counts['consecutive_nights'] * w['CONSECUTIVE_NIGHTS']
+
+    # Previous week: Saturday Noon -> Sunday Morning, Saturday Night -> Sunday Noon
+    prev_gaps = np.zeros_like(total_worked)
+    if worked_last_sat_noon:
+        noon_mask = np.isin(np.arange(num_employees), list(worked_last_sat_noon))
+        prev_gaps = prev_gaps + x[..., 0, 0] * noon_mask
+    if worked_last_sat_night:
+        night_mask = np.isin(np.arange(num_employees), list(worked_last_sat_night))
+        prev_gaps = prev_gaps + x[..., 0, 1] * night_mask
+    terms['rest_gap'] = (counts['rest_gap'] + prev_gaps) * w['REST_GAP']
+
+    if 'CHAIN_3_PENALTY' in w:
+        terms['chain_3'] = (counts['chain_a'] + counts['chain_b'] + counts['chain_c']) * w['CHAIN_3_PENALTY']
+
+    # --- D. Target Shifts ---
+    deviation = total_worked - target
+    terms['target_deviation'] = deviation * deviation * w['TARGET_SHIFTS']
+    if 'MAX_SHIFTS' in w:
+        terms['max_shifts'] = np.maximum(0, deviation) * w['MAX_SHIFTS']
+
+    # --- E. Unified Special Role Fairness ---
+    slot_weight = np.zeros((num_days, num_shifts), dtype=np.int64)
+    special_slots = special_role_slots(num_days, num_shifts)
+    for d, s in special_slots:
+        slot_weight[d, s] += 1  # A slot needing both roles counts twice
+
+    is_special = np.array([emp.get('role') in ['supervisor', 'controller'] for emp in employees])
+    total_special_capacity = int(target[is_special].sum()) or 1
+    if roles is None:
+        assigned_special = (x * slot_weight).sum(axis=(-2, -1))
+        total_special_demand = len(special_slots)
+    else:
+        special_codes = [ROLE_ORDER.index('supervisor'), ROLE_ORDER.index('controller')]
+        assigned_special = np.isin(roles, special_codes).sum(axis=(-2, -1))
+        total_special_demand = special_role_demand(num_days, num_shifts)
+    abs_diff = np.abs(assigned_special * total_special_capacity - target * total_special_demand)
+    terms['role_fairness'] = abs_diff * _employee_array(employees, 'role_priority', 5) * is_special
+
+    return terms
+
+
+# ============================================================================
+# 3. Main Entry Points
+# ============================================================================
+def evaluate_objective(solutions, employees, worked_last_sat_noon, worked_last_sat_night, weights=None,
+                       roles=None):
+    """
+    Objective value of one schedule (E, D, S) or a batch of schedules (..., E, D, S).
+    Returns: int for a single schedule, int array of the batch shape otherwise.
+    """
+    terms = penalty_terms(solutions, employees, worked_last_sat_noon, worked_last_sat_night, weights, roles)
+    total = sum(term.sum(axis=-1) for term in terms.values())
+    return int(total) if np.ndim(total) == 0 else total
+
+
+def check_objective(solver_objective, solution, employees, worked_last_sat_noon, worked_last_sat_night,
+                    optimal=True, roles=None):
+    """
+    Validation oracle: recomputes the objective of `solution` and compares it with the solver.
+    At the optimum both must match; for intermediate solutions the evaluator may only be lower.
+    Returns: (ok, evaluated_objective)
+    """
+    evaluated = evaluate_objective(solution, employees, worked_last_sat_noon, worked_last_sat_night, roles=roles)
+    solver_objective = int(round(solver_objective))
+    ok = evaluated == solver_objective if optimal else evaluated <= solver_objective
+    return ok, evaluated
+
+
+# ============================================================================
+# 4. Hard Rules
+# ============================================================================
+def hard_rule_violations(solution, employees, unavailable_requests, manual_assignments, worked_last_sat_night,
+                         daily_demand=None):
+    """
+    Checks one schedule (E, D, S) against the hard constraints of optimizer.build_model, e.g. a
+    rolling-horizon schedule that no single model has seen as a whole.
+    Returns: dict rule -> number of violations (all 0 for a schedule the full model accepts)
+    """
+    x = np.asarray(solution).astype(bool)
+    num_employees, num_days, num_shifts = x.shape
+    daily_demand = demand_calendar.build_daily_demand(num_days) if daily_demand is None else daily_demand
+    flat = x.reshape(num_employees, -1)
+    worked_days = x.any(axis=-1)
+
+    # Unavailable cells, the implied Reinforcement block and Sunday Morning after Saturday Night
+    blocked = np.zeros_like(x)
+    for (e, d, s) in unavailable_requests:
+        if 0 <= e < num_employees and 0 <= d < num_days:
+            blocked[e, d, s] = True
+            if s in (config.SHIFT_MORNING, config.SHIFT_NOON):
+                blocked[e, d, config.SHIFT_REINFORCEMENT] = True
+    for e in worked_last_sat_night:
+        if 0 <= e < num_employees:
+            blocked[e, 0, config.SHIFT_MORNING] = True
+
+    # Demand: exact headcount, supervisors and skilled workers per slot
+    is_supervisor = np.array([emp.get('role') == 'supervisor' for emp in employees])
+    is_skilled = np.array([emp.get('role') in ('supervisor', 'controller') for emp in employees])
+    demand = 0
+    for d, daily_config in enumerate(daily_demand):
+        for s in range(num_shifts):
+            reqs = daily_config.get(s, {})
+            demand += int(x[:, d, s].sum() != sum(reqs.values())
+                          or x[is_supervisor, d, s].sum() < reqs.get('supervisor', 0)
+                          or x[is_skilled, d, s].sum() < reqs.get('controller', 0) + reqs.get('supervisor', 0))
+
+    # Labor law: no MAX_CONSECUTIVE_DAYS + 1 worked days in a row, the history streak included
+    window = config.MAX_CONSECUTIVE_DAYS + 1
+    history = np.array([[d >= window - 1 - min(emp.get('history_streak', 0), window - 1) for d in range(window - 1)]
+                        for emp in employees], dtype=bool).reshape(num_employees, window - 1)
+    days = np.concatenate([history, worked_days], axis=1)
+    streaks = 0
+    if days.shape[1] >= window:
+        streaks = int(np.lib.stride_tricks.sliding_window_view(days, window, axis=1).all(axis=-1).sum())
+
+    return {
+        'back_to_back': int((flat[:, :-1] & flat[:, 1:]).sum()),
+        'shifts_per_day': int((x.sum(axis=-1) > 1).sum()),
+        'unavailable': int((x & blocked).sum()),
+        'manual': sum(1 for (e, d, s) in manual_assignments
+                      if 0 <= e < num_employees and 0 <= d < num_days and not x[e, d, s]),
+        'demand': demand,
+        'max_shifts': int((x.sum(axis=(1, 2)) > _employee_array(employees, 'max_shifts')).sum()),
+        'streak': streaks,
+    }
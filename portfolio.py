@@ -0,0 +1,187 @@
+# portfolio.py
+# Solver portfolio: the same CP-SAT model is solved with several differently seeded and
+# parameterized configurations, each in its own process. The first proven result (optimal or
+# infeasible) wins and the other processes are cancelled; otherwise the best solution at the
+# deadline wins. Every run is logged as one JSON line, to learn good defaults per site.
+import datetime
+import json
+import multiprocessing
+import os
+import queue
+import time
+
+from ortools.sat.python import cp_model
+
+import config
+
+PROVEN_STATUSES = ('OPTIMAL', 'INFEASIBLE', 'MODEL_INVALID')
+
+
+# ============================================================================
+# 1. Worker Process
+# ============================================================================
+def _apply_parameters(params, overrides):
+    """Sets CP-SAT parameters by name; enum values are given by name, e.g. 'FIXED_SEARCH'."""
+    for key, value in overrides.items():
+        if isinstance(value, str):
+            value = getattr(params, value)
+        setattr(params, key, value)
+
+
+def _solve_worker(name, model_text, parameters, deadline, result_queue):
+    """Parses the model, solves it with one configuration and reports the result."""
+    model = cp_model.CpModel()
+    model.Proto().parse_text_format(model_text)
+
+    solver = cp_model.CpSolver()
+    if deadline is not None:
+        solver.parameters.max_time_in_seconds = max(0.0, deadline - time.time())
+    _apply_parameters(solver.parameters, parameters)
+    status = solver.Solve(model)
+
+    result = {'name': name, 'status': solver.StatusName(status), 'wall_time': solver.WallTime(),
+              'best_bound': solver.BestObjectiveBound()}
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result['objective'] = solver.ObjectiveValue()
+        result['solution'] = list(solver.response_proto.solution)
+    result_queue.put(result)
+
+
+# ============================================================================
+# 2. Portfolio Result
+# ============================================================================
+class PortfolioSolver:
+    """
+    Winning result of a portfolio run. Offers the CpSolver methods the pipeline reads
+    (ObjectiveValue, BestObjectiveBound, WallTime, StatusName, response_proto.solution),
+    so solution_io and optimizer.get_solve_stats work unchanged.
+    """
+
+    class _Response:
+        def __init__(self, solution):
+            self.solution = solution
+
+    def __init__(self, winner, best_bound, wall_time):
+        self.winner = winner
+        self.response_proto = self._Response(winner.get('solution', []))
+        self._best_bound = best_bound
+        self._wall_time = wall_time
+
+    def ObjectiveValue(self):
+        return self.winner.get('objective', 0.0)
+
+    def BestObjectiveBound(self):
+        return self._best_bound
+
+    def WallTime(self):
+        return self._wall_time
+
+    def StatusName(self, status=None):
+        return self.winner['status']
+
+
+# ============================================================================
+# 3. Main Entry Point
+# ============================================================================
+def _pick_winner(results):
+    """First proven result, else the best objective (minimization), else the first result."""
+    for r in results:
+        if r['status'] in PROVEN_STATUSES:
+            return r
+    solved = [r for r in results if 'objective' in r]
+    if solved:
+        return min(solved, key=lambda r: r['objective'])
+    return results[0] if results else {'name': None, 'status': 'UNKNOWN'}
+
+
+def _log_run(path, winner, results, configurations, model, log_context):
+    """Appends the run (site context, winner and every configuration's outcome) as one JSON line."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    outcomes = {r['name']: {k: r[k] for k in ('status', 'wall_time', 'objective', 'best_bound') if k in r}
+                for r in results}
+    num_vars, num_constraints = len(model.Proto().variables), len(model.Proto().constraints)
+    record = dict(log_context or {},
+                  timestamp=datetime.datetime.now().isoformat(timespec='seconds'),
+                  variables=num_vars, constraints=num_constraints,
+                  winner=winner['name'],
+                  winner_parameters=configurations.get(winner['name'], {}),
+                  results={name: outcomes.get(name, {'status': 'CANCELLED'}) for name in configurations})
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def solve_portfolio(model, solver_settings=None, portfolio_settings=None, log_context=None):
+    """
+    Solves `model` with every configuration of portfolio_settings (defaults to
+    config.PORTFOLIO_SETTINGS) in parallel processes.
+    solver_settings: max_time_seconds is the portfolio deadline, random_seed offsets the seeds,
+    num_workers (0 = all cores) is shared out between the configurations unless
+    'workers_per_solve' is set; relative_gap_limit and log_search_progress apply to every
+    configuration. A configuration's own parameters win over these.
+    log_context (optional dict): extra fields of the JSON log line, e.g. the site size.
+    Returns: (solver, status) - a PortfolioSolver holding the winner and its cp_model status.
+    """
+    settings = dict(config.PORTFOLIO_SETTINGS)
+    if portfolio_settings:
+        settings.update(portfolio_settings)
+    solver_settings = dict(config.SOLVER_SETTINGS, **(solver_settings or {}))
+
+    configurations = {c['name']: {k: v for k, v in c.items() if k != 'name'} for c in settings['configurations']}
+    total_workers = solver_settings.get('num_workers') or os.cpu_count() or 1
+    workers_per_solve = settings['workers_per_solve'] or max(1, total_workers // len(configurations))
+    seed_offset = solver_settings.get('random_seed') or 0
+    shared = {'num_workers': workers_per_solve,
+              'log_search_progress': bool(solver_settings.get('log_search_progress', False))}
+    if solver_settings.get('relative_gap_limit') is not None:
+        shared['relative_gap_limit'] = solver_settings['relative_gap_limit']
+    start = time.time()
+    deadline = None if solver_settings.get('max_time_seconds') is None else start + solver_settings['max_time_seconds']
+
+    model_text = str(model.Proto())
+    context = multiprocessing.get_context(settings.get('start_method'))
+    result_queue = context.Queue()
+    processes = {}
+    for name, parameters in configurations.items():
+        parameters = dict(shared, **parameters)
+        parameters['random_seed'] = parameters.get('random_seed', 0) + seed_offset
+        processes[name] = context.Process(target=_solve_worker, daemon=True,
+                                          args=(name, model_text, parameters, deadline, result_queue))
+        processes[name].start()
+    print(f"--- Portfolio: {len(processes)} configurations x {workers_per_solve} worker(s) ---")
+
+    results = []
+    try:
+        while len(results) < len(processes):
+            try:
+                result = result_queue.get(timeout=1.0)
+            except queue.Empty:
+                if not any(p.is_alive() for p in processes.values()) and result_queue.empty():
+                    break  # A worker died without reporting
+                continue
+            results.append(result)
+            objective = f"{result['objective']:.0f}" if 'objective' in result else '-'
+            print(f"   [{result['name']}] {result['status']} | cost {objective} | {result['wall_time']:.2f}s")
+            if result['status'] in PROVEN_STATUSES:
+                break
+    finally:
+        # Cancel the losers
+        for p in processes.values():
+            if p.is_alive():
+                p.terminate()
+        for p in processes.values():
+            p.join()
+
+    winner = _pick_winner(results)
+    best_bound = max([r['best_bound'] for r in results if r['status'] != 'INFEASIBLE'] or [0.0])
+    if winner['status'] == 'OPTIMAL':
+        best_bound = winner['objective']
+    cancelled = len(processes) - len(results)
+    print(f"V Portfolio winner: {winner['name']} ({winner['status']}), {cancelled} configuration(s) cancelled.")
+
+    if settings.get('log_file'):
+        _log_run(settings['log_file'], winner, results, configurations, model, log_context)
+
+    status = getattr(cp_model, winner['status'], cp_model.UNKNOWN)
+    return PortfolioSolver(winner, best_bound, time.time() - start), status
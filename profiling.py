@@ -0,0 +1,116 @@
+# profiling.py
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+
+
+def _peak_rss_mb():
+    """Peak resident set size of the process so far (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class PipelineProfiler:
+    """
+    Collects wall time, CPU time, peak RSS and free-form counts per pipeline stage.
+
+    Usage:
+        with profiler.stage('excel') as counts:
+            counts['cells_written'] = ...
+
+    One stage (by name) can additionally be captured with cProfile or tracemalloc.
+    Records are printed as a summary table and/or written as JSON lines.
+    """
+
+    def __init__(self, jsonl_path=None, capture_stage=None, capture_mode='cprofile', capture_dir="shift_schedule_output"):
+        self.jsonl_path = jsonl_path
+        self.capture_stage = capture_stage
+        self.capture_mode = capture_mode
+        self.capture_dir = capture_dir
+        self.records = []
+        self._depth = 0
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        counts = {}
+        capture = name == self.capture_stage
+        if capture:
+            self._start_capture()
+
+        depth = self._depth
+        self._depth += 1
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield counts
+        finally:
+            record = {
+                'stage': name,
+                'depth': depth,
+                'wall_s': time.perf_counter() - wall_start,
+                'cpu_s': time.process_time() - cpu_start,
+                'peak_rss_mb': _peak_rss_mb(),
+                'counts': counts
+            }
+            self._depth -= 1
+            if capture:
+                record.update(self._stop_capture(name))
+            self.records.append(record)
+            if self.jsonl_path:
+                with open(self.jsonl_path, 'a') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    # --- Optional deep capture of one stage ---
+    def _start_capture(self):
+        if self.capture_mode == 'tracemalloc':
+            tracemalloc.start()
+        else:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def _stop_capture(self, name):
+        os.makedirs(self.capture_dir, exist_ok=True)
+        safe_name = name.replace('.', '_')
+
+        if self.capture_mode == 'tracemalloc':
+            snapshot = tracemalloc.take_snapshot()
+            _, traced_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"\n--- tracemalloc: top allocations in '{name}' ---")
+            for stat in snapshot.statistics('lineno')[:10]:
+                print(f"   {stat}")
+            return {'traced_peak_mb': traced_peak / (1024 * 1024)}
+
+        self._cprofile.disable()
+        path = os.path.join(self.capture_dir, f"profile_{safe_name}.prof")
+        self._cprofile.dump_stats(path)
+        stream = io.StringIO()
+        pstats.Stats(self._cprofile, stream=stream).sort_stats('cumulative').print_stats(15)
+        print(f"\n--- cProfile of '{name}' (full stats: {path}) ---")
+        print(stream.getvalue())
+        return {'cprofile_path': path}
+
+    def print_summary(self):
+        """Prints all stages in completion order (children before their parent stage)."""
+        print(f"\n{'stage':<34}{'wall [s]':>10}{'cpu [s]':>10}{'rss [MB]':>10}  counts")
+        for r in self.records:
+            label = '  ' * r['depth'] + r['stage']
+            counts = ', '.join(f"{k}={v}" for k, v in r['counts'].items())
+            print(f"{label:<34}{r['wall_s']:>10.3f}{r['cpu_s']:>10.3f}{r['peak_rss_mb']:>10.1f}  {counts}")
+
+
+@contextlib.contextmanager
+def profile_stage(profiler, name):
+    """Same as profiler.stage(name), or a no-op (yielding a throwaway dict) without a profiler."""
+    if profiler is None:
+        yield {}
+        return
+    with profiler.stage(name) as counts:
+        yield counts
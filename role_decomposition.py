@@ -0,0 +1,287 @@
+# role_decomposition.py
+# Role-tier decomposition: the supervisors and controllers are scheduled first, in a small
+# model against the supervisor / skilled demand (headcount as an upper bound only). Their
+# schedule is then fixed and the guards fill the remaining headcount. An optional repair pass
+# re-solves the joint model, hinted with the combined schedule. Every objective term is per
+# employee, so the tiers are coupled only by the demand of the shared slots.
+# Quality loss against one monolithic solve: python -m benchmarks.role_decomposition
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+import config
+import demand_calendar
+import optimizer
+import penalty_eval
+import solution_io
+from profiling import profile_stage
+
+SKILLED_ROLES = ('supervisor', 'controller')
+
+
+# ============================================================================
+# 1. Tiers
+# ============================================================================
+def split_tiers(employees):
+    """Returns: (skilled, guards) - employee indices of the supervisor/controller tier and of the rest."""
+    skilled = [e for e, emp in enumerate(employees) if emp.get('role') in SKILLED_ROLES]
+    guards = [e for e, emp in enumerate(employees) if emp.get('role') not in SKILLED_ROLES]
+    return skilled, guards
+
+
+def _tier_cells(cells, members):
+    """(e, d, s) cells of the tier's employees, re-indexed to the tier."""
+    position = {e: i for i, e in enumerate(members)}
+    return [(position[e], d, s) for (e, d, s) in cells if e in position]
+
+
+def _tier_workers(workers, members):
+    """Previous-week worker list of the tier, re-indexed to the tier."""
+    position = {e: i for i, e in enumerate(members)}
+    return [position[e] for e in workers if e in position]
+
+
+def guard_capacity(employees, guards, unavailable_requests, worked_last_sat_night, num_days, num_shifts):
+    """
+    Aggregated capacity of the guard tier, a relaxation of its model (one shift per day,
+    availability, max_shifts; sequences and streaks are ignored).
+    Returns: (per_slot (D, S), per_day (D,), total) - most places the guards can fill.
+    """
+    blocked = optimizer.collect_blocked_cells(employees, unavailable_requests, worked_last_sat_night)
+    per_slot = np.zeros((num_days, num_shifts), dtype=np.int64)
+    per_day = np.zeros(num_days, dtype=np.int64)
+    for e in guards:
+        free = np.array([[(e, d, s) not in blocked for s in range(num_shifts)] for d in range(num_days)])
+        per_slot += free
+        per_day += free.any(axis=1)
+    total = sum(min(employees[e]['max_shifts'], num_days) for e in guards)
+    return per_slot, per_day, total
+
+
+def headcount(daily_demand, num_shifts):
+    """Total demand per slot, shape (D, S)."""
+    result = np.zeros((len(daily_demand), num_shifts), dtype=np.int64)
+    for d, daily_config in enumerate(daily_demand):
+        for s, reqs in daily_config.items():
+            result[d, s] = sum(reqs.values())
+    return result
+
+
+def _add_skilled_cover(model, shift_vars, num_members, daily_demand, capacity, cover):
+    """
+    The skilled tier takes at least the headcount the guards cannot fill: what exceeds their
+    aggregated capacity (per slot, per day, overall) and cover (D, S), the places they left
+    open in an earlier round.
+    """
+    per_slot, per_day, total = capacity
+    all_cells, day_needs = [], 0
+    for d, daily_config in enumerate(daily_demand):
+        day_cells, day_total = [], 0
+        for s, reqs in daily_config.items():
+            cells = [shift_vars[(e, d, s)] for e in range(num_members)]
+            need = max(sum(reqs.values()) - int(per_slot[d, s]), int(cover[d, s]))
+            if need > 0:
+                model.Add(sum(cells) >= need)
+            day_cells += cells
+            day_total += sum(reqs.values())
+        if day_total > per_day[d]:
+            model.Add(sum(day_cells) >= day_total - int(per_day[d]))
+        all_cells += day_cells
+        day_needs += day_total
+    if day_needs > total:
+        model.Add(sum(all_cells) >= day_needs - total)
+
+
+def residual_guard_demand(daily_demand, skilled_solution):
+    """
+    Demand left for the guard tier: per slot, the headcount the skilled tier did not take.
+    skilled_solution: (E_skilled, D, S) schedule of the supervisors and controllers.
+    """
+    taken = skilled_solution.sum(axis=0)
+    residual = []
+    for d, daily_config in enumerate(daily_demand):
+        residual.append({s: {'guard': sum(reqs.values()) - int(taken[d, s]), 'controller': 0, 'supervisor': 0}
+                         for s, reqs in daily_config.items()})
+    return residual
+
+
+# ============================================================================
+# 2. Tier Solves
+# ============================================================================
+def _solve_tier(stage, employees, members, unavailable_requests, manual_assignments, worked_last_sat_noon,
+                worked_last_sat_night, daily_demand, solver_settings, model_settings, hint_values, profiler,
+                partial_headcount=False, capacity=None, cover=None, fill=False):
+    """
+    Builds and solves the model of one employee subset (indices into the full `employees`).
+    hint_values (optional): {(e, d, s): 0/1} in full-site indices.
+    capacity, cover (optional): see _add_skilled_cover (skilled tier).
+    fill: maximize the places filled instead of minimizing the penalties (with partial_headcount).
+    Returns: (stage dict, (E_tier, D, S) solution or None, CpSolver)
+    """
+    tier_employees = [employees[e] for e in members]
+    unavailable = _tier_cells(unavailable_requests, members)
+    noon = _tier_workers(worked_last_sat_noon, members)
+    night = _tier_workers(worked_last_sat_night, members)
+
+    with profile_stage(profiler, 'build') as counts:
+        model, shift_vars = optimizer.build_model(tier_employees, unavailable, _tier_cells(manual_assignments, members),
+                                                  noon, night, model_settings, verbose=False, profiler=profiler,
+                                                  daily_demand=daily_demand, partial_headcount=partial_headcount)
+        if capacity is not None:
+            _add_skilled_cover(model, shift_vars, len(members), daily_demand, capacity, cover)
+        if fill:
+            model.Maximize(sum(shift_vars.values()))
+        counts['variables'], counts['constraints'] = optimizer.get_model_size(model)
+    if hint_values:
+        tier_hints = dict.fromkeys(_tier_cells([k for k, v in hint_values.items() if v], members), 1)
+        optimizer._add_solution_hints(model, shift_vars, tier_hints,
+                                      optimizer.collect_blocked_cells(tier_employees, unavailable, night))
+
+    solver = optimizer._create_solver(solver_settings)
+    with profile_stage(profiler, 'solve') as counts:
+        status = solver.Solve(model)
+        counts['status'] = solver.StatusName(status)
+
+    result = {'stage': stage, 'employees': len(members), 'status': solver.StatusName(status)}
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result['wall_time'] = solver.WallTime()
+        print(f"X Role tiers: no solution for the {stage} tier ({result['status']}).")
+        return result, None, solver
+    result.update(optimizer.get_solve_stats(solver))
+    print(f"V Role tiers: {stage} ({len(members)} employees) {result['status']} | "
+          f"{'places filled' if fill else 'cost'} {result['objective']:.0f} | "
+          f"gap {result['gap']:.2%} | {result['wall_time']:.2f}s")
+
+    solution_index = solution_io.build_solution_index(shift_vars, len(members), config.NUM_DAYS, config.NUM_SHIFTS)
+    return result, solution_io.extract_solution(solver, solution_index), solver
+
+
+# ============================================================================
+# 3. Main Entry Point
+# ============================================================================
+def _stage_settings(solver_settings, deadline, solves_left, cap=None):
+    """
+    Solver settings of the next solve: an equal share of what is left of the total budget
+    (deadline, None = unlimited) among the solves still planned, at most `cap` seconds.
+    """
+    limits = [] if cap is None else [cap]
+    if deadline is not None:
+        limits.append(max(0.0, deadline - time.perf_counter()) / solves_left)
+    return dict(solver_settings, max_time_seconds=min(limits, default=None))
+
+
+def solve_role_tiers(employees, unavailable_requests, manual_assignments, worked_last_sat_noon,
+                     worked_last_sat_night, solver_settings=None, model_settings=None, decomposition_settings=None,
+                     daily_demand=None, hint_values=None, profiler=None):
+    """
+    Solves the skilled tier, then the guard tier, then (optionally) repairs the joint schedule
+    (decomposition_settings defaults to config.ROLE_DECOMPOSITION_SETTINGS). The role-slot
+    model variant is not used: role placement is decided by the tiers themselves.
+    If the guards cannot fill what the skilled tier left, a 'fill' solve finds the places they
+    can take and the skilled tier is solved again covering the rest (up to max_rounds rounds);
+    if that fails too, the repair pass starts from the skilled schedule alone.
+    The solver's max_time_seconds is the total budget of all stages: every solve gets an equal
+    share of what is left (at most tier_time_limit / repair_time_limit).
+    Returns: (solution, stages)
+        solution - (E, D, S) uint8 array, None if no stage produced a full schedule
+        stages   - one dict per solve: stage, employees, status (+ get_solve_stats;
+                   the objective of a 'fill' stage is the number of places filled)
+    """
+    settings = dict(config.ROLE_DECOMPOSITION_SETTINGS)
+    if decomposition_settings:
+        settings.update(decomposition_settings)
+    model_settings = dict(config.MODEL_SETTINGS, **(model_settings or {}))
+    model_settings['role_slots'] = False
+    solver_settings = dict(config.SOLVER_SETTINGS, **(solver_settings or {}))
+    time_limit = solver_settings.get('max_time_seconds')
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    tier_cap = settings.get('tier_time_limit')
+    repair_solves = 1 if settings['repair'] else 0
+
+    num_days, num_shifts = config.NUM_DAYS, config.NUM_SHIFTS
+    daily_demand = demand_calendar.build_daily_demand(num_days) if daily_demand is None else daily_demand
+    skilled, guards = split_tiers(employees)
+    inputs = (unavailable_requests, manual_assignments, worked_last_sat_noon, worked_last_sat_night)
+    stages = []
+
+    capacity = guard_capacity(employees, guards, unavailable_requests, worked_last_sat_night, num_days, num_shifts)
+    cover = np.zeros((num_days, num_shifts), dtype=np.int64)
+    solution = None
+    guard_solution = None
+    for round_ in range(1, settings['max_rounds'] + 1):
+        # 1. Supervisors + controllers against the supervisor / skilled demand, taking
+        #    whatever headcount the guards cannot fill
+        tier_settings = _stage_settings(solver_settings, deadline, 2 + repair_solves, tier_cap)
+        stage, skilled_solution, _ = _solve_tier(f'skilled {round_}', employees, skilled, *inputs, daily_demand,
+                                                 tier_settings, model_settings, hint_values, profiler,
+                                                 partial_headcount=True, capacity=capacity, cover=cover)
+        stages.append(stage)
+        if skilled_solution is None:
+            break
+        solution = np.zeros((len(employees), num_days, num_shifts), dtype=np.uint8)
+        solution[skilled] = skilled_solution
+
+        # 2. Guards fill the remaining headcount
+        residual = residual_guard_demand(daily_demand, skilled_solution)
+        stage, guard_solution, _ = _solve_tier(f'guards {round_}', employees, guards, *inputs, residual,
+                                               _stage_settings(solver_settings, deadline, 1 + repair_solves, tier_cap),
+                                               model_settings, hint_values, profiler)
+        stages.append(stage)
+        if guard_solution is not None or round_ == settings['max_rounds']:
+            break
+
+        # The places the guards cannot take go to the skilled tier in the next round
+        stage, filled, _ = _solve_tier(f'fill {round_}', employees, guards, *inputs, residual,
+                                       _stage_settings(solver_settings, deadline, 3 + repair_solves, tier_cap),
+                                       model_settings, None, profiler, partial_headcount=True, fill=True)
+        stages.append(stage)
+        if filled is None:
+            break
+        cover = np.maximum(cover, skilled_solution.sum(axis=0) + headcount(residual, num_shifts)
+                           - filled.sum(axis=0))
+
+    if solution is None:
+        return None, stages
+    complete = guard_solution is not None
+    if complete:
+        solution[guards] = guard_solution
+    if not settings['repair']:
+        return (solution if complete else None), stages
+
+    # 3. Repair: the joint model, hinted with the combined (or skilled-only) schedule, in what is left
+    stage, repaired, _ = _solve_tier('repair', employees, list(range(len(employees))), *inputs, daily_demand,
+                                     _stage_settings(solver_settings, deadline, 1, settings.get('repair_time_limit')),
+                                     model_settings, solution_io.solution_to_values(solution), profiler)
+    stages.append(stage)
+    if repaired is None:
+        return (solution if complete else None), stages
+    if not complete or stage['objective'] < penalty_eval.evaluate_objective(
+            solution, employees, worked_last_sat_noon, worked_last_sat_night):
+        solution = repaired
+    return solution, stages
+
+
+def lower_bound(stages):
+    """
+    Proven lower bound on the joint optimum: the repair bound, or the bound of the first
+    skilled round (a relaxation for the skilled employees, the guards' cost is at least 0).
+    Later skilled rounds cover places the guards left open and are no relaxation.
+    """
+    bounds = [s['best_bound'] for s in stages if s['stage'] in ('skilled 1', 'repair') and 'best_bound' in s]
+    return max(bounds, default=0.0)
+
+
+def print_decomposition_report(stages, objective):
+    """Per-stage status, size, cost and time, plus the worst-case optimality loss of `objective`."""
+    print(f"\n--- Role tiers: {len(stages)} stage(s) in {sum(s['wall_time'] for s in stages):.2f}s ---")
+    print(f"   {'stage':<10}{'employees':>10}{'status':>12}{'time [s]':>10}{'objective':>12}{'gap':>8}")
+    for s in stages:
+        line = f"   {s['stage']:<10}{s['employees']:>10}{s['status']:>12}{s['wall_time']:>10.2f}"
+        if 'objective' in s:
+            line += f"{s['objective']:>12.0f}{s['gap']:>8.2%}"
+        print(line)
+    bound = lower_bound(stages)
+    loss = (objective - bound) / max(1.0, abs(objective))
+    print(f"   Schedule cost {objective} | joint lower bound {bound:.0f} | optimality loss at most {loss:.2%}")
+    return loss
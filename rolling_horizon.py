@@ -0,0 +1,194 @@
+# rolling_horizon.py
+# Rolling-horizon decomposition: a long horizon is solved as overlapping windows with
+# optimizer.build_and_solve_model. The first commit_days of every window are fixed, the rest
+# is re-planned (and warm-started) by the next window. Quality loss against one monolithic
+# solve: python -m benchmarks.rolling_horizon
+import numpy as np
+from ortools.sat.python import cp_model
+
+import config
+import demand_calendar
+import optimizer
+import penalty_eval
+import solution_io
+
+# Per shift type limits carried across windows: (max key, min key, shift)
+SHIFT_LIMITS = [('max_mornings', 'min_mornings', config.SHIFT_MORNING),
+                ('max_evenings', 'min_evenings', config.SHIFT_NOON),
+                ('max_nights', 'min_nights', config.SHIFT_NIGHT)]
+
+
+# ============================================================================
+# 1. Windows
+# ============================================================================
+def plan_windows(num_days, window_days, commit_days):
+    """
+    Splits the horizon into windows that advance by commit_days.
+    The last window reaches the end of the horizon and commits everything it solves.
+    Returns: list of (start, end, commit_end) day indices, end/commit_end exclusive.
+    """
+    if not 0 < commit_days <= window_days:
+        raise ValueError(f"commit_days must be between 1 and window_days ({window_days}), got {commit_days}.")
+
+    windows = []
+    start = 0
+    while start < num_days:
+        end = min(num_days, start + window_days)
+        commit_end = end if end == num_days else start + commit_days
+        windows.append((start, end, commit_end))
+        start = commit_end
+    return windows
+
+
+# ============================================================================
+# 2. History Carried Forward
+# ============================================================================
+def _share(value, window_len, remaining_days, rounding):
+    """Integer share of value for window_len of the remaining_days ('ceil', 'floor' or 'round')."""
+    value = max(0, int(value))
+    if rounding == 'ceil':
+        return -(-value * window_len // remaining_days)
+    if rounding == 'floor':
+        return value * window_len // remaining_days
+    return (2 * value * window_len + remaining_days) // (2 * remaining_days)
+
+
+def _streak_before(emp_solution, start, history_streak):
+    """Consecutive worked days right before `start`; reaching day 0 continues the original streak."""
+    streak = 0
+    for d in range(start - 1, -1, -1):
+        if not emp_solution[d].any():
+            return streak
+        streak += 1
+    return streak + history_streak
+
+
+def window_employees(employees, solution, start, end, num_days):
+    """
+    Employee limits of the window [start, end) given the days committed before it:
+    - max_shifts: what is left of the hard horizon cap (at most one shift per window day)
+    - target_shifts and the per shift type limits: what is left, shared in proportion to the
+      window's part of the remaining days (the last window gets exactly the remainder)
+    - history_streak: the worked days right before the window
+    """
+    window_len, remaining_days = end - start, num_days - start
+    done = solution[:, :start, :].astype(np.int64)
+    worked = done.sum(axis=(1, 2))
+    per_shift = done.sum(axis=1)
+
+    result = []
+    for e, emp in enumerate(employees):
+        emp = dict(emp)
+        emp['max_shifts'] = int(max(0, min(window_len, emp['max_shifts'] - worked[e])))
+        emp['target_shifts'] = min(emp['max_shifts'], _share(emp['target_shifts'] - worked[e],
+                                                             window_len, remaining_days, 'round'))
+        for max_key, min_key, s in SHIFT_LIMITS:
+            if max_key in emp:
+                emp[max_key] = _share(emp[max_key] - per_shift[e, s], window_len, remaining_days, 'ceil')
+            if min_key in emp:
+                emp[min_key] = _share(emp[min_key] - per_shift[e, s], window_len, remaining_days, 'floor')
+        emp['history_streak'] = _streak_before(solution[e], start, emp.get('history_streak', 0))
+        result.append(emp)
+    return result
+
+
+def _window_cells(cells, start, end):
+    """(e, d, s) cells inside [start, end), re-indexed to the window."""
+    return [(e, d - start, s) for (e, d, s) in cells if start <= d < end]
+
+
+def _history_before(solution, start, worked_last_sat_noon, worked_last_sat_night):
+    """
+    What the window sees of the day before it: the first window gets the previous week's lists,
+    later windows the committed (E, S) row of that day, which the model links to its first day
+    with the same back-to-back rule and rest gaps as inside the horizon.
+    Returns: (worked_last_sat_noon, worked_last_sat_night, previous_day)
+    """
+    if start == 0:
+        return list(worked_last_sat_noon), list(worked_last_sat_night), None
+    return [], [], solution[:, start - 1, :]
+
+
+# ============================================================================
+# 3. Main Entry Point
+# ============================================================================
+def solve_rolling_horizon(employees, unavailable_requests, manual_assignments, worked_last_sat_noon,
+                          worked_last_sat_night, solver_settings=None, model_settings=None, rolling_settings=None,
+                          daily_demand=None, hint_values=None, on_commit=None, profiler=None):
+    """
+    Solves config.NUM_DAYS window by window (rolling_settings defaults to config.ROLLING_HORIZON_SETTINGS).
+    A window sees the committed days through the carried history, the remaining limits and the
+    committed day right before it (back-to-back rule and rest gaps across the boundary); the
+    longer sequence penalties (three nights, 8-8-8 chains) that span a commit boundary are not
+    visible to either window. The final schedule is checked with penalty_eval.hard_rule_violations.
+    daily_demand (optional): demand table per day of the whole horizon.
+    hint_values (optional): warm start of the first window, {(e, d, s): 0/1}.
+    on_commit (optional): called as on_commit(solution, committed_days) after every window.
+    Returns: (solution, roles, windows)
+        solution - (E, D, S) uint8 array, None if a window has no solution
+        roles    - role placements of the role-slot model (see solution_io.extract_roles), else None
+        windows  - one dict per solved window: start, end, commit_end, status (+ get_solve_stats)
+    """
+    settings = dict(config.ROLLING_HORIZON_SETTINGS)
+    if rolling_settings:
+        settings.update(rolling_settings)
+    window_solver_settings = dict(solver_settings or {})
+    if settings.get('window_time_limit') is not None:
+        window_solver_settings['max_time_seconds'] = settings['window_time_limit']
+
+    num_days, num_shifts, num_employees = config.NUM_DAYS, config.NUM_SHIFTS, len(employees)
+    daily_demand = demand_calendar.build_daily_demand(num_days) if daily_demand is None else daily_demand
+
+    solution = np.zeros((num_employees, num_days, num_shifts), dtype=np.uint8)
+    roles = None
+    windows = []
+    for start, end, commit_end in plan_windows(num_days, settings['window_days'], settings['commit_days']):
+        print(f"\n--- Rolling horizon: solving days {start + 1}-{end}, committing {start + 1}-{commit_end} ---")
+        role_vars = {}
+        noon_before, night_before, previous_day = _history_before(solution, start, worked_last_sat_noon,
+                                                                  worked_last_sat_night)
+        solver, status, shift_vars = optimizer.build_and_solve_model(
+            employees=window_employees(employees, solution, start, end, num_days),
+            unavailable_requests=_window_cells(unavailable_requests, start, end),
+            manual_assignments=_window_cells(manual_assignments, start, end),
+            worked_last_sat_noon=noon_before,
+            worked_last_sat_night=night_before,
+            solver_settings=window_solver_settings,
+            hint_values=hint_values,
+            model_settings=model_settings,
+            profiler=profiler,
+            role_vars=role_vars,
+            daily_demand=daily_demand[start:end],
+            num_days=end - start,
+            previous_day=previous_day
+        )
+
+        window = {'start': start, 'end': end, 'commit_end': commit_end, 'status': solver.StatusName(status)}
+        windows.append(window)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            print(f"X Rolling horizon: no solution for days {start + 1}-{end} ({window['status']}).")
+            return None, None, windows
+        window.update(optimizer.get_solve_stats(solver))
+
+        # Commit the prefix; the re-planned tail warm-starts the next window
+        committed = commit_end - start
+        solution_index = solution_io.build_solution_index(shift_vars, num_employees, end - start, num_shifts)
+        window_solution = solution_io.extract_solution(solver, solution_index)
+        solution[:, start:commit_end] = window_solution[:, :committed]
+        if role_vars:
+            window_roles = solution_io.extract_roles(solver, role_vars, num_employees, end - start, num_shifts)
+            roles = np.full(solution.shape, -1, dtype=np.int8) if roles is None else roles
+            roles[:, start:commit_end] = window_roles[:, :committed]
+        hint_values = solution_io.solution_to_values(window_solution[:, committed:])
+
+        print(f"V Committed days {start + 1}-{commit_end} | window cost {window['objective']:.0f} | "
+              f"gap {window['gap']:.2%} | {window['wall_time']:.2f}s")
+        if on_commit is not None:
+            on_commit(solution, commit_end)
+
+    violations = penalty_eval.hard_rule_violations(solution, employees, unavailable_requests, manual_assignments,
+                                                   worked_last_sat_night, daily_demand)
+    broken = {rule: count for rule, count in violations.items() if count}
+    if broken:
+        print(f"⚠️ Rolling horizon: the schedule breaks hard rules of the full model: {broken}")
+    return solution, roles, windows
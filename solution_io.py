@@ -0,0 +1,144 @@
+# solution_io.py
+import json
+
+import numpy as np
+import openpyxl
+
+from config import ROLE_ORDER
+from excel_writer import SCHEDULE_LAYOUT
+
+
+# ============================================================================
+# 1. JSON Dumps
+# ============================================================================
+def save_solution_json(path, values, employees, meta=None):
+    """
+    Persists a solution as JSON: metadata + the list of assigned (e, d, s) cells.
+    `values` maps (e, d, s) -> 0/1. Employee names are stored so the file can be
+    matched against next week's employee list even if the order changes.
+    """
+    assignments = [
+        {'e': e, 'd': d, 's': s, 'name': employees[e]['name']}
+        for (e, d, s), val in sorted(values.items()) if val
+    ]
+    payload = dict(meta or {})
+    payload['assignments'] = assignments
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=1)
+
+
+def load_solution_json(path, employees):
+    """
+    Loads a JSON dump written by save_solution_json.
+    Returns: dict {(e, d, s): 1} for every assigned cell that maps to a current employee.
+    """
+    with open(path, encoding='utf-8') as f:
+        payload = json.load(f)
+
+    name_to_idx = {emp['name']: i for i, emp in enumerate(employees)}
+    values = {}
+    for item in payload.get('assignments', []):
+        # Prefer the name (stable across weeks), fall back to the stored index
+        name = item.get('name')
+        e = name_to_idx.get(name) if name is not None else item.get('e')
+        if e is None or not 0 <= e < len(employees):
+            continue
+        values[(e, item['d'], item['s'])] = 1
+    return values
+
+
+# ============================================================================
+# 2. Excel Schedules
+# ============================================================================
+def load_solution_xlsx(path, employees, num_days):
+    """
+    Reads a schedule back from the 'Schedule' sheet produced by excel_writer.
+    Rows are interpreted with SCHEDULE_LAYOUT, cells are matched to employees by name.
+    Returns: dict {(e, d, s): 1}
+    """
+    wb = openpyxl.load_workbook(path, read_only=True)
+    ws = wb["Schedule"]
+    grid = list(ws.iter_rows(min_row=1, values_only=True))
+    wb.close()
+
+    name_to_idx = {emp['name']: i for i, emp in enumerate(employees)}
+    values = {}
+
+    current_row = 2  # Row 1 holds the day headers
+    for row_def in SCHEDULE_LAYOUT:
+        if row_def.get("is_header") or row_def.get("is_spacer"):
+            current_row += 1
+            continue
+
+        row_values = grid[current_row - 1] if current_row - 1 < len(grid) else ()
+        for d in range(num_days):
+            col_idx = d + 2  # Column C is day 0
+            name = row_values[col_idx] if col_idx < len(row_values) else None
+            if name in name_to_idx:
+                values[(name_to_idx[name], d, row_def["shift"])] = 1
+        current_row += 1
+
+    return values
+
+
+def load_previous_solution(path, employees, num_days):
+    """Dispatches on file extension (.json / .xlsx)."""
+    if path.lower().endswith('.xlsx'):
+        return load_solution_xlsx(path, employees, num_days)
+    return load_solution_json(path, employees)
+
+
+# ============================================================================
+# 3. Solution Tensor
+# ============================================================================
+def build_solution_index(shift_vars, num_employees, num_days, num_shifts):
+    """
+    Maps every (e, d, s) cell to its CP-SAT variable index (-1 for cells fixed to 0 in lean mode).
+    Build once per model; extract_solution reuses it for every solution.
+    """
+    index = np.full((num_employees, num_days, num_shifts), -1, dtype=np.int64)
+    for (e, d, s), var in shift_vars.items():
+        if not isinstance(var, int):
+            index[e, d, s] = var.Index()
+    return index
+
+
+def extract_solution(source, solution_index):
+    """
+    Reads all shift variables with a single call into the solver response.
+    source: CpSolver after Solve, or a CpSolverSolutionCallback inside on_solution_callback.
+    Returns: (E, D, S) uint8 array, 1 = assigned.
+    """
+    raw = np.asarray(source.response_proto.solution, dtype=np.int64)
+    solution = np.zeros(solution_index.shape, dtype=np.uint8)
+    mask = solution_index >= 0
+    solution[mask] = raw[solution_index[mask]]
+    return solution
+
+
+def extract_roles(source, role_vars, num_employees, num_days, num_shifts):
+    """
+    Role-slot model only: reads the solver's role placements.
+    Returns: (E, D, S) int8 array of ROLE_ORDER indices, -1 where the employee is off.
+    """
+    raw = source.response_proto.solution
+    roles = np.full((num_employees, num_days, num_shifts), -1, dtype=np.int8)
+    for (e, d, s, role), var in role_vars.items():
+        if raw[var.Index()]:
+            roles[e, d, s] = ROLE_ORDER.index(role)
+    return roles
+
+
+def solution_to_values(solution):
+    """Converts the array to the {(e, d, s): 1} dict used by the JSON dumps and warm starts."""
+    return {(int(e), int(d), int(s)): 1 for e, d, s in zip(*np.nonzero(solution))}
+
+
+def solution_from_values(values, num_employees, num_days, num_shifts):
+    """Inverse of solution_to_values (cells outside the shape are ignored)."""
+    solution = np.zeros((num_employees, num_days, num_shifts), dtype=np.uint8)
+    for (e, d, s), val in values.items():
+        if val and e < num_employees and d < num_days and s < num_shifts:
+            solution[e, d, s] = 1
+    return solution
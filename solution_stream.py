@@ -0,0 +1,133 @@
+# solution_stream.py
+import csv
+import os
+import shutil
+import threading
+import time
+
+from ortools.sat.python import cp_model
+
+import config
+import excel_writer
+from solution_io import build_solution_index, extract_solution, save_solution_json, solution_to_values
+
+
+# ============================================================================
+# 1. Solution Callback
+# ============================================================================
+class SolutionStreamer(cp_model.CpSolverSolutionCallback):
+    """
+    Writes every improving solution to a rotating snapshot (JSON or xlsx) while the
+    search is still running, and records the objective trajectory.
+
+    Snapshots are rate-limited by `min_interval_seconds`. A solution that arrives too
+    early is kept in memory and written by a timer as soon as the interval has passed
+    (a newer solution replaces it meanwhile). Every solution is appended to
+    trajectory.csv right away. `flush()` writes what is still pending when the search ends.
+    Pressing Ctrl+C stops CP-SAT gracefully; the best solution found so far is kept.
+    """
+
+    def __init__(self, employees, num_days, num_shifts, colors, stream_settings=None,
+                 daily_demand=None, day_labels=None):
+        super().__init__()
+        settings = dict(config.STREAMING_SETTINGS)
+        if stream_settings:
+            settings.update(stream_settings)
+
+        self.employees = employees
+        self.num_days = num_days
+        self.num_shifts = num_shifts
+        self.colors = colors
+        self.daily_demand = daily_demand  # Planning calendar for the xlsx snapshots
+        self.day_labels = day_labels
+        self.snapshot_dir = settings['snapshot_dir']
+        self.snapshot_format = settings['format']
+        self.min_interval = settings['min_interval_seconds']
+        self.keep_last = max(1, settings['keep_last'])
+
+        self.solution_index = None
+        self.trajectory = []  # [(wall_time, objective, best_bound)]
+        self._written = []  # paths of rotating snapshots, oldest first
+        self._last_write = None
+        self._pending = None  # (solution, meta) not yet written because of the rate limit
+        self._timer = None  # Writes _pending once the rate limit allows it
+        self._lock = threading.Lock()  # CP-SAT callback thread vs. timer thread
+
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        self.trajectory_path = os.path.join(self.snapshot_dir, "trajectory.csv")
+        with open(self.trajectory_path, 'w', newline='') as f:
+            csv.writer(f).writerow(['solution', 'wall_time', 'objective', 'best_bound'])
+
+    def bind(self, shift_vars):
+        """Attaches the model's shift variables (called by optimizer.build_and_solve_model)."""
+        self.solution_index = build_solution_index(shift_vars, len(self.employees), self.num_days, self.num_shifts)
+
+    # --- CP-SAT hook ---
+    def on_solution_callback(self):
+        wall_time = self.WallTime()
+        objective = self.ObjectiveValue()
+        best_bound = self.BestObjectiveBound()
+        self.trajectory.append((wall_time, objective, best_bound))
+        print(f"   [#{len(self.trajectory)}] t={wall_time:.2f}s  cost={objective}  bound={best_bound}")
+        with open(self.trajectory_path, 'a', newline='') as f:
+            csv.writer(f).writerow([len(self.trajectory), f"{wall_time:.3f}", objective, best_bound])
+
+        solution = extract_solution(self, self.solution_index)
+        meta = {
+            'solution_index': len(self.trajectory),
+            'wall_time': wall_time,
+            'objective': objective,
+            'best_bound': best_bound
+        }
+
+        with self._lock:
+            now = time.monotonic()
+            if self._last_write is not None and now - self._last_write < self.min_interval:
+                self._pending = (solution, meta)
+                if self._timer is None:
+                    self._timer = threading.Timer(self.min_interval - (now - self._last_write), self._write_pending)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+
+            self._write_snapshot(solution, meta)
+            self._last_write = now
+
+    def _write_pending(self):
+        """Timer target: writes the rate-limited solution once the interval has passed."""
+        with self._lock:
+            self._timer = None
+            if self._pending is not None:
+                self._write_snapshot(*self._pending)
+                self._last_write = time.monotonic()
+
+    # --- Output ---
+    def _write_snapshot(self, solution, meta):
+        ext = 'xlsx' if self.snapshot_format == 'xlsx' else 'json'
+        path = os.path.join(self.snapshot_dir, f"snapshot_{meta['solution_index']:04d}.{ext}")
+
+        if ext == 'xlsx':
+            write_excel = (excel_writer.create_excel_schedule_fast if config.EXCEL_WRITE_ONLY
+                           else excel_writer.create_excel_schedule)
+            write_excel(solution, self.employees, self.colors, output_filename=path,
+                        daily_demand=self.daily_demand, day_labels=self.day_labels)
+        else:
+            save_solution_json(path, solution_to_values(solution), self.employees, meta)
+
+        # Keep a stable "latest" copy for planners, then rotate old snapshots out
+        shutil.copyfile(path, os.path.join(self.snapshot_dir, f"latest.{ext}"))
+        self._written.append(path)
+        while len(self._written) > self.keep_last:
+            old_path = self._written.pop(0)
+            if os.path.exists(old_path):
+                os.remove(old_path)
+        self._pending = None
+
+    def flush(self):
+        """Cancels the pending timer and writes the last rate-limited solution (if any)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._pending is not None:
+                self._write_snapshot(*self._pending)